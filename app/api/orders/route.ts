@@ -1,6 +1,7 @@
 
-import { NextResponse } from "next/server";
+import { NextResponse, after } from "next/server";
 import { supabase } from "@/lib/supabase";
+import { orderConfirmation, sendMail } from "@/lib/mail";
 
 export async function GET(req: Request) {
   const { searchParams } = new URL(req.url);
@@ -78,6 +79,9 @@ export async function POST(req: Request) {
         }
     }
 
+    // Sent once the response is out: a slow mail relay must not hold up the customer.
+    after(() => sendMail(orderConfirmation(order, items)));
+
     return NextResponse.json({
         ...order,
         items
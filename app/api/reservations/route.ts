@@ -1,6 +1,7 @@
 
-import { NextResponse } from "next/server";
+import { NextResponse, after } from "next/server";
 import { supabase } from "@/lib/supabase";
+import { reservationConfirmation, sendMail } from "@/lib/mail";
 
 export async function GET(req: Request) {
   const { searchParams } = new URL(req.url);
@@ -56,6 +57,9 @@ export async function POST(req: Request) {
       throw new Error(error.message || "Error al crear reserva");
     }
 
+    // Sent once the response is out: a slow mail relay must not hold up the customer.
+    after(() => sendMail(reservationConfirmation(data)));
+
     return NextResponse.json({
         ...data,
         message: "Reserva creada exitosamente"
@@ -1,6 +1,6 @@
 "use client";
 
-import React, { createContext, useContext, useState, useMemo } from "react";
+import React, { createContext, useContext, useState, useMemo, useEffect } from "react";
 import { Product, CartItem } from "@/types"; // Need to update types import path or alias
 
 // We might need to duplicate types here if they aren't easily shareable due to module resolution,
@@ -23,8 +23,50 @@ interface CartContextType {
 
 const CartContext = createContext<CartContextType | undefined>(undefined);
 
+// Cart persistence (PRD "Carrito de Compras": persistencia en localStorage):
+// the cart survives reloads, new tabs and reopening the installed PWA, and
+// stays in sync across open tabs.
+export const CART_STORAGE_KEY = "cart";
+
+function readSavedCart(): CartItem[] {
+  try {
+    const saved = JSON.parse(localStorage.getItem(CART_STORAGE_KEY) || "[]");
+    if (Array.isArray(saved) && saved.every((item) => item?.dish?.id && Number.isFinite(item.quantity))) {
+      return saved;
+    }
+  } catch {
+    // Unreadable (corrupt JSON or storage disabled): start with an empty cart.
+  }
+  try {
+    localStorage.removeItem(CART_STORAGE_KEY);
+  } catch {}
+  return [];
+}
+
 export function CartProvider({ children }: { children: React.ReactNode }) {
   const [cart, setCart] = useState<CartItem[]>([]);
+  const [loaded, setLoaded] = useState(false);
+
+  useEffect(() => {
+    // Read after mount: localStorage does not exist during server rendering.
+    setCart(readSavedCart());
+    setLoaded(true);
+    const onStorage = (event: StorageEvent) => {
+      if (event.key === CART_STORAGE_KEY) setCart(readSavedCart());
+    };
+    window.addEventListener("storage", onStorage);
+    return () => window.removeEventListener("storage", onStorage);
+  }, []);
+
+  useEffect(() => {
+    // Don't overwrite the saved cart with the empty initial state.
+    if (!loaded) return;
+    try {
+      localStorage.setItem(CART_STORAGE_KEY, JSON.stringify(cart));
+    } catch {
+      // Quota exceeded or storage disabled (private mode): the cart still works for this tab.
+    }
+  }, [cart, loaded]);
 
   const addToCart = (
     dish: Product,
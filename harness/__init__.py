@@ -0,0 +1,9 @@
+"""Playwright harness for the generated TC*.py suites in tests/ and testsprite_tests/.
+
+The TestSprite scripts stay untouched: the harness loads each one, drops its
+module-level ``asyncio.run(run_test())`` and runs ``run_test`` against shared
+infrastructure (browser pool, fixtures, reporting).
+
+    python -m harness                      # every suite
+    python -m harness tests/TC004_*.py     # selected scripts
+"""
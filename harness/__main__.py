@@ -0,0 +1,165 @@
+"""Command line entry point: ``python -m harness [paths...]``."""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from harness import cart, flaky, fork, har, impact, mail, network, report, runner, schedule, store
+from harness.session import Options
+from harness.suite import discover
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m harness", description="Run the generated TC*.py suites.")
+    parser.add_argument("paths", nargs="*", help="TC scripts or suite directories (default: all suites)")
+    parser.add_argument(
+        "-n", "--workers", type=int,
+        default=int(os.environ.get("HARNESS_WORKERS", "1")),
+        help="worker processes, each with its own Chromium (default: 1)",
+    )
+    parser.add_argument(
+        "--fixed-waits", action="store_true",
+        default=os.environ.get("HARNESS_FIXED_WAITS", "") == "1",
+        help="keep the scripts' fixed sleeps instead of event-driven waits",
+    )
+    parser.add_argument(
+        "--network", choices=network.PROFILES,
+        default=os.environ.get("HARNESS_NETWORK", network.AUTO),
+        help="stub third-party images/fonts/analytics (stubbed), load them (full) "
+        "or decide by plan category (auto, default)",
+    )
+    parser.add_argument(
+        "--har", choices=har.MODES,
+        default=os.environ.get("HARNESS_HAR", har.OFF),
+        help="record the browser's /api/* traffic to .harness/har or replay it from there",
+    )
+    parser.add_argument(
+        "--raw-xpaths", action="store_true",
+        default=os.environ.get("HARNESS_RAW_XPATHS", "") == "1",
+        help="use the scripts' absolute xpaths as-is instead of the selector engine",
+    )
+    parser.add_argument(
+        "--single-expects", action="store_true",
+        default=os.environ.get("HARNESS_SINGLE_EXPECTS", "") == "1",
+        help="keep each expect(...).to_be_visible() separate instead of batching runs of them",
+    )
+    parser.add_argument(
+        "--no-device-matrix", action="store_true",
+        default=os.environ.get("HARNESS_NO_DEVICE_MATRIX", "") == "1",
+        help="run tests whose plan entry lists several devices once, with default context options",
+    )
+    parser.add_argument(
+        "--no-fork", action="store_true",
+        default=os.environ.get("HARNESS_NO_FORK", "") == "1",
+        help="let every script replay its opening steps instead of forking shared ones from a snapshot",
+    )
+    parser.add_argument(
+        "--no-mail-sink", action="store_true",
+        default=os.environ.get("HARNESS_NO_MAIL_SINK", "") == "1",
+        help="do not start the mail sink at HARNESS_MAIL_URL (one is already running elsewhere)",
+    )
+    parser.add_argument(
+        "--changed", nargs="?", const="HEAD", metavar="REF",
+        help="only run the scripts affected by changes since REF (default: HEAD, i.e. uncommitted changes)",
+    )
+    parser.add_argument(
+        "--no-blackbox", action="store_true",
+        default=os.environ.get("HARNESS_NO_BLACKBOX", "") == "1",
+        help="do not keep the in-memory recording that failing tests write to .harness/blackbox",
+    )
+    parser.add_argument(
+        "--reruns", type=int, default=flaky.RERUNS,
+        help=f"isolated, traced reruns of each failed test to tell flaky from consistent (default: {flaky.RERUNS})",
+    )
+    parser.add_argument(
+        "--skip-quarantined", action="store_true",
+        help="do not run the quarantine lane of known-flaky tests at all",
+    )
+    parser.add_argument("--report", type=Path, default=report.DEFAULT_REPORT, help="merged JSON report path")
+    return parser
+
+
+def _print_results(results: list[runner.TestResult]) -> None:
+    for result in sorted(results, key=lambda r: r.key):
+        print(f"{result.status:<7} {result.duration:7.2f}s  [w{result.worker}] {result.key}  {result.title}")
+        if result.error:
+            print(f"        {result.error.splitlines()[0]}")
+        if result.blackbox:
+            print(f"        blackbox: {result.blackbox}")
+        for delivery in result.mail or []:
+            print(
+                f"        mail: {delivery['kind']} {delivery['reference']} queued {delivery['latency_ms']:.0f} ms "
+                f"after the POST ({delivery['after_response_ms']:+.0f} ms after its response)"
+            )
+        for leg in result.devices or []:
+            load = f" load {leg['load_ms']:.0f} ms" if leg["load_ms"] is not None else ""
+            print(f"        {leg['status']:<7} {leg['duration']:6.2f}s{load}  {leg['device']}")
+        for attempt in result.attempts or []:
+            print(f"        rerun: {attempt['status']} {attempt['duration']:.2f}s {' '.join(attempt['pw_traces'] or [])}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    scripts = discover(args.paths)
+    if args.changed:
+        scripts, affected = impact.select(scripts, args.changed)
+        for reason in affected.reasons.get("*", []):
+            print(f"full run: {reason}")
+        if not affected.everything:
+            for script in scripts:
+                print(f"selected {script.key}: {'; '.join(affected.reasons[script.key])}")
+        if not scripts:
+            print(f"no scripts affected by changes since {args.changed}")
+            return 0
+    started = time.time()
+    options = Options(
+        fixed_waits=args.fixed_waits, network=args.network, har=args.har,
+        stable_selectors=not args.raw_xpaths, batch_expects=not args.single_expects,
+        blackbox=not args.no_blackbox, device_matrix=not args.no_device_matrix,
+    )
+    if not args.no_fork:
+        fork.reset()
+        options.forks = fork.plan(scripts)
+    scripts += cart.case_table(scripts)
+    sink = None if args.no_mail_sink else mail.start_sink()
+    if sink is not None:
+        print(f"mail sink: {sink.url} (start the app with MAIL_WEBHOOK_URL={sink.env()['MAIL_WEBHOOK_URL']})")
+    main_lane, quarantined = flaky.split_lanes(scripts)
+    shards, plan = schedule.plan(main_lane, args.workers)
+    results = runner.run_parallel(main_lane, workers=args.workers, options=options, shards=shards)
+    flaky.retry_failures(results, main_lane, options, args.reruns)
+    _print_results(results)
+    if quarantined and not args.skip_quarantined:
+        print(f"\nquarantine lane: {', '.join(s.key for s in quarantined)}")
+        lane = runner.run_parallel(quarantined, workers=args.workers, options=options)
+        flaky.retry_failures(lane, quarantined, options, args.reruns)
+        for result in lane:
+            result.lane = "quarantine"
+        _print_results(lane)
+        results += lane
+    schedule.record(results)
+    merged = report.build_report(results, started=started, workers=args.workers, plan=plan)
+    summary = merged["summary"]
+    print(
+        f"\n{summary['passed']} passed, {summary['failed']} failed, {summary['flaky']} flaky"
+        + (f" (+{summary['quarantined']} quarantined)" if summary["quarantined"] else "")
+        + f" in {merged['wall_time']:.1f}s wall / {merged['total_work']:.1f}s work"
+    )
+    critical = merged["schedule"]["critical_path"]
+    if critical:
+        print(
+            f"critical path: w{critical['worker']} {critical['duration']:.1f}s "
+            f"(predicted {plan['predicted_makespan']:.1f}s, bound {plan['lower_bound']:.1f}s): "
+            + ", ".join(critical["tests"])
+        )
+    print(f"report: {report.write_report(merged, args.report)}")
+    print(f"results: run {store.record_report(merged)} in {store.DB_FILE}")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""Direct HTTP client for the Next.js ``/api/*`` routes.
+
+Built on Playwright's ``APIRequestContext``: one keep-alive connection pool per
+client, optional ``storage_state`` so requests carry the admin's Supabase
+cookies, and no browser at all. Responses are timed and parsed eagerly.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from playwright.async_api import APIRequestContext, Playwright, async_playwright
+
+from harness import config
+
+NUMBER = (int, float)
+NULL = type(None)
+
+
+def optional(schema: Any) -> tuple:
+    """Schema helper: ``schema`` or JSON ``null``."""
+    return (schema, NULL) if not isinstance(schema, tuple) else (*schema, NULL)
+
+
+def validate(value: Any, schema: Any, where: str = "$") -> list[str]:
+    """Check ``value`` against a minimal structural schema and list the mismatches.
+
+    A schema is a Python type, a dict of required keys to schemas, a
+    one-element list giving the schema of every item, or a tuple of
+    alternatives.
+    """
+    if isinstance(schema, dict):
+        if not isinstance(value, dict):
+            return [f"{where}: expected object, got {type(value).__name__}"]
+        errors = []
+        for key, sub in schema.items():
+            if key not in value:
+                errors.append(f"{where}.{key}: missing")
+            else:
+                errors.extend(validate(value[key], sub, f"{where}.{key}"))
+        return errors
+    if isinstance(schema, list):
+        if not isinstance(value, list):
+            return [f"{where}: expected array, got {type(value).__name__}"]
+        errors = []
+        for index, item in enumerate(value):
+            errors.extend(validate(item, schema[0], f"{where}[{index}]"))
+        return errors
+    alternatives = schema if isinstance(schema, tuple) else (schema,)
+    if not all(isinstance(alt, type) for alt in alternatives):
+        # A union with structured members, e.g. optional([...]).
+        for alt in alternatives:
+            errors = validate(value, alt, where)
+            if not errors:
+                return []
+        return errors
+    types = alternatives
+    # bool is an int subclass; JSON true/false must not satisfy a number schema.
+    if isinstance(value, bool) and bool not in types:
+        return [f"{where}: expected {_names(types)}, got bool"]
+    if not isinstance(value, types):
+        return [f"{where}: expected {_names(types)}, got {type(value).__name__}"]
+    return []
+
+
+def _names(types: tuple) -> str:
+    return "|".join("null" if t is NULL else t.__name__ for t in types)
+
+
+@dataclass
+class ApiResponse:
+    method: str
+    path: str
+    status: int
+    elapsed_ms: float
+    size: int
+    body: Any
+    headers: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+class ApiClient:
+    """``async with ApiClient() as api: await api.get("/api/products")``."""
+
+    def __init__(
+        self,
+        base_url: str = config.BASE_URL,
+        storage_state: Path | str | None = None,
+        timeout_ms: float = 10000,
+    ):
+        self.base_url = base_url
+        self.storage_state = storage_state
+        self.timeout_ms = timeout_ms
+        self._playwright: Playwright | None = None
+        self._request: APIRequestContext | None = None
+
+    async def __aenter__(self) -> "ApiClient":
+        self._playwright = await async_playwright().start()
+        self._request = await self._playwright.request.new_context(
+            base_url=self.base_url,
+            storage_state=str(self.storage_state) if self.storage_state else None,
+            timeout=self.timeout_ms,
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._request is not None:
+            await self._request.dispose()
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+    async def call(self, method: str, path: str, **options: Any) -> ApiResponse:
+        """Send a request; ``options`` are ``APIRequestContext.fetch`` keywords."""
+        if "json" in options:
+            options["data"] = json.dumps(options.pop("json"))
+            options.setdefault("headers", {})["content-type"] = "application/json"
+        started = time.perf_counter()
+        response = await self._request.fetch(path, method=method, fail_on_status_code=False, **options)
+        raw = await response.body()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        try:
+            body = json.loads(raw) if raw else None
+        except ValueError:
+            body = raw.decode("utf-8", "replace")
+        return ApiResponse(method, path, response.status, round(elapsed_ms, 2), len(raw), body, response.headers)
+
+    async def get(self, path: str, **options: Any) -> ApiResponse:
+        return await self.call("GET", path, **options)
+
+    async def post(self, path: str, **options: Any) -> ApiResponse:
+        return await self.call("POST", path, **options)
+
+    async def put(self, path: str, **options: Any) -> ApiResponse:
+        return await self.call("PUT", path, **options)
+
+    async def delete(self, path: str, **options: Any) -> ApiResponse:
+        return await self.call("DELETE", path, **options)
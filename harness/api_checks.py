@@ -0,0 +1,272 @@
+"""Status-code, schema and latency checks for every verb in ``app/api/**/route.ts``.
+
+Replaces the browser-driven endpoint scripts (``tests/TC014`` and
+``testsprite_tests/TC011``): the runner calls ``run_as_test`` for those keys
+instead of loading the script. Standalone::
+
+    python -m harness.api_checks [--mutating] [--budget-ms 500]
+
+Read-only checks run by default. ``--mutating`` adds create/read/cancel flows
+for orders and reservations, which write to the database.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from harness import auth
+from harness.api import NUMBER, ApiClient, ApiResponse, optional, validate
+
+REPLACES = {"tests/TC014", "testsprite_tests/TC011"}
+
+DEFAULT_BUDGET_MS = float(os.environ.get("HARNESS_API_BUDGET_MS", "500"))
+
+MISSING = "__harness_missing__"
+
+PRODUCT = {
+    "id": str,
+    "name": str,
+    "category_id": optional(str),
+    "price": optional(NUMBER),
+    "is_available": optional(bool),
+    "prices": optional([{"size_name": str, "price": NUMBER}]),
+    "ingredients": [str],
+    "allergens": [str],
+}
+CATEGORY = {"id": str, "name": str, "subcategories": [{"id": str, "name": str}]}
+ORDER = {"id": int, "order_number": str, "status": str, "total_amount": NUMBER}
+ORDERS_PAGE = {
+    "data": [dict(ORDER, items=[dict])],
+    "meta": {"total": optional(int), "page": int, "limit": int, "pages": int},
+}
+RESERVATION = {"reservation_code": str, "email": str, "status": str}
+SUMMARY = {
+    "totalOrders": optional(int),
+    "revenue": NUMBER,
+    "statusBreakdown": {name: int for name in ("pending", "preparing", "ready", "completed", "cancelled")},
+}
+
+
+def _first(key: str, field_name: str, unwrap: str | None = None) -> Callable[[Any, dict], None]:
+    """Capture ``body[0][field_name]`` (or ``body[unwrap][0]...``) into ``ctx[key]``."""
+
+    def capture(body: Any, ctx: dict) -> None:
+        items = body.get(unwrap) if unwrap and isinstance(body, dict) else body
+        if isinstance(items, list) and items:
+            ctx[key] = items[0][field_name]
+
+    return capture
+
+
+def _field(key: str, field_name: str) -> Callable[[Any, dict], None]:
+    def capture(body: Any, ctx: dict) -> None:
+        ctx[key] = body[field_name]
+
+    return capture
+
+
+@dataclass
+class Check:
+    method: str
+    path: str
+    status: int
+    schema: Any = None
+    options: dict = field(default_factory=dict)
+    capture: Callable[[Any, dict], None] | None = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+
+@dataclass
+class CheckResult:
+    name: str
+    path: str
+    expected: int
+    status: int | None = None
+    elapsed_ms: float = 0.0
+    errors: list[str] = field(default_factory=list)
+    skipped: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.skipped or not self.errors
+
+
+# Collection reads; they also capture ids for the checks that follow.
+DISCOVERY = [
+    Check("GET", "/api/products", 200, [PRODUCT], capture=_first("product", "id")),
+    Check("GET", "/api/categories", 200, [CATEGORY], capture=_first("category", "id")),
+    Check("GET", "/api/orders", 200, ORDERS_PAGE, capture=_first("order", "order_number", unwrap="data")),
+    Check("GET", "/api/reservations", 200, [RESERVATION], capture=_first("reservation", "reservation_code")),
+]
+
+READ_ONLY = [
+    Check("GET", "/api/products?search=pizza", 200, [PRODUCT]),
+    Check("GET", "/api/products?sort=price_asc&limit=5", 200, [PRODUCT]),
+    Check("GET", "/api/products/{product}", 200, PRODUCT),
+    Check("GET", f"/api/products/{MISSING}", 404),
+    Check("POST", "/api/products", 400, options={"json": {"name": "x"}}),
+    Check("PUT", "/api/products/{product}", 400, options={"json": {"name": "x"}}),
+    Check("DELETE", f"/api/products/{MISSING}", 404),
+    Check("POST", "/api/categories", 400, options={"json": {"name": "x"}}),
+    Check("POST", "/api/categories", 400, options={"multipart": {"name": ""}}),
+    Check("PUT", "/api/categories/{category}", 400, options={"json": {"name": "x"}}),
+    Check("DELETE", f"/api/categories/{MISSING}", 404),
+    Check("GET", "/api/orders?status=pending&limit=5", 200, ORDERS_PAGE),
+    Check("GET", "/api/orders/summary", 200, SUMMARY),
+    Check("GET", "/api/orders/{order}", 200, ORDER),
+    Check("GET", f"/api/orders/{MISSING}", 404),
+    Check("GET", "/api/orders/{order}/status", 200, {"status": str}),
+    Check("PUT", "/api/orders/{order}/status", 400, options={"json": {}}),
+    Check("PUT", "/api/orders/{order}/status", 400, options={"json": {"status": "bogus"}}),
+    Check("POST", "/api/reservations", 400, options={"json": {}}),
+    Check("GET", "/api/reservations?email=nobody@example.invalid", 200, [RESERVATION]),
+    Check("GET", "/api/reservations/{reservation}", 200, RESERVATION),
+    Check("GET", f"/api/reservations/{MISSING}", 404),
+    Check("GET", "/api/settings", 200, dict),
+    Check("PUT", "/api/settings", 400, options={"data": "not json", "headers": {"content-type": "application/json"}}),
+    Check("POST", "/api/upload", 400, options={"multipart": {"folder": "harness"}}),
+    Check("GET", "/api/debug", 200, {"status": str}),
+]
+
+SAMPLE_RESERVATION = {
+    "fullName": "Harness Check",
+    "email": "harness@example.invalid",
+    "phoneNumber": "999999999",
+    "reservationDate": "2099-01-01",
+    "reservationTime": "20:00",
+    "numberOfGuests": 2,
+}
+
+
+def sample_order() -> dict:
+    return {
+        "customer_email": "harness@example.invalid",
+        "customer_phone": "999999999",
+        "payment_method": "cash",
+        "subtotal": 25.42,
+        "tax_amount": 4.58,
+        "service_fee": 0,
+        "total_amount": 30.0,
+        "items": [
+            {"product_id": "{product}", "product_name": "Harness item", "quantity": 1, "unit_price": 30.0, "subtotal": 30.0}
+        ],
+    }
+
+
+# Sequential create/read/update flows, only with --mutating.
+MUTATING_FLOWS = [
+    [
+        Check("POST", "/api/reservations", 200, RESERVATION, options={"json": SAMPLE_RESERVATION},
+              capture=_field("new_reservation", "reservation_code")),
+        Check("GET", "/api/reservations/{new_reservation}", 200, RESERVATION),
+        Check("PUT", "/api/reservations/{new_reservation}", 200, RESERVATION, options={"json": {"status": "cancelled"}}),
+    ],
+    [
+        Check("POST", "/api/orders", 200, ORDER, options={"json": sample_order()},
+              capture=_field("new_order", "order_number")),
+        Check("GET", "/api/orders/{new_order}/status", 200, {"status": str}),
+        Check("PUT", "/api/orders/{new_order}/cancel", 200, ORDER),
+    ],
+]
+
+
+def _fill(value: Any, ctx: dict) -> Any:
+    if isinstance(value, str):
+        return value.format(**ctx)
+    if isinstance(value, dict):
+        return {key: _fill(item, ctx) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_fill(item, ctx) for item in value]
+    return value
+
+
+async def run_check(api: ApiClient, check: Check, ctx: dict, budget_ms: float) -> CheckResult:
+    result = CheckResult(check.name, check.path, check.status)
+    try:
+        path = check.path.format(**ctx)
+        options = _fill(check.options, ctx)
+    except KeyError:
+        # Nothing to address (e.g. no orders yet): not a failure.
+        result.skipped = True
+        return result
+    response: ApiResponse = await api.call(check.method, path, **options)
+    result.path, result.status, result.elapsed_ms = path, response.status, response.elapsed_ms
+    if response.status != check.status:
+        result.errors.append(f"status {response.status}, expected {check.status}")
+    elif check.schema is not None:
+        result.errors.extend(validate(response.body, check.schema))
+    if response.elapsed_ms > budget_ms:
+        result.errors.append(f"{response.elapsed_ms:.0f} ms over the {budget_ms:.0f} ms budget")
+    if check.capture is not None and response.ok and not result.errors:
+        check.capture(response.body, ctx)
+    return result
+
+
+async def run_flow(api: ApiClient, checks: list[Check], ctx: dict, budget_ms: float) -> list[CheckResult]:
+    results = []
+    for check in checks:
+        results.append(await run_check(api, check, ctx, budget_ms))
+    return results
+
+
+async def run_checks(
+    api: ApiClient, mutating: bool = False, budget_ms: float = DEFAULT_BUDGET_MS
+) -> list[CheckResult]:
+    ctx: dict[str, Any] = {}
+    results = list(await asyncio.gather(*(run_check(api, c, ctx, budget_ms) for c in DISCOVERY)))
+    flows = [[check] for check in READ_ONLY] + (MUTATING_FLOWS if mutating else [])
+    for flow_results in await asyncio.gather(*(run_flow(api, flow, ctx, budget_ms) for flow in flows)):
+        results.extend(flow_results)
+    return results
+
+
+def format_results(results: list[CheckResult]) -> str:
+    lines = []
+    for r in results:
+        mark = "SKIP" if r.skipped else ("ok" if r.ok else "FAIL")
+        status = "-" if r.status is None else r.status
+        lines.append(f"{mark:<4} {status:>3} {r.elapsed_ms:7.1f} ms  {r.name.split(' ')[0]:<6} {r.path}")
+        lines.extend(f"            {error}" for error in r.errors[:5])
+    return "\n".join(lines)
+
+
+async def run_as_test(storage_state: Any = None) -> None:
+    """Runner entry point: raise ``AssertionError`` listing every failed check."""
+    async with ApiClient(storage_state=storage_state) as api:
+        results = await run_checks(api)
+    failed = [r for r in results if not r.ok]
+    if failed:
+        raise AssertionError(f"{len(failed)} API check(s) failed:\n{format_results(failed)}")
+
+
+async def _main(args: argparse.Namespace) -> int:
+    started = time.perf_counter()
+    # Reuse the harness's admin session when one is cached; the routes
+    # themselves do not require it.
+    state = auth.AUTH_DIR / "tests.json"
+    async with ApiClient(storage_state=state if auth.is_fresh(state) else None) as api:
+        results = await run_checks(api, mutating=args.mutating, budget_ms=args.budget_ms)
+    print(format_results(results))
+    failed = sum(not r.ok for r in results)
+    print(f"\n{len(results) - failed}/{len(results)} checks passed in {time.perf_counter() - started:.2f}s")
+    return 1 if failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.api_checks", description="Check every /api/* route.")
+    parser.add_argument("--mutating", action="store_true", help="also run create/cancel flows (writes data)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="per-request latency budget")
+    return asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""One in-page evaluation for a run of ``to_be_visible`` assertions.
+
+The generated scripts end with long chains of
+``await expect(frame.locator('text=...').first).to_be_visible(timeout=30000)``
+(27 in TC015, 26 in TC018): one round trip and one polling loop each, and
+the first missing text fails the test after its full timeout without saying
+anything about the rest. ``ExpectBatchRewriter`` folds such a chain into a
+single :meth:`Assertions.expect_visible` call, which checks every selector on
+each animation frame and, on timeout, reports all missing items at once.
+
+Matching follows Playwright's selector engines and ``.first`` for what the
+scripts use: ``text=foo`` picks the first element whose case-insensitive,
+whitespace-normalised text contains ``foo`` and has no child that does on its
+own (``text="foo"`` must be the element's whole text); ``xpath=`` and CSS
+take their first match. That element itself must be visible, so text in a
+hidden element or split across unrelated ones does not pass.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING
+
+from playwright.async_api import Error, Page, TimeoutError
+
+if TYPE_CHECKING:
+    from harness.session import Session
+
+_CHECK_JS = """({ items, report }) => {
+  const norm = (s) => (s || "").replace(/\\s+/g, " ").trim();
+  const visible = (el) => {
+    const rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== "hidden";
+  };
+  const skipped = new Set(["SCRIPT", "STYLE", "NOSCRIPT", "TEMPLATE", "HEAD"]);
+  let elements = null;
+  const texts = new Map();
+  // Every element's text, read once per frame and shared by all the text= items.
+  const all = () => elements ?? (elements = document.body
+    ? [...document.body.querySelectorAll("*")].filter((el) => !skipped.has(el.tagName)) : []);
+  const textOf = (el) => {
+    if (!texts.has(el)) texts.set(el, norm(el.textContent).toLowerCase());
+    return texts.get(el);
+  };
+  // Like Playwright's text engine: the first element, in document order, whose
+  // text matches and none of whose children matches on its own.
+  const firstText = (selector) => {
+    const needle = selector.slice(5);
+    const exact = /^(["']).*\\1$/.test(needle);
+    const wanted = norm(exact ? needle.slice(1, -1) : needle).toLowerCase();
+    const matches = (el) => (exact ? textOf(el) === wanted : textOf(el).includes(wanted));
+    return all().find((el) => matches(el) && ![...el.children].some(matches)) || null;
+  };
+  const first = (selector) => {
+    if (selector.startsWith("text=")) return firstText(selector);
+    try {
+      if (selector.startsWith("xpath=") || selector.startsWith("//")) {
+        return document.evaluate(selector.replace(/^xpath=/, ""), document, null,
+                                 XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+      }
+      return document.querySelector(selector.replace(/^css=/, ""));
+    } catch (e) {
+      return null;
+    }
+  };
+  // locator(...).first must itself be visible, as to_be_visible() requires.
+  const missing = items.filter((item) => {
+    const el = first(item);
+    return !(el instanceof Element && visible(el));
+  });
+  return report ? missing : missing.length === 0;
+}"""
+
+
+class Assertions:
+    def __init__(self, session: "Session"):
+        self.session = session
+
+    async def expect_visible(self, page: Page, selectors: list[str], timeout_ms: float) -> None:
+        """Assert every selector in ``selectors`` is visible within ``timeout_ms``."""
+        deadline = time.perf_counter() + timeout_ms / 1000
+        while True:
+            remaining = max(1.0, (deadline - time.perf_counter()) * 1000)
+            try:
+                await page.wait_for_function(
+                    _CHECK_JS, arg={"items": selectors, "report": False}, polling="raf", timeout=remaining
+                )
+                return
+            except TimeoutError:
+                break
+            except Error:
+                # A navigation destroyed the execution context; poll the new document.
+                if time.perf_counter() >= deadline:
+                    break
+                await asyncio.sleep(0.05)
+        missing = await page.evaluate(_CHECK_JS, {"items": selectors, "report": True})
+        if missing:
+            listed = "\n".join(f"  - {item}" for item in missing)
+            raise AssertionError(
+                f"{len(missing)} of {len(selectors)} expected elements not visible after {timeout_ms:.0f} ms:\n{listed}"
+            )
@@ -0,0 +1,124 @@
+"""Admin login performed once per run and reused as Playwright ``storage_state``.
+
+``middleware.ts`` lets a request into ``/admin`` when the Supabase session
+cookie (``sb-<ref>-auth-token``, possibly split into ``.0``/``.1`` chunks)
+holds a valid session. The harness logs in through ``/login`` once, saves the
+context's storage state and starts admin tests from it. The saved state is
+checked before every use and refreshed when the session is about to expire;
+``exclusive`` keeps concurrent sessions and workers from logging in at the
+same time.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import fcntl
+import json
+import re
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+from playwright.async_api import Error
+
+from harness import config
+from harness.pool import BrowserPool
+
+AUTH_DIR = config.STATE_DIR / "auth"
+
+# Refresh this long before the access token actually expires.
+EXPIRY_MARGIN = 300
+
+_COOKIE_RE = re.compile(r"^sb-.+-auth-token(?:\.(\d+))?$")
+
+# Sessions of one worker wait here; workers wait on the file lock.
+_waiting: dict[tuple[int, Path], asyncio.Lock] = {}
+
+
+def session_expiry(state: dict) -> float | None:
+    """Expiry (epoch seconds) of the Supabase session stored in ``state``."""
+    chunks: dict[int, str] = {}
+    cookie_expiry = None
+    for cookie in state.get("cookies", []):
+        match = _COOKIE_RE.match(cookie.get("name", ""))
+        if match:
+            chunks[int(match.group(1) or 0)] = cookie.get("value", "")
+            if cookie.get("expires", -1) > 0:
+                cookie_expiry = min(cookie_expiry or cookie["expires"], cookie["expires"])
+    if not chunks:
+        return None
+    raw = "".join(chunks[index] for index in sorted(chunks))
+    try:
+        if raw.startswith("base64-"):
+            encoded = raw[len("base64-"):]
+            raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)).decode("utf-8")
+        expires_at = json.loads(raw).get("expires_at")
+    except (ValueError, UnicodeDecodeError, AttributeError):
+        expires_at = None
+    candidates = [value for value in (expires_at, cookie_expiry) if value]
+    return float(min(candidates)) if candidates else None
+
+
+def is_fresh(path: Path, margin: float = EXPIRY_MARGIN) -> bool:
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return False
+    expiry = session_expiry(state)
+    return expiry is not None and expiry - margin > time.time()
+
+
+@asynccontextmanager
+async def exclusive(path: Path):
+    """Hold ``path``'s lock against other sessions of this process and other workers.
+
+    flock is per open file, so two coroutines of one process would both get
+    it, or the second would block the event loop the first needs to finish.
+    They queue on an ``asyncio.Lock`` first; the flock is taken off the loop.
+    """
+    loop = asyncio.get_running_loop()
+    async with _waiting.setdefault((id(loop), path), asyncio.Lock()):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path.with_suffix(".lock"), "w") as lock:
+            await loop.run_in_executor(None, fcntl.flock, lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+async def login(pool: BrowserPool, suite: str, path: Path) -> Path:
+    """Log in through ``/login`` in a throwaway context and save its storage state."""
+    email, password = config.admin_credentials(suite)
+    if not email or not password:
+        raise RuntimeError("admin credentials missing: set HARNESS_ADMIN_EMAIL / HARNESS_ADMIN_PASSWORD")
+    context = await pool.new_context()
+    try:
+        page = await context.new_page()
+        await page.goto(f"{config.BASE_URL}/login")
+        await page.fill("#email", email)
+        await page.fill("#password", password)
+        await page.click("form button[type=submit]")
+        try:
+            await page.wait_for_url("**/admin**", timeout=15000)
+        except Error as exc:
+            raise RuntimeError(f"admin login failed, still on {page.url}") from exc
+        tmp = path.with_suffix(".tmp")
+        await context.storage_state(path=tmp)
+        tmp.replace(path)
+    finally:
+        await context.close()
+    return path
+
+
+async def admin_state(pool: BrowserPool, suite: str) -> Path:
+    """Path to a storage state with a live admin session for ``suite``, logging in if needed."""
+    path = AUTH_DIR / f"{suite}.json"
+    if is_fresh(path):
+        return path
+    async with exclusive(path):
+        # Another session or worker may have refreshed it while we waited for the lock.
+        if not is_fresh(path):
+            await login(pool, suite, path)
+    return path
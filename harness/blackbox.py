@@ -0,0 +1,181 @@
+"""Flight recorder: the last few seconds of a test, written out only if it fails.
+
+Recording a video of every test (what TestSprite's ``testVisualization``
+links are) is expensive. Instead each session keeps a ring buffer of the last
+``WINDOW_S`` seconds, capped at ``MAX_BYTES``:
+
+* screencast frames pushed by Chromium when the page repaints (CDP
+  ``Page.startScreencast``, small JPEGs, nothing while the page is idle),
+* a DOM snapshot after every action step,
+* every request with its status and timing, console messages and page errors,
+* step boundaries from the tracer.
+
+When a step raises (an assertion failed, a timeout fired) a full-size
+screenshot and the DOM are captured on the spot, while the page is still
+open. Only a failing test writes anything: ``.harness/blackbox/<suite>/<TC>.zip``
+(``<TC>@<device>.zip`` for a device matrix leg)
+with ``manifest.json``, ``events.json``, ``frames/*.jpg`` and ``dom/*.html``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import os
+import time
+import zipfile
+from collections import deque
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from playwright.async_api import BrowserContext, ConsoleMessage, Error, Page, Request
+
+from harness.config import STATE_DIR
+from harness.rewrite import ACTIONS
+
+if TYPE_CHECKING:
+    from harness.session import Session
+    from harness.trace import Step
+
+BLACKBOX_DIR = STATE_DIR / "blackbox"
+WINDOW_S = float(os.environ.get("HARNESS_BLACKBOX_SECONDS", "30"))
+MAX_BYTES = 48 * 1024 * 1024
+
+# kind -> file bucket in the zip for payload-carrying entries.
+_FILES = {"frame": ("frames", "jpg"), "screenshot": ("frames", "png"), "dom": ("dom", "html")}
+
+
+class Ring:
+    """``(t, kind, data, size)`` entries of the last ``window_s`` seconds and ``max_bytes``."""
+
+    def __init__(self, window_s: float = WINDOW_S, max_bytes: int = MAX_BYTES):
+        self.window_s = window_s
+        self.max_bytes = max_bytes
+        self.entries: deque[tuple[float, str, Any, int]] = deque()
+        self.bytes = 0
+
+    def push(self, kind: str, data: Any, size: int = 0) -> None:
+        now = time.monotonic()
+        self.entries.append((now, kind, data, size))
+        self.bytes += size
+        while self.entries and (self.entries[0][0] < now - self.window_s or self.bytes > self.max_bytes):
+            self.bytes -= self.entries.popleft()[3]
+
+
+class BlackBox:
+    def __init__(self, session: "Session"):
+        self.session = session
+        self.enabled = session.options.blackbox
+        self.ring = Ring()
+        self._origin = time.monotonic()
+        self._tasks: set[asyncio.Task] = set()
+
+    # -- capture ------------------------------------------------------------
+
+    def attach(self, context: BrowserContext) -> None:
+        if not self.enabled:
+            return
+        context.on("page", lambda page: self._spawn(self._screencast(page)))
+        context.on("requestfinished", lambda r: self._spawn(self._request(r, None)))
+        context.on("requestfailed", lambda r: self._spawn(self._request(r, r.failure)))
+        context.on("console", self._console)
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _screencast(self, page: Page) -> None:
+        page.on("pageerror", lambda error: self.ring.push("pageerror", {"message": str(error)}))
+        try:
+            cdp = await page.context.new_cdp_session(page)
+
+            def frame(params: dict) -> None:
+                self.ring.push("frame", params["data"], len(params["data"]))
+                self._spawn(cdp.send("Page.screencastFrameAck", {"sessionId": params["sessionId"]}))
+
+            cdp.on("Page.screencastFrame", frame)
+            await cdp.send("Page.startScreencast", {
+                "format": "jpeg", "quality": 40, "maxWidth": 800, "maxHeight": 600, "everyNthFrame": 2,
+            })
+        except Error:
+            pass  # page closed before the screencast started
+
+    async def _request(self, request: Request, failure: str | None) -> None:
+        try:
+            response = None if failure else await request.response()
+        except Error:
+            response = None
+        timing = request.timing
+        self.ring.push("request", {
+            "method": request.method,
+            "url": request.url,
+            "status": response.status if response else None,
+            "failure": failure,
+            "ms": round(timing["responseEnd"], 1) if timing.get("responseEnd", -1) >= 0 else None,
+        })
+
+    def _console(self, message: ConsoleMessage) -> None:
+        self.ring.push("console", {"type": message.type, "text": message.text})
+
+    async def _snapshot(self, kind: str, full: bool = False) -> None:
+        page = self.session.page
+        if page is None or page.is_closed():
+            return
+        try:
+            if full:
+                shot = base64.b64encode(await page.screenshot(full_page=True)).decode()
+                self.ring.push("screenshot", shot, len(shot))
+            html = await page.content()
+            self.ring.push(kind, html, len(html))
+        except Error:
+            pass
+
+    async def step_ended(self, step: "Step") -> None:
+        """Tracer hook, called as every step finishes (successfully or not)."""
+        if not self.enabled:
+            return
+        self.ring.push("step", {
+            "index": step.index, "kind": step.kind, "label": step.label, "line": step.line,
+            "wall_ms": step.wall_ms, "error": step.error,
+        })
+        if step.error:
+            await self._snapshot("dom", full=True)
+        elif step.kind in ACTIONS:
+            await self._snapshot("dom")
+
+    # -- dump ---------------------------------------------------------------
+
+    async def dump(self, error: str) -> Path | None:
+        """Write the buffered window for a failed test; returns the zip path."""
+        if not self.enabled or not self.ring.entries:
+            return None
+        for task in list(self._tasks):
+            task.cancel()
+        script = self.session.script
+        path = BLACKBOX_DIR / script.suite / f"{self.session.artifact_name}.zip"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        events = []
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for number, (at, kind, data, _) in enumerate(self.ring.entries):
+                t_ms = round((at - self._origin) * 1000, 1)
+                if kind in _FILES:
+                    folder, ext = _FILES[kind]
+                    name = f"{folder}/{number:05d}-{t_ms:.0f}ms.{ext}"
+                    if ext == "html":
+                        archive.writestr(name, data)
+                    else:
+                        archive.writestr(name, base64.b64decode(data), compress_type=zipfile.ZIP_STORED)
+                    events.append({"t_ms": t_ms, "kind": kind, "file": name})
+                else:
+                    events.append({"t_ms": t_ms, "kind": kind, **data})
+            archive.writestr("events.json", json.dumps(events, indent=1, ensure_ascii=False))
+            archive.writestr("manifest.json", json.dumps({
+                "test": script.key,
+                "title": script.title,
+                "error": error,
+                "window_s": self.ring.window_s,
+                "entries": len(events),
+            }, indent=1, ensure_ascii=False))
+        return path
@@ -0,0 +1,291 @@
+"""Seed the cart straight into localStorage and check its totals as a table of cases.
+
+``CartContext`` mirrors the cart to ``localStorage["cart"]`` as a JSON list
+of ``CartItem`` (the normalized product, quantity, size, options). Instead
+of clicking through the menu to fill it, the cart is built from
+``/api/products`` and handed to ``new_context(storage_state=...)``, so it is
+there before the first page loads.
+
+Scripts whose plan entry has a ``cart`` field (``[{"product": id,
+"quantity": n, "size": name}]``, e.g. ``tests/TC004`` and ``tests/TC016``)
+open with that cart through ``Seed``; the rest of the script runs as
+written. The subtotal/IGV edge cases run as a table: each case opens
+``/cart`` on its own seeded context and compares the subtotal, IGV and total
+shown there with the values computed here the way ``CartContext`` computes
+them. The runner adds the table as an extra test, ``harness/CART``, to runs
+that include a seeded script. Standalone::
+
+    python -m harness.cart
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from dataclasses import dataclass, field
+from decimal import ROUND_HALF_UP, Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from playwright.async_api import Error
+
+from harness import config
+from harness.api import ApiClient
+from harness.plan import plan_entry
+from harness.pool import BrowserPool
+from harness.suite import TestScript
+
+if TYPE_CHECKING:
+    from harness.session import Session
+
+# The case table, run as a test of its own next to the seeded scripts.
+CASES = TestScript(path=Path(__file__).resolve(), suite="harness", test_id="CART", title="Cart totals case table")
+
+# CART_STORAGE_KEY in context/CartContext.tsx.
+STORAGE_KEY = "cart"
+
+# Prices include IGV: subtotal = total / (1 + IGV).
+IGV = 0.18
+
+# Edge-case sizes: one huge quantity, and a cart longer than any real order.
+MAX_QUANTITY = 999
+MANY_LINES = 40
+
+_TOTALS_JS = """() => {
+    const spans = [...document.querySelectorAll('span')];
+    const after = (label) => spans.find((s) => s.textContent.trim().startsWith(label))?.nextElementSibling?.textContent;
+    const before = (label) => spans.find((s) => s.textContent.trim() === label)?.previousElementSibling?.textContent;
+    return {
+        subtotal: after('Subtotal (Sin IGV)') ?? null,
+        tax: after('IGV (18%)') ?? null,
+        total: before('Incluye IGV') ?? null,
+        lines: document.querySelectorAll('main h3.text-lg').length,
+    };
+}"""
+
+
+@dataclass
+class Line:
+    """One cart line: a product id, how many, and the size for variable-price products."""
+
+    product: str
+    quantity: int = 1
+    size: str | None = None
+
+
+@dataclass
+class Case:
+    name: str
+    lines: list[Line]
+
+
+@dataclass
+class CaseResult:
+    name: str
+    elapsed_ms: float
+    expected: dict[str, str]
+    shown: dict[str, Any] = field(default_factory=dict)
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+
+def normalize(backend: dict) -> dict:
+    """The ``Product`` the frontend builds from an ``/api/products`` row (``normalizeProduct``)."""
+    sizes = {p["size_name"]: float(p["price"]) for p in backend.get("prices") or [] if p.get("size_name")}
+    price = sizes if backend.get("is_variable_price") and sizes else float(backend.get("price") or 0)
+    return {
+        "id": backend["id"],
+        "name": backend["name"],
+        "description": backend.get("description") or "",
+        "price": price,
+        "category": backend.get("category_id") or "",
+        "image_url": backend.get("image_url") or "",
+        "gallery": [],
+        "ingredients": [],
+        "allergens": backend.get("allergens") or [],
+    }
+
+
+def cart_items(lines: list[Line], catalog: dict[str, dict]) -> list[dict]:
+    """``CartItem`` objects as ``addToCart`` stores them."""
+    items = []
+    for line in lines:
+        options = {"selectedSize": line.size} if line.size else {}
+        items.append(
+            {"dish": catalog[line.product], "quantity": line.quantity, "selectedSize": line.size, "options": options}
+        )
+    return items
+
+
+def unit_price(item: dict) -> float:
+    price = item["dish"]["price"]
+    if isinstance(price, (int, float)):
+        return price
+    if item.get("selectedSize"):
+        return price[item["selectedSize"]]
+    return min(price.values())
+
+
+def totals(items: list[dict]) -> dict[str, float]:
+    """``cartTotal`` of ``CartContext``."""
+    total = sum(unit_price(item) * item["quantity"] for item in items)
+    subtotal = total / (1 + IGV)
+    return {"subtotal": subtotal, "tax": total - subtotal, "total": total}
+
+
+def to_fixed(value: float) -> str:
+    """``Number.prototype.toFixed(2)``: exact binary value, halves away from zero."""
+    return str(Decimal(value).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+def storage_state(items: list[dict], base: dict | None = None) -> dict:
+    """``base`` (or an empty state) with the cart written to the app origin's localStorage."""
+    state = json.loads(json.dumps(base or {"cookies": [], "origins": []}))
+    origin = next((o for o in state["origins"] if o["origin"] == config.BASE_URL), None)
+    if origin is None:
+        origin = {"origin": config.BASE_URL, "localStorage": []}
+        state["origins"].append(origin)
+    origin["localStorage"] = [e for e in origin["localStorage"] if e["name"] != STORAGE_KEY]
+    origin["localStorage"].append({"name": STORAGE_KEY, "value": json.dumps(items)})
+    return state
+
+
+def default_cases(catalog: dict[str, dict]) -> list[Case]:
+    """Subtotal/IGV edge cases over whatever products the catalog has."""
+    products = list(catalog.values())
+    fixed = [p for p in products if isinstance(p["price"], (int, float))]
+    sized = [p for p in products if isinstance(p["price"], dict)]
+    cases = [Case("empty cart", [])]
+    if fixed:
+        first = fixed[0]["id"]
+        cases += [
+            Case("one line", [Line(first)]),
+            Case("quantity 3", [Line(first, 3)]),
+            Case("zero quantity", [Line(first, 0), Line(fixed[-1]["id"], 2)]),
+            Case("max quantity", [Line(first, MAX_QUANTITY)]),
+            Case("same dish twice", [Line(first), Line(first, 2)]),
+            Case("every dish", [Line(p["id"], index % 3 + 1) for index, p in enumerate(fixed)]),
+            Case("many lines", [Line(fixed[i % len(fixed)]["id"], i % 5 + 1) for i in range(MANY_LINES)]),
+        ]
+    for product in sized[:2]:
+        sizes = sorted(product["price"], key=product["price"].get)
+        cases += [Case(f"{product['id']} {size}", [Line(product["id"], 2, size)]) for size in sizes]
+        cases.append(Case(f"{product['id']} no size (cheapest)", [Line(product["id"], 1)]))
+    return cases
+
+
+async def load_catalog() -> dict[str, dict]:
+    async with ApiClient() as api:
+        response = await api.get("/api/products")
+    if not response.ok or not isinstance(response.body, list):
+        raise RuntimeError(f"GET /api/products answered {response.status}")
+    return {row["id"]: normalize(row) for row in response.body}
+
+
+class Seed:
+    """The cart a script opens with: the ``cart`` field of its plan entry."""
+
+    def __init__(self, session: "Session"):
+        self.session = session
+        self.lines = [Line(**line) for line in plan_entry(session.script).get("cart") or []]
+
+    async def context_options(self, options: dict[str, Any]) -> dict[str, Any]:
+        """Write the cart into the storage state of the script's first context.
+
+        Applied on top of whatever state the context starts from (the admin
+        session, a fork snapshot), so only the cart entry is replaced.
+        """
+        if not self.lines or self.session.contexts:
+            return options
+        base = options.get("storage_state")
+        if isinstance(base, (str, Path)):
+            base = json.loads(Path(base).read_text(encoding="utf-8"))
+        items = cart_items(self.lines, await load_catalog())
+        return {**options, "storage_state": storage_state(items, base)}
+
+
+def case_table(scripts: list[TestScript]) -> list[TestScript]:
+    """``[CASES]`` when ``scripts`` include one that seeds its cart, else nothing."""
+    if CASES in scripts or not any(plan_entry(script).get("cart") for script in scripts):
+        return []
+    return [CASES]
+
+
+async def check(pool: BrowserPool, case: Case, catalog: dict[str, dict]) -> CaseResult:
+    """Open ``/cart`` with the case's cart seeded and compare the totals shown."""
+    started = time.perf_counter()
+    items = cart_items(case.lines, catalog)
+    expected = {name: to_fixed(value) for name, value in totals(items).items()}
+    result = CaseResult(case.name, 0.0, expected)
+    context = await pool.new_context(storage_state=storage_state(items))
+    try:
+        page = await context.new_page()
+        await page.goto(f"{config.BASE_URL}/cart", wait_until="domcontentloaded")
+        if items:
+            await page.wait_for_function(
+                "n => document.querySelectorAll('main h3.text-lg').length >= n", arg=len(items),
+                timeout=config.DEFAULT_TIMEOUT_MS,
+            )
+        result.shown = await page.evaluate(_TOTALS_JS)
+        for name, value in expected.items():
+            shown = (result.shown.get(name) or "").strip()
+            if shown != f"S./{value}":
+                result.errors.append(f"{name}: shown {shown or 'nothing'}, expected S./{value}")
+        if result.shown.get("lines") != len(items):
+            result.errors.append(f"{result.shown.get('lines')} cart lines shown, expected {len(items)}")
+        saved = await page.evaluate("key => localStorage.getItem(key)", STORAGE_KEY)
+        if json.loads(saved or "[]") != items:
+            result.errors.append("the cart in localStorage changed on load")
+    except Error as exc:
+        result.errors.append(str(exc).splitlines()[0])
+    finally:
+        await context.close()
+    result.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+async def run_cases(pool: BrowserPool, cases: list[Case] | None = None) -> list[CaseResult]:
+    catalog = await load_catalog()
+    cases = default_cases(catalog) if cases is None else cases
+    return list(await asyncio.gather(*(check(pool, case, catalog) for case in cases)))
+
+
+def format_results(results: list[CaseResult]) -> str:
+    lines = []
+    for r in results:
+        lines.append(f"{'ok' if r.ok else 'FAIL':<4} {r.elapsed_ms:7.1f} ms  {r.name}  (total S./{r.expected['total']})")
+        lines.extend(f"            {error}" for error in r.errors)
+    return "\n".join(lines)
+
+
+async def run_as_test(pool: BrowserPool) -> None:
+    """Runner entry point: raise ``AssertionError`` listing every failed case."""
+    results = await run_cases(pool)
+    failed = [r for r in results if not r.ok]
+    if failed:
+        raise AssertionError(f"{len(failed)} cart case(s) failed:\n{format_results(failed)}")
+
+
+async def _main() -> int:
+    started = time.perf_counter()
+    async with BrowserPool() as pool:
+        results = await run_cases(pool)
+    print(format_results(results))
+    failed = sum(not r.ok for r in results)
+    print(f"\n{len(results) - failed}/{len(results)} cart cases passed in {time.perf_counter() - started:.2f}s")
+    return 1 if failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    argparse.ArgumentParser(prog="python -m harness.cart", description="Check cart totals on seeded carts.").parse_args(argv)
+    return asyncio.run(_main())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,281 @@
+"""Synthetic menu catalogs and the latency of ``GET /api/products`` over them.
+
+``generate(n)`` builds ``n`` products on the real categories of
+``data/categories.json``, with the rows the route embeds: sizes and prices
+for the variable-price share, ingredients, allergens and gallery images.
+``load`` pushes a catalog into the Supabase stub (``/__stub/load``) in chunks.
+The benchmark then times the queries ``app/api/products/route.ts`` builds:
+the default listing, ``search`` (``name.ilike.%q% OR description.ilike.%q%``)
+for a common term, a rare one and a miss, a category filter and the sorts.
+
+By default the queries go straight to the stub's PostgREST with the route's
+exact ``select``/``or``/``order``, on a stub started in-process. Those are
+stub timings: the stub answers every query with a Python linear scan, with
+no indexes and no query planner, so their latency and scaling exponent
+describe the test double, not ``/api/products`` on Postgres. What does carry
+over is the shape of the answers (rows, bytes, the 1000-row max-rows cap).
+The report says which it measured. With ``--stub-url`` and ``--via-app`` the
+queries go through the Next.js route instead, which must then be running
+against that stub (``python -m harness.stub``). For each query the report
+gives the median latency per size and the scaling exponent between the
+smallest and largest catalog (1 = linear)::
+
+    python -m harness.catalog [--sizes 1000 10000 100000] [--repeat 3] [--limit N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any
+from urllib.parse import urlencode
+
+from harness import config
+from harness.api import ApiClient
+from harness.stub import StubServer
+from harness.stub.db import categories_from_json
+
+SIZES = (1_000, 10_000, 100_000)
+REPEAT = 3
+BENCH_DIR = config.STATE_DIR / "bench"
+
+# Rows per /__stub/load request.
+CHUNK = 5_000
+
+# Share of products sold in sizes (pizzas, jarras, ...).
+VARIABLE_PRICE_SHARE = 0.15
+
+# One description in RARE_EVERY mentions RARE_TERM.
+RARE_TERM = "trufa"
+RARE_EVERY = 1_000
+
+DISHES = ["Lomo saltado", "Arroz chaufa", "Ceviche", "Tiradito", "Causa", "Ají", "Tallarín saltado", "Sudado",
+          "Anticucho", "Milanesa", "Fetuccine", "Pizza", "Chupe", "Sopa criolla", "Tacu tacu", "Jalea", "Parihuela"]
+PROTEINS = ["pollo", "lomo", "pescado", "langostinos", "pulpo", "cerdo", "pato", "cordero", "champiñones", "alpaca"]
+STYLES = ["a lo pobre", "criollo", "norteño", "al pesto", "a la huancaína", "en salsa de rocoto", "de la casa",
+          "nikkei", "al wok", "especial", "al olivo", "a la chorrillana"]
+INGREDIENTS = ["cebolla", "tomate", "ají amarillo", "ají panca", "culantro", "limón", "papa amarilla", "yuca",
+               "choclo", "camote", "arroz", "queso fresco", "huevo", "sillao", "kion", "ajo", "rocoto", "maní"]
+ALLERGENS = ["Gluten", "Lácteos", "Huevo", "Mariscos", "Pescado", "Maní", "Soya", "Frutos secos"]
+SIZE_NAMES = [("personal", 1.0), ("mediano", 1.6), ("familiar", 2.4)]
+
+PRODUCTS_SELECT = ",".join([
+    "*",
+    "category:categories(id,name,description,image_url)",
+    "subcategory:subcategories(id,name,description)",
+    "prices:product_prices(size_name,price)",
+    "ingredients:product_ingredients(ingredient_name)",
+    "allergens:product_allergens(allergen_name)",
+    "gallery:product_gallery(image_url,display_order)",
+])
+
+CHILD_TABLES = ("product_prices", "product_ingredients", "product_allergens", "product_gallery")
+
+
+def generate(size: int, seed: int = 0) -> dict[str, list[dict]]:
+    """``{table: rows}`` for ``size`` products and their embedded rows."""
+    rng = random.Random(seed)
+    taxonomy = categories_from_json()
+    subcategories: dict[str, list[str]] = {}
+    for sub in taxonomy["subcategories"]:
+        subcategories.setdefault(sub["category_id"], []).append(sub["id"])
+    categories = [c["id"] for c in taxonomy["categories"]]
+    epoch = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    data: dict[str, list[dict]] = {"products": [], **{name: [] for name in CHILD_TABLES}}
+    for index in range(size):
+        product_id = f"bench-{index:06d}"
+        category = rng.choice(categories)
+        protein = rng.choice(PROTEINS)
+        ingredients = rng.sample(INGREDIENTS, rng.randint(3, 8))
+        words = [protein, *ingredients[:3]] + ([RARE_TERM] if index % RARE_EVERY == RARE_EVERY - 1 else [])
+        variable = rng.random() < VARIABLE_PRICE_SHARE
+        price = round(rng.uniform(8, 90), 1)
+        data["products"].append({
+            "id": product_id,
+            "name": f"{rng.choice(DISHES)} de {protein} {rng.choice(STYLES)}",
+            "description": f"Preparado con {', '.join(words)}. Receta {rng.choice(STYLES)} de la casa.",
+            "category_id": category,
+            "subcategory_id": rng.choice(subcategories[category]) if category in subcategories else None,
+            "image_url": "/no-found.png",
+            "price": price,
+            "is_variable_price": variable,
+            "is_available": rng.random() > 0.05,
+            "is_vegetarian": protein == "champiñones",
+            "is_spicy": "rocoto" in ingredients,
+            "is_recommended": rng.random() < 0.1,
+            "display_order": index,
+            "created_at": (epoch + timedelta(minutes=index * 7)).isoformat().replace("+00:00", "Z"),
+        })
+        if variable:
+            data["product_prices"] += [
+                {"product_id": product_id, "size_name": name, "price": round(price * factor, 1)}
+                for name, factor in SIZE_NAMES
+            ]
+        data["product_ingredients"] += [{"product_id": product_id, "ingredient_name": i} for i in ingredients]
+        data["product_allergens"] += [
+            {"product_id": product_id, "allergen_name": a} for a in rng.sample(ALLERGENS, rng.randint(0, 3))
+        ]
+        data["product_gallery"] += [
+            {"product_id": product_id, "image_url": f"/gallery/{product_id}-{n}.webp", "display_order": n}
+            for n in range(rng.randint(0, 3))
+        ]
+    return data
+
+
+def queries(category: str) -> dict[str, dict[str, str]]:
+    """Query name -> ``/api/products`` search params."""
+    return {
+        "default": {},
+        "search common": {"search": PROTEINS[0]},
+        "search rare": {"search": RARE_TERM},
+        "search miss": {"search": "xyzzy"},
+        "category": {"category": category},
+        "sort price_asc": {"sort": "price_asc"},
+        "sort newest": {"sort": "newest"},
+    }
+
+
+def rest_path(params: dict[str, str]) -> str:
+    """The PostgREST request ``route.ts`` makes through supabase-js for ``params``."""
+    query = [("select", PRODUCTS_SELECT)]
+    if params.get("category"):
+        query.append(("category_id", f"eq.{params['category']}"))
+    if params.get("search"):
+        q = params["search"]
+        query.append(("or", f"(name.ilike.%{q}%,description.ilike.%{q}%)"))
+    order = {"price_asc": "price.asc", "price_desc": "price.desc", "newest": "created_at.desc"}
+    query.append(("order", order.get(params.get("sort", ""), "display_order.asc")))
+    if params.get("limit"):
+        query.append(("limit", params["limit"]))
+    return f"/rest/v1/products?{urlencode(query)}"
+
+
+async def load(stub: ApiClient, data: dict[str, list[dict]]) -> dict[str, int]:
+    """Replace the stub's products (and their child rows) with ``data``."""
+    counts = {}
+    for table, rows in data.items():
+        for start in range(0, max(len(rows), 1), CHUNK):
+            truncate = "1" if start == 0 else "0"
+            response = await stub.post(f"/__stub/load?truncate={truncate}", json={table: rows[start:start + CHUNK]})
+            if not response.ok:
+                raise RuntimeError(f"loading {table} into the stub answered {response.status}")
+            counts.update(response.body)
+    return counts
+
+
+async def time_query(client: ApiClient, path: str, repeat: int) -> dict[str, Any]:
+    await client.get(path)  # warm-up: first-touch indexes, JIT in the route
+    samples, response = [], None
+    for _ in range(repeat):
+        response = await client.get(path)
+        samples.append(response.elapsed_ms)
+    rows = len(response.body) if isinstance(response.body, list) else None
+    return {
+        "status": response.status,
+        "median_ms": round(statistics.median(samples), 1),
+        "max_ms": round(max(samples), 1),
+        "rows": rows,
+        "bytes": response.size,
+    }
+
+
+def scaling(results: dict[int, dict[str, dict]]) -> dict[str, float | None]:
+    """Per query, the exponent ``k`` of latency ~ size**k between the extreme sizes."""
+    sizes = sorted(results)
+    exponents: dict[str, float | None] = {}
+    for name in results[sizes[0]]:
+        first, last = results[sizes[0]][name]["median_ms"], results[sizes[-1]][name]["median_ms"]
+        if len(sizes) < 2 or first <= 0 or last <= 0:
+            exponents[name] = None
+        else:
+            exponents[name] = round(math.log(last / first) / math.log(sizes[-1] / sizes[0]), 2)
+    return exponents
+
+
+async def benchmark(
+    stub_url: str, sizes: tuple[int, ...] = SIZES, repeat: int = REPEAT,
+    via_app: bool = False, limit: int | None = None,
+) -> dict:
+    category = categories_from_json()["categories"][0]["id"]
+    results: dict[int, dict[str, dict]] = {}
+    async with ApiClient(base_url=stub_url, timeout_ms=600_000) as stub, ApiClient(timeout_ms=600_000) as app:
+        client = app if via_app else stub
+        try:
+            for size in sizes:
+                started = time.perf_counter()
+                counts = await load(stub, generate(size))
+                print(f"{size:>7} products loaded in {time.perf_counter() - started:.1f}s: {counts}")
+                results[size] = {}
+                for name, params in queries(category).items():
+                    if limit:
+                        params = {**params, "limit": str(limit)}
+                    path = f"/api/products?{urlencode(params)}" if via_app else rest_path(params)
+                    results[size][name] = await time_query(client, path, repeat)
+        finally:
+            await stub.post("/__stub/reset")
+    return {
+        "measured": "app" if via_app else "stub",
+        "target": config.BASE_URL + "/api/products" if via_app else stub_url + "/rest/v1/products",
+        "repeat": repeat,
+        "limit": limit,
+        "results": {str(size): by_query for size, by_query in results.items()},
+        "scaling": scaling(results),
+    }
+
+
+def format_report(report: dict) -> str:
+    sizes = list(report["results"])
+    names = list(report["scaling"])
+    lines = [] if report["measured"] == "app" else [
+        "stub timings: Python linear scans without indexes or a query planner; the latency and scaling",
+        "below describe the stub, not /api/products on Postgres (use --stub-url ... --via-app for that)\n",
+    ]
+    lines += [f"{'query':<16}" + "".join(f"{int(s):>10,}" for s in sizes) + "   scaling"]
+    for name in names:
+        cells = "".join(f"{report['results'][s][name]['median_ms']:>8.1f}ms" for s in sizes)
+        k = report["scaling"][name]
+        lines.append(f"{name:<16}{cells}   {'-' if k is None else f'n^{k:.2f}'}")
+    last = report["results"][sizes[-1]]
+    lines.append("")
+    lines += [f"{name:<16}{last[name]['rows'] or 0:>10,} rows {last[name]['bytes'] / 1e6:>8.1f} MB at {int(sizes[-1]):,}"
+              for name in names]
+    return "\n".join(lines)
+
+
+async def _main(args: argparse.Namespace) -> int:
+    sizes = tuple(sorted(args.sizes))
+    if args.stub_url:
+        report = await benchmark(args.stub_url, sizes, args.repeat, args.via_app, args.limit)
+    else:
+        with StubServer(port=0) as stub:
+            report = await benchmark(stub.url, sizes, args.repeat, False, args.limit)
+    print(format_report(report))
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    path = BENCH_DIR / "catalog.json"
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nreport: {path}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.catalog", description="Menu search latency vs catalog size.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="catalog sizes (products)")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed requests per query and size")
+    parser.add_argument("--limit", type=int, help="pass ?limit= like useProducts({limit}) does")
+    parser.add_argument("--stub-url", help="a running stub to load into (default: start one in-process)")
+    parser.add_argument("--via-app", action="store_true", help="query the Next.js route, wired to --stub-url")
+    args = parser.parse_args(argv)
+    if args.via_app and not args.stub_url:
+        parser.error("--via-app needs --stub-url: the app must be reading from the stub being loaded")
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""Order-number / reservation-code collision stress test.
+
+``POST /api/orders`` and ``POST /api/reservations`` build codes as
+``PED|RES<yyyymmdd><1000-9999>``: 9000 codes per day, drawn at random with no
+uniqueness retry. This fires ``--total`` creates with ``--concurrency`` in
+flight and reports, per bucket of completed requests:
+
+* how full the day's code space is (codes already there + codes created),
+* failed creates, and how many of those are unique-constraint violations,
+* duplicate codes among successful creates (if the column is not unique),
+* the collision rate a uniform generator would predict at that fill level,
+* p50/p95 latency, to show how the endpoint degrades as the space fills.
+
+Run it before and after changing a generator with the same arguments::
+
+    python -m harness.collisions --endpoint orders --total 5000 --concurrency 200
+
+Writes real rows: local or staging stacks only.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timezone
+
+from harness import config
+from harness.api import ApiClient
+from harness.load import build_order, build_reservation
+from harness.stats import percentile, format_table
+
+COLLISION_DIR = config.STATE_DIR / "collisions"
+
+CODE_SPACE = 9000
+
+ENDPOINTS = {
+    "orders": ("/api/orders", "order_number", "PED"),
+    "reservations": ("/api/reservations", "reservation_code", "RES"),
+}
+
+_UNIQUE_MARKERS = ("duplicate key", "unique constraint", "23505")
+
+COLUMNS = ["bucket", "fill", "created", "failed", "unique_violations", "duplicates", "expected_rate", "observed_rate", "p50_ms", "p95_ms"]
+
+
+@dataclass
+class Attempt:
+    seq: int
+    ok: bool
+    code: str | None
+    elapsed_ms: float
+    unique_violation: bool
+    error: str | None = None
+
+
+def day_prefix(prefix: str) -> str:
+    # The routes use new Date().toISOString(), i.e. the UTC date.
+    return prefix + datetime.now(timezone.utc).strftime("%Y%m%d")
+
+
+async def existing_codes(api: ApiClient, endpoint: str) -> int:
+    """Codes already issued today for ``endpoint``."""
+    path, field_name, prefix = ENDPOINTS[endpoint]
+    today = day_prefix(prefix)
+    if endpoint == "orders":
+        start = datetime.now(timezone.utc).strftime("%Y-%m-%dT00:00:00Z")
+        response = await api.get(path, params={"from": start, "limit": 1})
+        return int(((response.body or {}).get("meta") or {}).get("total") or 0) if response.ok else 0
+    response = await api.get(path)
+    rows = response.body if response.ok and isinstance(response.body, list) else []
+    return sum(1 for row in rows if str(row.get(field_name, "")).startswith(today))
+
+
+async def stress(api: ApiClient, endpoint: str, total: int, concurrency: int, seed: int) -> list[Attempt]:
+    path, field_name, _ = ENDPOINTS[endpoint]
+    rng = random.Random(seed)
+    products: list[dict] = []
+    if endpoint == "orders":
+        catalog = await api.get("/api/products")
+        products = [p for p in catalog.body or [] if p.get("is_available", True)] if catalog.ok else []
+        if not products:
+            raise RuntimeError(f"no products to order from (GET /api/products -> {catalog.status})")
+    payloads = [
+        build_order(products, rng, n) if endpoint == "orders" else build_reservation(rng, n)
+        for n in range(total)
+    ]
+    gate = asyncio.Semaphore(concurrency)
+    attempts: list[Attempt] = []
+
+    async def create(payload: dict) -> None:
+        async with gate:
+            started = time.perf_counter()
+            try:
+                response = await api.post(path, json=payload)
+            except Exception as exc:  # noqa: BLE001 - transport errors count as failed attempts
+                elapsed_ms = round((time.perf_counter() - started) * 1000, 2)
+                attempts.append(Attempt(len(attempts), False, None, elapsed_ms, False, f"{type(exc).__name__}: {exc}"))
+                return
+        body = response.body if isinstance(response.body, dict) else {}
+        message = str(body.get("error", "")).lower()
+        attempts.append(Attempt(
+            seq=len(attempts),
+            ok=response.ok,
+            code=body.get(field_name) if response.ok else None,
+            elapsed_ms=response.elapsed_ms,
+            unique_violation=not response.ok and any(marker in message for marker in _UNIQUE_MARKERS),
+            error=None if response.ok else body.get("error") or f"HTTP {response.status}",
+        ))
+
+    await asyncio.gather(*(create(payload) for payload in payloads))
+    return attempts
+
+
+def analyse(attempts: list[Attempt], already: int, buckets: int) -> dict:
+    """Per-bucket collision and latency figures in completion order."""
+    size = max(1, -(-len(attempts) // buckets))
+    seen: Counter[str] = Counter()
+    issued = already
+    rows = []
+    for index in range(0, len(attempts), size):
+        chunk = attempts[index:index + size]
+        fill_before = issued / CODE_SPACE
+        duplicates = 0
+        for attempt in chunk:
+            if attempt.ok and attempt.code:
+                seen[attempt.code] += 1
+                if seen[attempt.code] > 1:
+                    duplicates += 1
+                else:
+                    issued += 1
+        failed = sum(not a.ok for a in chunk)
+        violations = sum(a.unique_violation for a in chunk)
+        latencies = [a.elapsed_ms for a in chunk]
+        fill_after = issued / CODE_SPACE
+        rows.append({
+            "bucket": len(rows) + 1,
+            "fill": f"{fill_after:.1%}",
+            "created": sum(a.ok for a in chunk),
+            "failed": failed,
+            "unique_violations": violations,
+            "duplicates": duplicates,
+            # A uniform draw collides with probability issued/9000.
+            "expected_rate": f"{(fill_before + fill_after) / 2:.2%}",
+            "observed_rate": f"{(violations + duplicates) / len(chunk):.2%}",
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+        })
+    return {
+        "already_issued": already,
+        "attempts": len(attempts),
+        "created": sum(a.ok for a in attempts),
+        "failed": sum(not a.ok for a in attempts),
+        "unique_violations": sum(a.unique_violation for a in attempts),
+        "duplicate_codes": sum(count - 1 for count in seen.values() if count > 1),
+        "final_fill": round(issued / CODE_SPACE, 4),
+        "buckets": rows,
+    }
+
+
+async def _main(args: argparse.Namespace) -> int:
+    endpoints = list(ENDPOINTS) if args.endpoint == "both" else [args.endpoint]
+    results = {}
+    async with ApiClient(timeout_ms=args.timeout_ms) as api:
+        for endpoint in endpoints:
+            already = await existing_codes(api, endpoint)
+            started = time.perf_counter()
+            attempts = await stress(api, endpoint, args.total, args.concurrency, args.seed)
+            result = analyse(attempts, already, args.buckets)
+            result["wall_time_s"] = round(time.perf_counter() - started, 2)
+            results[endpoint] = result
+            print(f"\n{endpoint}: {result['created']}/{result['attempts']} created, "
+                  f"{result['failed']} failed ({result['unique_violations']} unique violations), "
+                  f"{result['duplicate_codes']} duplicate codes, day space {result['final_fill']:.1%} full")
+            print(format_table(result["buckets"], COLUMNS))
+    COLLISION_DIR.mkdir(parents=True, exist_ok=True)
+    path = COLLISION_DIR / time.strftime("collisions-%Y%m%d-%H%M%S.json")
+    path.write_text(json.dumps({"args": vars(args), "results": results}, indent=2), encoding="utf-8")
+    print(f"\nresults: {path}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.collisions", description="Daily code collision stress test.")
+    parser.add_argument("--endpoint", choices=[*ENDPOINTS, "both"], default="both")
+    parser.add_argument("--total", type=int, default=3000, help="creates per endpoint")
+    parser.add_argument("--concurrency", type=int, default=100, help="requests in flight")
+    parser.add_argument("--buckets", type=int, default=10, help="rows in the degradation table")
+    parser.add_argument("--seed", type=int, default=1, help="payload seed (codes stay server-random)")
+    parser.add_argument("--timeout-ms", type=float, default=30000)
+    return asyncio.run(_main(parser.parse_args(argv)))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
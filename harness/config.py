@@ -0,0 +1,48 @@
+"""Settings shared by every harness module, overridable through HARNESS_* env vars."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SUITE_DIRS = (ROOT / "tests", ROOT / "testsprite_tests")
+
+# Scratch space for everything the harness writes (reports, auth state, traces).
+STATE_DIR = Path(os.environ.get("HARNESS_STATE_DIR", ROOT / ".harness"))
+
+BASE_URL = os.environ.get("HARNESS_BASE_URL", "http://localhost:3000").rstrip("/")
+
+HEADLESS = os.environ.get("HARNESS_HEADED", "") != "1"
+
+# Mail sink (harness.mail) the app's MAIL_WEBHOOK_URL points at.
+MAIL_URL = os.environ.get("HARNESS_MAIL_URL", "http://127.0.0.1:8025").rstrip("/")
+
+# Flags the generated scripts pass to chromium.launch(), minus --single-process:
+# a pooled browser hosts many contexts at once and needs separate renderers.
+LAUNCH_ARGS = [
+    "--window-size=1280,720",
+    "--disable-dev-shm-usage",
+    "--ipc=host",
+]
+
+DEFAULT_TIMEOUT_MS = 5000
+
+
+
+def _testsprite_config(suite: str) -> dict:
+    try:
+        return json.loads((ROOT / suite / "tmp" / "config.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def admin_credentials(suite: str) -> tuple[str, str]:
+    """Admin account a suite's scripts log in with (``<suite>/tmp/config.json``)."""
+    testsprite = _testsprite_config(suite)
+    return (
+        os.environ.get("HARNESS_ADMIN_EMAIL") or testsprite.get("loginUser", ""),
+        os.environ.get("HARNESS_ADMIN_PASSWORD") or testsprite.get("loginPassword", ""),
+    )
@@ -0,0 +1,130 @@
+"""Reruns of failed tests, flakiness scores and the quarantine lane.
+
+A test that fails in the main run is rerun ``RERUNS`` times in isolation (a
+fresh single-browser pool, nothing else running) with Playwright tracing on,
+so every rerun leaves a ``.harness/pwtraces/<suite>/<TC>-<attempt>.zip`` for
+``playwright show-trace``. If any rerun passes the result becomes ``FLAKY``:
+reported, but not a failure of the run. If all of them fail it stays
+``FAILED``.
+
+A test's flakiness score is the share of its last ``WINDOW`` harness results
+that were ``FLAKY`` or flipped status against the previous result of the same
+script source. Tests scoring ``THRESHOLD`` or more (over at least
+``MIN_RESULTS`` results) are quarantined: they run in a separate lane after
+the main one, and their outcome never sets the exit code.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import os
+from contextlib import closing
+from typing import TYPE_CHECKING
+
+from playwright.async_api import BrowserContext
+
+from harness import store
+from harness.config import STATE_DIR
+from harness.suite import TestScript
+
+if TYPE_CHECKING:
+    from harness.runner import TestResult
+    from harness.session import Options, Session
+
+FLAKY = "FLAKY"
+RERUNS = int(os.environ.get("HARNESS_RERUNS", "2"))
+WINDOW = 20
+THRESHOLD = 0.2
+MIN_RESULTS = 3
+PWTRACE_DIR = STATE_DIR / "pwtraces"
+
+
+async def start_tracing(session: "Session", context: BrowserContext) -> None:
+    """Trace ``context`` and save the trace when the script closes it."""
+    await context.tracing.start(screenshots=True, snapshots=True)
+    index = len(session.contexts)
+    path = PWTRACE_DIR / session.script.suite / f"{session.script.test_id}-{session.options.attempt}-{index}.zip"
+    original_close = context.close
+
+    async def close(**kwargs) -> None:
+        # The scripts close their context in ``finally``; stop tracing first
+        # or the trace dies with it.
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            await context.tracing.stop(path=str(path))
+            session.pw_traces.append(str(path))
+        except Exception:  # noqa: BLE001 - a lost trace must not fail the test
+            pass
+        await original_close(**kwargs)
+
+    context.close = close  # type: ignore[method-assign]
+
+
+def rerun(script: TestScript, options: "Options", reruns: int = RERUNS) -> list["TestResult"]:
+    """Run ``script`` ``reruns`` times, each on its own fresh pool, with tracing."""
+    from harness.runner import run_scripts
+
+    attempts = []
+    for attempt in range(1, reruns + 1):
+        # Replay the whole script: a shared snapshot could be what made it fail.
+        traced = dataclasses.replace(options, playwright_trace=True, attempt=attempt, forks=None)
+        attempts.extend(asyncio.run(run_scripts([script], traced)))
+    return attempts
+
+
+def classify(result: "TestResult", attempts: list["TestResult"]) -> "TestResult":
+    """Fold ``attempts`` into ``result``: ``FLAKY`` if any of them passed."""
+    result.attempts = [
+        {"status": a.status, "duration": a.duration, "error": a.error, "pw_traces": a.pw_traces} for a in attempts
+    ]
+    if any(a.status == "PASSED" for a in attempts):
+        result.status = FLAKY
+    return result
+
+
+def retry_failures(results: list["TestResult"], scripts: list[TestScript], options: "Options", reruns: int = RERUNS) -> list["TestResult"]:
+    by_key = {s.key: s for s in scripts}
+    for result in results:
+        if result.status == "FAILED" and reruns > 0 and result.key in by_key:
+            classify(result, rerun(by_key[result.key], options, reruns))
+    return results
+
+
+def scores(keys: list[str] | None = None) -> dict[str, dict]:
+    """Flakiness per test over its last ``WINDOW`` harness results."""
+    if not store.DB_FILE.exists():
+        return {}
+    with closing(store.connect()) as db:
+        rows = db.execute(
+            """SELECT t.key, r.status, r.code_sha FROM results r
+               JOIN tests t ON t.id = r.test_id JOIN runs u ON u.id = r.run_id
+               WHERE u.source = 'harness' ORDER BY r.id"""
+        ).fetchall()
+    history: dict[str, list[tuple[str, str | None]]] = {}
+    for key, status, sha in rows:
+        if keys is None or key in keys:
+            history.setdefault(key, []).append((status, sha))
+    out = {}
+    for key, runs in history.items():
+        runs = runs[-WINDOW:]
+        unstable = sum(status == FLAKY for status, _ in runs)
+        unstable += sum(
+            1 for (before, sha_before), (after, sha_after) in zip(runs, runs[1:])
+            if sha_before == sha_after and FLAKY not in (before, after) and before != after
+        )
+        score = min(1.0, unstable / len(runs))
+        out[key] = {
+            "score": round(score, 3),
+            "results": len(runs),
+            "quarantined": len(runs) >= MIN_RESULTS and score >= THRESHOLD,
+        }
+    return out
+
+
+def split_lanes(scripts: list[TestScript]) -> tuple[list[TestScript], list[TestScript]]:
+    """(main lane, quarantine lane); ``HARNESS_QUARANTINE`` adds keys by hand."""
+    manual = {key.strip() for key in os.environ.get("HARNESS_QUARANTINE", "").split(",") if key.strip()}
+    known = scores([s.key for s in scripts])
+    quarantined = {key for key, score in known.items() if score["quarantined"]} | manual
+    return [s for s in scripts if s.key not in quarantined], [s for s in scripts if s.key in quarantined]
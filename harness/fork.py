@@ -0,0 +1,188 @@
+"""Run the opening steps several scripts share once, and fork the rest from it.
+
+Many scripts open the same way: the admin login, then a nav link, "Ver Menú",
+"Agregar". The login is already shared through ``harness.auth``; ``plan``
+reads what follows it in every script of the run (``rewrite.opening``: the
+leading gotos and clicks) and gives each script the longest opening it shares
+with at least one other script. ``rewrite.ForkRewriter`` wraps that opening
+so it only runs when the session could not fork.
+
+The first session that needs an opening runs it in a throwaway context and
+saves the result to ``.harness/forks/<digest>.json``: the storage state
+(cookies, the localStorage cart) and the URL it ended on. Sessions then start
+their context from that storage state and open the URL. A click that changes
+neither the URL nor storage (it opened a modal, say) cannot be carried over
+that way, so such an opening is marked unforkable and every script replays it
+itself, as it would without the harness.
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import json
+import time
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+from playwright.async_api import Error, Page
+
+from harness import auth, config, loader, rewrite
+from harness.pool import BrowserPool
+from harness.suite import TestScript
+
+if TYPE_CHECKING:
+    from harness.session import Session
+
+FORK_DIR = config.STATE_DIR / "forks"
+
+Step = tuple[str, str]
+
+def _steps_block(tree: ast.Module) -> list[ast.stmt]:
+    """The ``try`` body of ``run_test`` that holds the script's steps."""
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Try) and rewrite.opening(node.body)[0] >= 0:
+            return node.body
+    return []
+
+
+def script_opening(script: TestScript) -> tuple[bool, list[Step]]:
+    """(starts logged in, opening steps) of ``script`` as the harness runs it."""
+    probe = SimpleNamespace(script=script, admin_login=False)
+    tree = rewrite.LoginRewriter(probe)(loader.parse(script))
+    _, steps = rewrite.opening(_steps_block(tree))
+    return probe.admin_login, [step for _, step in steps]
+
+
+def plan(scripts: list[TestScript]) -> dict[str, int]:
+    """Opening steps to fork, by script key: the longest opening shared with another script."""
+    openings = {script.key: (script.suite, *script_opening(script)) for script in scripts}
+    shared: Counter = Counter()
+    for suite, admin_login, steps in openings.values():
+        for length in range(1, len(steps) + 1):
+            shared[suite, admin_login, tuple(steps[:length])] += 1
+    lengths = {}
+    for key, (suite, admin_login, steps) in openings.items():
+        common = [n for n in range(1, len(steps) + 1) if shared[suite, admin_login, tuple(steps[:n])] > 1]
+        # Gotos alone are no cheaper to fork than to replay: resume() is a goto.
+        if common and any(kind == "click" for kind, _ in steps[:max(common)]):
+            lengths[key] = max(common)
+    return lengths
+
+
+def reset() -> None:
+    """Drop the snapshots of a previous run; the app state they captured is stale."""
+    for path in FORK_DIR.glob("*.json"):
+        path.unlink(missing_ok=True)
+
+
+def _read(path: Path, admin_login: bool) -> dict | None:
+    try:
+        snapshot = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if admin_login and snapshot["forkable"]:
+        expiry = auth.session_expiry(snapshot["storage_state"])
+        if expiry is None or expiry - auth.EXPIRY_MARGIN < time.time():
+            return None
+    return snapshot
+
+
+async def _observable(page: Page) -> tuple[str, list]:
+    """What a fork carries over: the URL and localStorage."""
+    return page.url, (await page.context.storage_state())["origins"]
+
+
+async def build(pool: BrowserPool, options: dict[str, Any], steps: list[Step]) -> dict:
+    """Run ``steps`` in a throwaway context and capture where they leave the browser."""
+    started = time.perf_counter()
+    snapshot: dict[str, Any] = {"steps": steps, "forkable": True, "reason": None}
+    context = await pool.new_context(**options)
+    try:
+        page = await context.new_page()
+        for kind, target in steps:
+            before = await _observable(page)
+            if kind == "goto":
+                await page.goto(target, wait_until="domcontentloaded")
+            else:
+                await page.locator(f"xpath={target}").first.click(timeout=config.DEFAULT_TIMEOUT_MS)
+            try:
+                await page.wait_for_load_state("networkidle", timeout=config.DEFAULT_TIMEOUT_MS)
+            except Error:
+                pass
+            if kind == "click" and await _observable(page) == before:
+                snapshot.update(forkable=False, reason=f"click {target} changed neither the URL nor storage")
+                break
+        snapshot["url"] = page.url
+        snapshot["storage_state"] = await context.storage_state()
+    except Error as exc:
+        snapshot.update(forkable=False, reason=str(exc).splitlines()[0])
+    finally:
+        await context.close()
+    snapshot["build_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return snapshot
+
+
+class Fork:
+    """A session's shared opening and the snapshot it starts from."""
+
+    def __init__(self, session: "Session"):
+        self.session = session
+        # Set by ForkRewriter to the opening it wrapped.
+        self.steps: list[Step] = []
+        self.snapshot: dict | None = None
+        self.built = False
+
+    @property
+    def forked(self) -> bool:
+        return self.snapshot is not None and self.snapshot["forkable"]
+
+    def digest(self) -> str:
+        session = self.session
+        key = [session.script.suite, session.admin_login, session.device, self.steps]
+        return hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()[:16]
+
+    async def context_options(self, options: dict[str, Any]) -> dict[str, Any]:
+        """Start the script's first context from the opening's snapshot, building it if needed."""
+        if not self.steps or self.session.contexts:
+            return options
+        digest, admin_login = self.digest(), self.session.admin_login
+        path = FORK_DIR / f"{digest}.json"
+        snapshot = _read(path, admin_login)
+        if snapshot is None:
+            async with auth.exclusive(path):
+                # Another session or worker may have built it while we waited for the lock.
+                snapshot = _read(path, admin_login)
+                if snapshot is None:
+                    snapshot = await build(self.session.pool, options, self.steps)
+                    self.built = True
+                    tmp = path.with_suffix(".tmp")
+                    tmp.write_text(json.dumps(snapshot), encoding="utf-8")
+                    tmp.replace(path)
+        self.snapshot = snapshot
+        if not self.forked:
+            return options
+        return {**options, "storage_state": snapshot["storage_state"]}
+
+    async def resume(self, page: Page, line: int) -> bool:
+        """Open the snapshot's URL; True when the script has to run its opening itself."""
+        if not self.forked:
+            return True
+        url = self.snapshot["url"]
+        async with self.session.trace.step("fork", f"{len(self.steps)} shared steps -> {url}", line):
+            await page.goto(url, wait_until="domcontentloaded")
+        return False
+
+    def summary(self) -> dict | None:
+        if not self.steps:
+            return None
+        snapshot = self.snapshot or {}
+        return {
+            "steps": len(self.steps),
+            "forked": self.forked,
+            "built_here": self.built,
+            "build_ms": snapshot.get("build_ms"),
+            "reason": snapshot.get("reason"),
+        }
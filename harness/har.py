@@ -0,0 +1,211 @@
+"""Record the browser's ``/api/*`` traffic to HAR and replay it without a backend.
+
+``record`` writes one HAR per test (per device leg) to
+``.harness/har/<suite>/<artifact name>.har``.
+``replay`` answers the same routes from an in-memory index keyed by method,
+path and canonical query string: the test's own HAR first, then any other
+recording of the suite. Repeated requests to one key are served in the order
+they were recorded (the last response repeats), so a list fetched before and
+after a mutation still differs. Every replayed response is held for
+``HARNESS_HAR_LATENCY_MS`` so frontend timings compare across runs.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import os
+import re
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from playwright.async_api import BrowserContext, Request, Route
+
+from harness.config import STATE_DIR
+from harness.suite import TestScript
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+MODES = (OFF, RECORD, REPLAY)
+
+HAR_DIR = STATE_DIR / "har"
+LATENCY_MS = float(os.environ.get("HARNESS_HAR_LATENCY_MS", "25"))
+
+API_URLS = re.compile(r"/api/(products|categories|settings|orders|reservations)(/|\?|$)")
+
+# Hop-by-hop or re-derived by Playwright when fulfilling.
+_DROP_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection", "keep-alive"}
+
+Key = tuple[str, str, str]
+
+
+def request_key(method: str, url: str) -> Key:
+    parts = urlsplit(url)
+    return method.upper(), parts.path, urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+
+def har_path(script: TestScript, name: str | None = None) -> Path:
+    """``name`` is the session's ``artifact_name``, so device-matrix legs keep separate files."""
+    return HAR_DIR / script.suite / f"{name or script.test_id}.har"
+
+
+def _headers(headers: dict[str, str]) -> list[dict]:
+    return [{"name": name, "value": value} for name, value in headers.items()]
+
+
+def _content(body: bytes, mime: str) -> dict:
+    content = {"size": len(body), "mimeType": mime}
+    try:
+        content["text"] = body.decode("utf-8")
+    except UnicodeDecodeError:
+        content["text"], content["encoding"] = base64.b64encode(body).decode(), "base64"
+    return content
+
+
+def _body(content: dict) -> bytes:
+    text = content.get("text", "")
+    return base64.b64decode(text) if content.get("encoding") == "base64" else text.encode("utf-8")
+
+
+def read_entries(path: Path) -> list[dict]:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))["log"]["entries"]
+    except (OSError, ValueError, KeyError):
+        return []
+
+
+def build_index(paths: list[Path]) -> dict[Key, list[dict]]:
+    """Entries by request key; the first file that has a key owns it."""
+    index: dict[Key, list[dict]] = {}
+    for path in paths:
+        found: dict[Key, list[dict]] = {}
+        for entry in read_entries(path):
+            key = request_key(entry["request"]["method"], entry["request"]["url"])
+            found.setdefault(key, []).append(entry)
+        for key, entries in found.items():
+            index.setdefault(key, entries)
+    return index
+
+
+class HarLog:
+    """Per-session recorder or replayer; inert when the mode is ``off``."""
+
+    def __init__(self, script: TestScript, mode: str = OFF, name: str | None = None):
+        self.script = script
+        self.mode = mode
+        self.path = har_path(script, name)
+        self.entries: list[dict] = []
+        self.counts: Counter[str] = Counter()
+        self._pending: set[asyncio.Task] = set()
+        self._index: dict[Key, list[dict]] | None = None
+        self._served: Counter[Key] = Counter()
+
+    async def attach(self, context: BrowserContext) -> None:
+        if self.mode == RECORD:
+            context.on("requestfinished", self._on_finished)
+        elif self.mode == REPLAY:
+            if self._index is None:
+                others = sorted(p for p in (HAR_DIR / self.script.suite).glob("*.har") if p != self.path)
+                self._index = build_index([self.path, *others])
+            await context.route(API_URLS, self._replay)
+
+    # -- record -----------------------------------------------------------
+
+    def _on_finished(self, request: Request) -> None:
+        if API_URLS.search(request.url):
+            task = asyncio.ensure_future(self._record(request))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    async def _record(self, request: Request) -> None:
+        response = body = None
+        try:
+            response = await request.response()
+            body = await response.body() if response else None
+        except Exception:  # noqa: BLE001 - context closed before the body was read
+            body = None
+        if response is None or body is None:
+            self.counts["lost"] += 1
+            return
+        timing = request.timing
+        # startTime is the browser's send time (epoch ms); this task runs after the request finished.
+        sent = timing["startTime"] / 1000 if timing["startTime"] > 0 else time.time()
+        started = datetime.fromtimestamp(sent, timezone.utc)
+        wait = max(0.0, timing["responseStart"] - timing["requestStart"]) if timing["requestStart"] >= 0 else 0.0
+        receive = max(0.0, timing["responseEnd"] - timing["responseStart"]) if timing["responseEnd"] >= 0 else 0.0
+        headers = await response.all_headers()
+        post = request.post_data
+        self.entries.append({
+            "startedDateTime": started.isoformat(),
+            "time": round(wait + receive, 3),
+            "request": {
+                "method": request.method,
+                "url": request.url,
+                "httpVersion": "HTTP/1.1",
+                "headers": _headers(await request.all_headers()),
+                "queryString": [{"name": n, "value": v} for n, v in parse_qsl(urlsplit(request.url).query)],
+                **({"postData": {"mimeType": request.headers.get("content-type", ""), "text": post}} if post else {}),
+                "headersSize": -1,
+                "bodySize": len(post.encode()) if post else 0,
+            },
+            "response": {
+                "status": response.status,
+                "statusText": response.status_text,
+                "httpVersion": "HTTP/1.1",
+                "headers": _headers(headers),
+                "content": _content(body, headers.get("content-type", "")),
+                "redirectURL": "",
+                "headersSize": -1,
+                "bodySize": len(body),
+            },
+            "cache": {},
+            "timings": {"send": 0, "wait": round(wait, 3), "receive": round(receive, 3)},
+        })
+        self.counts["recorded"] += 1
+
+    # -- replay -----------------------------------------------------------
+
+    async def _replay(self, route: Route) -> None:
+        request = route.request
+        key = request_key(request.method, request.url)
+        entries = self._index.get(key) if self._index else None
+        await asyncio.sleep(LATENCY_MS / 1000)
+        if not entries:
+            self.counts["missed"] += 1
+            await route.fulfill(
+                status=504, content_type="application/json",
+                body=json.dumps({"error": "not recorded", "request": " ".join(key).strip()}),
+            )
+            return
+        entry = entries[min(self._served[key], len(entries) - 1)]
+        self._served[key] += 1
+        self.counts["replayed"] += 1
+        response = entry["response"]
+        await route.fulfill(
+            status=response["status"],
+            headers={h["name"]: h["value"] for h in response["headers"] if h["name"].lower() not in _DROP_HEADERS},
+            body=_body(response["content"]),
+        )
+
+    async def finish(self) -> Path | None:
+        """Flush outstanding recordings and write the HAR (``record`` mode only)."""
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
+        if self.mode != RECORD or not self.entries:
+            return None
+        self.entries.sort(key=lambda e: e["startedDateTime"])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"log": {
+            "version": "1.2",
+            "creator": {"name": "harness", "version": "1"},
+            "pages": [],
+            "entries": self.entries,
+        }}, indent=1), encoding="utf-8")
+        tmp.replace(self.path)
+        return self.path
@@ -0,0 +1,233 @@
+"""Test impact analysis: which TC scripts a diff can affect.
+
+Each suite's ``tmp/code_summary.json`` maps features ("Menu Page",
+"Shopping Cart", ...) to source files. A changed file selects the features
+that list it; a feature selects the plan entries whose title, description or
+steps mention it (``FEATURE_TERMS``). On top of that:
+
+* pages depend on the API routes they fetch, directly or through the hooks in
+  ``lib/queries.ts``, so a change under ``app/api/<resource>/`` selects every
+  test whose features fetch that resource, plus the API checks;
+* ``SHARED`` files (``middleware.ts``, ``lib/queries.ts``, the root layout,
+  build config, the harness itself) select everything;
+* a changed TC script selects itself, a changed test plan the tests whose
+  entries changed (``performance``/``email`` blocks included), and
+  documentation (and TestSprite's raw report and PRD copies) is ignored;
+* any other file is unknown to the map and selects everything, to stay safe.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import subprocess
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from functools import lru_cache
+
+from harness import api_checks
+from harness.config import ROOT, SUITE_DIRS
+from harness.plan import PLAN_FILE, load_plan
+from harness.suite import TestScript
+
+SHARED = (
+    "middleware.ts", "lib/queries.ts", "lib/api.ts", "lib/Providers.tsx", "app/layout.tsx",
+    "package.json", "package-lock.json", "next.config.*", "tsconfig.json", "tailwind.config.*",
+    "postcss.config.*", "harness/*",
+    # The feature map itself, and the admin account every suite logs in with.
+    "tests/tmp/code_summary.json", "testsprite_tests/tmp/code_summary.json",
+    "tests/tmp/config.json", "testsprite_tests/tmp/config.json",
+)
+IGNORED = (
+    "*.md", "docs/*", ".github/*", "scripts/*", "requests.jsonl",
+    "tests/tmp/raw_report.md", "testsprite_tests/tmp/raw_report.md",
+    "tests/tmp/prd_files/*", "testsprite_tests/tmp/prd_files/*",
+)
+
+# How the test plans talk about each feature; features missing here match on
+# the words of their name.
+FEATURE_TERMS = {
+    "Home Page": r"home ?page|\bhome\b",
+    "Menu Page": r"\bmenu\b|product (detail|view)|search|filter",
+    "Shopping Cart": r"\bcart\b",
+    "Checkout": r"checkout|pickup",
+    "Reservations": r"reservation",
+    "Admin Panel": r"\badmin\b",
+    "Admin Dashboard": r"\badmin\b|dashboard",
+    "Product Management": r"product crud|crud operations|product management",
+    "Order Management": r"orders? management|order status|status update|cancell",
+    "Reservation Management": r"reservations? management",
+    "Authentication": r"\blog ?in\b|authenticat|route protection",
+    "API Routes": r"\bapi\b|endpoint",
+    "API Services": r"\bapi\b|endpoint",
+    "Image Upload": r"image upload",
+    "Data Fetching": r"react query|real-time",
+    "Navigation": r"navigat",
+    "Footer": r"footer",
+    "Admin Sidebar": r"sidebar",
+    "Category Management": r"categor",
+    "About Page": r"about|nosotros",
+}
+
+_API_PATH = re.compile(r"/api/([a-z_-]+)")
+_EXPORT = re.compile(r"^export (?:const|async function|function) (\w+)", re.M)
+_QUERIES_IMPORT = re.compile(r"import\s*\{([^}]*)\}\s*from\s*[\"']@/lib/queries[\"']")
+
+
+def _matches(path: str, patterns: tuple[str, ...]) -> bool:
+    return any(fnmatch(path, pattern) for pattern in patterns)
+
+
+def _terms(feature: str) -> re.Pattern:
+    if feature in FEATURE_TERMS:
+        return re.compile(FEATURE_TERMS[feature], re.I)
+    words = [w.rstrip("s") for w in re.findall(r"[a-z]{4,}", feature.lower()) if w not in {"page", "management"}]
+    return re.compile("|".join(rf"\b{re.escape(w)}" for w in words) or r"(?!)", re.I)
+
+
+@lru_cache(maxsize=None)
+def features(suite: str) -> dict[str, tuple[str, ...]]:
+    try:
+        summary = json.loads((ROOT / suite / "tmp" / "code_summary.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {f["name"]: tuple(f.get("files") or ()) for f in summary.get("features", [])}
+
+
+@lru_cache(maxsize=None)
+def query_resources() -> dict[str, frozenset[str]]:
+    """Exported name in ``lib/queries.ts`` -> API resources it fetches, through other exports too."""
+    try:
+        source = (ROOT / "lib" / "queries.ts").read_text(encoding="utf-8")
+    except OSError:
+        return {}
+    marks = list(_EXPORT.finditer(source))
+    bodies = {m.group(1): source[m.start():marks[i + 1].start() if i + 1 < len(marks) else None] for i, m in enumerate(marks)}
+    direct = {name: set(_API_PATH.findall(body)) for name, body in bodies.items()}
+    resolved = {}
+    for name, body in bodies.items():
+        found = set(direct[name])
+        for other in bodies:
+            if other != name and re.search(rf"\b{other}\b", body):
+                found |= direct[other]
+        resolved[name] = frozenset(found)
+    return resolved
+
+
+@lru_cache(maxsize=None)
+def file_resources(path: str) -> frozenset[str]:
+    """API resources a source file fetches: literal ``/api/...`` paths and ``lib/queries`` imports."""
+    if path.startswith("app/api/"):
+        return frozenset(path.split("/")[2:3])
+    try:
+        source = (ROOT / path).read_text(encoding="utf-8")
+    except OSError:
+        return frozenset()
+    found = set(_API_PATH.findall(source))
+    hooks = query_resources()
+    for group in _QUERIES_IMPORT.findall(source):
+        for name in re.findall(r"\w+", group):
+            found |= hooks.get(name, frozenset())
+    return frozenset(found)
+
+
+def plan_text(entry: dict) -> str:
+    steps = " ".join(step.get("description", "") for step in entry.get("steps", []))
+    return f"{entry.get('title', '')} {entry.get('description', '')} {steps}"
+
+
+@lru_cache(maxsize=None)
+def test_features(suite: str) -> dict[str, frozenset[str]]:
+    """Test id -> features its plan entry mentions."""
+    terms = {name: _terms(name) for name in features(suite)}
+    return {
+        test_id: frozenset(name for name, pattern in terms.items() if pattern.search(plan_text(entry)))
+        for test_id, entry in load_plan(suite).items()
+    }
+
+
+def changed_plan_entries(suite: str, base: str) -> set[str] | None:
+    """Test ids whose plan entry differs from ``base``; None when either side is unreadable."""
+    path = f"{suite}/{PLAN_FILE}"
+    try:
+        current = json.loads((ROOT / path).read_text(encoding="utf-8"))
+        shown = subprocess.run(["git", "show", f"{base}:{path}"], cwd=ROOT, capture_output=True, text=True)
+        before = json.loads(shown.stdout) if shown.returncode == 0 else []
+    except (OSError, ValueError):
+        return None
+    old = {entry["id"]: entry for entry in before}
+    return {entry["id"] for entry in current if old.get(entry["id"]) != entry}
+
+
+@dataclass
+class Impact:
+    selected: set[str] = field(default_factory=set)
+    everything: bool = False
+    reasons: dict[str, list[str]] = field(default_factory=dict)
+
+    def add(self, key: str, reason: str) -> None:
+        self.selected.add(key)
+        self.reasons.setdefault(key, []).append(reason)
+
+
+def analyse(changed: list[str], scripts: list[TestScript], base: str = "HEAD") -> Impact:
+    impact = Impact()
+    keys = {s.key for s in scripts}
+    for path in changed:
+        if _matches(path, IGNORED):
+            continue
+        script = next((s for s in scripts if s.path == ROOT / path), None)
+        if script is not None:
+            impact.add(script.key, f"{path} changed")
+            continue
+        suite = path.split("/")[0]
+        if path == f"{suite}/{PLAN_FILE}" and suite in {d.name for d in SUITE_DIRS}:
+            entries = changed_plan_entries(suite, base)
+            if entries is not None:
+                for test_id in sorted(entries):
+                    if f"{suite}/{test_id}" in keys:
+                        impact.add(f"{suite}/{test_id}", f"{path}: {test_id} entry changed")
+                continue
+        if _matches(path, SHARED):
+            impact.everything = True
+            impact.reasons.setdefault("*", []).append(f"{path} is shared")
+            continue
+        resource = path.split("/")[2] if path.startswith("app/api/") else None
+        hit = False
+        for suite in (d.name for d in SUITE_DIRS):
+            for test_id, names in test_features(suite).items():
+                key = f"{suite}/{test_id}"
+                if key not in keys:
+                    continue
+                for name in sorted(names):
+                    files = features(suite)[name]
+                    if path in files:
+                        impact.add(key, f"{path} -> {name}")
+                        hit = True
+                    elif resource and any(resource in file_resources(f) for f in files):
+                        impact.add(key, f"{path} -> /api/{resource} <- {name}")
+                        hit = True
+        if resource:
+            for key in api_checks.REPLACES & keys:
+                impact.add(key, f"{path} -> API checks")
+            hit = True
+        if not hit:
+            impact.everything = True
+            impact.reasons.setdefault("*", []).append(f"{path} is not in any feature map")
+    if impact.everything:
+        impact.selected = set(keys)
+    return impact
+
+
+def changed_files(base: str = "HEAD") -> list[str]:
+    """Files changed since ``base``, committed or not, plus untracked ones."""
+    def git(*args: str) -> list[str]:
+        out = subprocess.run(["git", *args], cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        return [line for line in out.splitlines() if line]
+
+    return sorted(set(git("diff", "--name-only", base)) | set(git("ls-files", "--others", "--exclude-standard")))
+
+
+def select(scripts: list[TestScript], base: str = "HEAD") -> tuple[list[TestScript], Impact]:
+    impact = analyse(changed_files(base), scripts, base)
+    return [s for s in scripts if s.key in impact.selected], impact
@@ -0,0 +1,185 @@
+"""Lunch-rush load generator for ``POST /api/orders`` and ``POST /api/reservations``.
+
+Ramps up virtual customers that browse the menu, build a realistic cart from
+the live catalog and check out (or book a table), with think time between
+visits. Reports throughput, p50/p95/p99 latency and error rate per endpoint::
+
+    python -m harness.load --users 50 --ramp-up 30 --duration 120
+
+Every request writes to the database behind the app: point it at a local or
+staging stack (``HARNESS_BASE_URL``), never at production.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass
+
+from harness import config
+from harness.api import ApiClient
+from harness.stats import LatencyStats, format_table
+
+LOAD_DIR = config.STATE_DIR / "load"
+
+ORDERS = "POST /api/orders"
+RESERVATIONS = "POST /api/reservations"
+MENU = "GET /api/products"
+
+COLUMNS = ["endpoint", "requests", "errors", "error_rate", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+
+
+@dataclass
+class Profile:
+    users: int = 20
+    ramp_up: float = 10.0
+    duration: float = 60.0
+    think_min: float = 0.5
+    think_max: float = 2.0
+    reservation_ratio: float = 0.25
+    max_lines: int = 4
+    seed: int | None = None
+
+
+def unit_price(product: dict, rng: random.Random) -> tuple[float, str | None]:
+    """Price the cart would use: a random size for variable-price dishes."""
+    prices = product.get("prices") or []
+    if product.get("is_variable_price") and prices:
+        size = rng.choice(prices)
+        return float(size["price"]), size["size_name"]
+    return float(product.get("price") or 0), None
+
+
+def build_order(products: list[dict], rng: random.Random, customer: int, max_lines: int = 4) -> dict:
+    """An order payload shaped like the one ``app/checkout/page.tsx`` posts."""
+    items = []
+    for product in rng.sample(products, k=min(len(products), rng.randint(1, max_lines))):
+        price, size = unit_price(product, rng)
+        quantity = rng.choice((1, 1, 1, 2, 2, 3))
+        item = {
+            "product_id": product["id"],
+            "product_name": product["name"],
+            "quantity": quantity,
+            "unit_price": price,
+            "subtotal": round(price * quantity, 2),
+        }
+        if size:
+            item["selected_size"] = size
+        items.append(item)
+    # Prices include IGV (18%), exactly like CartContext.cartTotal.
+    total = round(sum(i["subtotal"] for i in items), 2)
+    subtotal = round(total / 1.18, 2)
+    return {
+        "customer_email": f"load-{customer}@example.invalid",
+        "customer_phone": f"9{customer:08d}"[:9],
+        "customer_name": f"Load Customer {customer}",
+        "payment_method": rng.choice(("cash", "card", "transfer")),
+        "pickup_time_estimate": rng.choice(("20m", "45m", "1h")),
+        "items": items,
+        "subtotal": subtotal,
+        "tax_amount": round(total - subtotal, 2),
+        "service_fee": 0,
+        "total_amount": total,
+    }
+
+
+def build_reservation(rng: random.Random, customer: int) -> dict:
+    return {
+        "fullName": f"Load Customer {customer}",
+        "email": f"load-{customer}@example.invalid",
+        "phoneNumber": f"9{customer:08d}"[:9],
+        "reservationDate": f"2099-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "reservationTime": rng.choice(("12:30", "13:00", "13:30", "19:30", "20:00", "21:00")),
+        "numberOfGuests": rng.randint(1, 8),
+    }
+
+
+class LoadTest:
+    def __init__(self, api: ApiClient, profile: Profile):
+        self.api = api
+        self.profile = profile
+        self.stats = {name: LatencyStats(name) for name in (MENU, ORDERS, RESERVATIONS)}
+        self.products: list[dict] = []
+        self._deadline = 0.0
+
+    async def _timed(self, name: str, method: str, path: str, **options) -> dict | None:
+        started = time.perf_counter()
+        try:
+            response = await self.api.call(method, path, **options)
+        except Exception as exc:  # noqa: BLE001 - transport errors count as failures
+            self.stats[name].add((time.perf_counter() - started) * 1000, ok=False, kind=type(exc).__name__)
+            return None
+        kind = None if response.ok else f"HTTP {response.status}"
+        self.stats[name].add(response.elapsed_ms, ok=response.ok, kind=kind)
+        return response.body if response.ok else None
+
+    async def customer(self, number: int, start_delay: float) -> None:
+        rng = random.Random(None if self.profile.seed is None else self.profile.seed + number)
+        await asyncio.sleep(start_delay)
+        while time.monotonic() < self._deadline:
+            await self._timed(MENU, "GET", "/api/products")
+            if rng.random() < self.profile.reservation_ratio:
+                await self._timed(RESERVATIONS, "POST", "/api/reservations", json=build_reservation(rng, number))
+            else:
+                order = build_order(self.products, rng, number, self.profile.max_lines)
+                await self._timed(ORDERS, "POST", "/api/orders", json=order)
+            await asyncio.sleep(rng.uniform(self.profile.think_min, self.profile.think_max))
+
+    async def run(self) -> dict:
+        catalog = await self.api.get("/api/products")
+        self.products = [p for p in catalog.body or [] if p.get("is_available", True)] if catalog.ok else []
+        if not self.products:
+            raise RuntimeError(f"no products to order from (GET /api/products -> {catalog.status})")
+        profile = self.profile
+        started = time.monotonic()
+        self._deadline = started + profile.duration
+        step = profile.ramp_up / profile.users if profile.users else 0
+        await asyncio.gather(*(self.customer(n, n * step) for n in range(profile.users)))
+        elapsed = time.monotonic() - started
+        return {
+            "profile": vars(profile),
+            "duration_s": round(elapsed, 2),
+            "endpoints": [s.summary(elapsed) for s in self.stats.values() if s.count],
+        }
+
+
+async def _main(profile: Profile) -> int:
+    async with ApiClient() as api:
+        result = await LoadTest(api, profile).run()
+    print(format_table(result["endpoints"], COLUMNS))
+    LOAD_DIR.mkdir(parents=True, exist_ok=True)
+    path = LOAD_DIR / time.strftime("load-%Y%m%d-%H%M%S.json")
+    path.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    print(f"\nresults: {path}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.load", description="Concurrent checkout/reservation load.")
+    parser.add_argument("--users", type=int, default=Profile.users, help="virtual customers at full ramp")
+    parser.add_argument("--ramp-up", type=float, default=Profile.ramp_up, help="seconds to start every customer")
+    parser.add_argument("--duration", type=float, default=Profile.duration, help="seconds of load in total")
+    parser.add_argument("--think", type=float, nargs=2, default=(Profile.think_min, Profile.think_max),
+                        metavar=("MIN", "MAX"), help="think time between visits, seconds")
+    parser.add_argument("--reservation-ratio", type=float, default=Profile.reservation_ratio,
+                        help="share of visits that book a table instead of ordering")
+    parser.add_argument("--seed", type=int, default=None, help="make carts reproducible")
+    args = parser.parse_args(argv)
+    profile = Profile(
+        users=args.users,
+        ramp_up=args.ramp_up,
+        duration=args.duration,
+        think_min=args.think[0],
+        think_max=args.think[1],
+        reservation_ratio=args.reservation_ratio,
+        seed=args.seed,
+    )
+    return asyncio.run(_main(profile))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""Turns a generated TC script into a callable ``run_test`` without running it.
+
+Every script ends in a module-level ``asyncio.run(run_test())``. The loader
+parses the source, drops that call, applies the rewrites in ``REWRITERS``,
+executes the result in a private namespace and binds the per-test session:
+``async_api`` becomes the session's pooled stand-in and ``__harness__`` the
+target of rewritten calls.
+"""
+
+from __future__ import annotations
+
+import ast
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from harness import rewrite
+from harness.suite import TestScript
+
+if TYPE_CHECKING:
+    from harness.session import Session
+
+RunTest = Callable[[], Awaitable[None]]
+
+REWRITERS = [
+    rewrite.LoginRewriter,
+    rewrite.ForkRewriter,
+    rewrite.WaitRewriter,
+    rewrite.MailRewriter,
+    rewrite.SelectorRewriter,
+    rewrite.ExpectBatchRewriter,
+    rewrite.TraceRewriter,
+]
+
+
+def _is_entrypoint(node: ast.stmt) -> bool:
+    if not (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)):
+        return False
+    func = node.value.func
+    return (
+        isinstance(func, ast.Attribute)
+        and func.attr == "run"
+        and isinstance(func.value, ast.Name)
+        and func.value.id == "asyncio"
+    )
+
+
+def parse(script: TestScript) -> ast.Module:
+    source = script.path.read_text(encoding="utf-8")
+    tree = ast.parse(source, filename=str(script.path))
+    tree.body = [node for node in tree.body if not _is_entrypoint(node)]
+    return tree
+
+
+def load(script: TestScript, session: "Session") -> RunTest:
+    """Compile ``script`` and return its ``run_test`` bound to ``session``."""
+    tree = parse(script)
+    for rewriter in REWRITERS:
+        tree = rewriter(session)(tree)
+    namespace: dict[str, Any] = {
+        "__name__": f"harness.scripts.{script.suite}.{script.test_id}",
+        "__file__": str(script.path),
+    }
+    exec(compile(tree, str(script.path), "exec"), namespace)
+    namespace["async_api"] = session.api
+    namespace[rewrite.SESSION_NAME] = session
+    return namespace["run_test"]
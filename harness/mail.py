@@ -0,0 +1,355 @@
+"""Mail sink for the confirmation-email tests, and the delivery latency they see.
+
+``lib/mail.ts`` POSTs the order and reservation confirmations to
+``MAIL_WEBHOOK_URL``. ``MailSink`` listens there (``config.MAIL_URL`` +
+``/messages``) and keeps every message in memory with the time it was
+queued. ``GET /messages?reference=...&wait_ms=...`` answers as soon
+as a matching message arrives.
+
+Each session's ``Mailbox`` watches the script's ``POST /api/orders`` and
+``POST /api/reservations`` and, when a test expects the confirmation
+(``rewrite.MailRewriter``, or the ``email`` field of its plan entry), waits
+on the sink for the message carrying the order number or reservation code.
+The time from the POST leaving the browser to the message being queued is
+recorded per delivery. ``python -m harness`` starts the sink unless one is
+already listening; standalone::
+
+    python -m harness.mail [--port 8025]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import re
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Any
+from urllib.parse import parse_qsl, urlsplit
+
+from playwright.async_api import BrowserContext, Error, Request, Response
+
+from harness import config
+from harness.plan import plan_entry
+
+if TYPE_CHECKING:
+    from harness.session import Session
+
+# The routes that confirm by email, and the response field holding the reference.
+SUBMISSIONS = {"/api/orders": ("order", "order_number"), "/api/reservations": ("reservation", "reservation_code")}
+
+# Order numbers (PED20260117...) and reservation codes (RES20260117...).
+REFERENCE = re.compile(r"\b(PED|RES)\d{8,}\b")
+
+# Longest a single GET /messages holds the connection open.
+MAX_WAIT_MS = 30000
+
+
+@dataclass
+class Message:
+    id: int
+    received: float
+    to: str
+    subject: str
+    text: str
+    kind: str | None = None
+    reference: str | None = None
+    sender: str | None = None
+
+    def matches(self, filters: dict[str, str]) -> bool:
+        return all(str(getattr(self, name, None) or "").lower() == value.lower() for name, value in filters.items())
+
+
+def _reference(*texts: str) -> str | None:
+    for text in texts:
+        found = REFERENCE.search(text or "")
+        if found:
+            return found.group(0)
+    return None
+
+
+def _kind(reference: str | None) -> str | None:
+    return {"PED": "order", "RES": "reservation"}.get((reference or "")[:3])
+
+
+class MailSink:
+    """HTTP webhook over one in-memory mailbox; usable as a context manager."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8025):
+        self.messages: list[Message] = []
+        self._arrived = threading.Condition()
+        self.httpd = ThreadingHTTPServer((host, port), _http_handler(self))
+        self.httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> dict[str, str]:
+        """What ``npm run dev`` needs to send its mail here."""
+        return {"MAIL_WEBHOOK_URL": f"{self.url}/messages"}
+
+    def add(self, **fields: Any) -> Message:
+        reference = fields.pop("reference", None) or _reference(fields.get("subject", ""), fields.get("text", ""))
+        kind = fields.pop("kind", None) or _kind(reference)
+        with self._arrived:
+            message = Message(len(self.messages) + 1, time.time(), kind=kind, reference=reference, **fields)
+            self.messages.append(message)
+            self._arrived.notify_all()
+        return message
+
+    def find(self, filters: dict[str, str], wait_ms: float = 0) -> list[Message]:
+        """Messages matching ``filters``, waiting up to ``wait_ms`` for the first one."""
+        deadline = time.monotonic() + min(wait_ms, MAX_WAIT_MS) / 1000
+        with self._arrived:
+            while True:
+                found = [m for m in self.messages if m.matches(filters)]
+                remaining = deadline - time.monotonic()
+                if found or remaining <= 0:
+                    return found
+                self._arrived.wait(remaining)
+
+    def clear(self) -> None:
+        with self._arrived:
+            self.messages.clear()
+
+    def start(self) -> "MailSink":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mail-sink", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MailSink":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def _http_handler(sink: MailSink) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = "harness-mail"
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002 - signature is stdlib's
+            pass
+
+        def _send(self, status: int, payload=None) -> None:
+            body = b"" if payload is None else json.dumps(payload).encode()
+            self.send_response(status)
+            if body:
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            url = urlsplit(self.path)
+            params = dict(parse_qsl(url.query))
+            if url.path == "/health":
+                self._send(200, {"messages": len(sink.messages)})
+            elif url.path == "/messages":
+                wait_ms = float(params.pop("wait_ms", 0) or 0)
+                self._send(200, [asdict(m) for m in sink.find(params, wait_ms)])
+            else:
+                self._send(404, {"error": f"no route for {url.path}"})
+
+        def do_POST(self) -> None:
+            if urlsplit(self.path).path != "/messages":
+                self._send(404, {"error": f"no route for {self.path}"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                to = payload["to"]
+            except (ValueError, KeyError, TypeError):
+                self._send(400, {"error": "expected a JSON object with at least 'to'"})
+                return
+            message = sink.add(
+                to=", ".join(to) if isinstance(to, list) else str(to),
+                subject=str(payload.get("subject", "")),
+                text=str(payload.get("text") or payload.get("html") or ""),
+                kind=payload.get("kind"),
+                reference=payload.get("reference"),
+                sender=payload.get("from"),
+            )
+            self._send(202, {"id": message.id, "received": message.received})
+
+        def do_DELETE(self) -> None:
+            sink.clear()
+            self._send(204)
+
+    return Handler
+
+
+def start_sink() -> MailSink | None:
+    """Start a sink at ``config.MAIL_URL``; None when something already listens there."""
+    url = urlsplit(config.MAIL_URL)
+    try:
+        return MailSink(url.hostname or "127.0.0.1", url.port or 80).start()
+    except OSError:
+        # Most likely a sink started on its own (python -m harness.mail) for a long-running dev server.
+        return None
+
+
+@dataclass
+class Submission:
+    """A ``POST /api/orders`` or ``/api/reservations`` made by the script."""
+
+    kind: str
+    posted: float
+    responded: float | None = None
+    status: int | None = None
+    reference: str | None = None
+    to: str | None = None
+
+
+class Mailbox:
+    """A session's orders and reservations, and the confirmations they were sent."""
+
+    def __init__(self, session: "Session"):
+        self.session = session
+        # The plan entry's ``email`` field: {"kind": "order" | "reservation", "timeout_ms": ...}.
+        self.spec: dict | None = plan_entry(session.script).get("email")
+        self.submissions: list[Submission] = []
+        self.deliveries: list[dict] = []
+        self.checked = False
+        self._pending: dict[Request, Submission] = {}
+        self._responded = asyncio.Event()
+
+    def attach(self, context: BrowserContext) -> None:
+        context.on("request", self._on_request)
+        context.on("response", self._on_response)
+
+    def _on_request(self, request: Request) -> None:
+        route = SUBMISSIONS.get(urlsplit(request.url).path)
+        if request.method == "POST" and route and request.url.startswith(config.BASE_URL):
+            submission = Submission(route[0], time.time())
+            self._pending[request] = submission
+            self.submissions.append(submission)
+
+    async def _on_response(self, response: Response) -> None:
+        submission = self._pending.pop(response.request, None)
+        if submission is None:
+            return
+        submission.responded, submission.status = time.time(), response.status
+        # The browser's own send time; the event above reaches us a little later.
+        started = response.request.timing.get("startTime", -1)
+        if started > 0:
+            submission.posted = started / 1000
+        try:
+            body = await response.json()
+        except (Error, ValueError):
+            body = None
+        if isinstance(body, dict):
+            submission.reference = body.get(SUBMISSIONS[urlsplit(response.url).path][1])
+            submission.to = body.get("customer_email") or body.get("email")
+        self._responded.set()
+
+    def _settled(self, kind: str) -> bool:
+        """A submission of ``kind`` was answered and none is in flight."""
+        answered = any(s.kind == kind and s.responded is not None for s in self.submissions)
+        return answered and not any(s.kind == kind for s in self._pending.values())
+
+    async def _submission(self, kind: str, deadline: float) -> Submission | None:
+        """The script's last answered submission of ``kind``, waiting for one still to come or in flight."""
+        while not self._settled(kind) and time.monotonic() < deadline:
+            self._responded.clear()
+            try:
+                await asyncio.wait_for(self._responded.wait(), deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                break
+        answered = [s for s in self.submissions if s.kind == kind and s.responded is not None]
+        return answered[-1] if answered else None
+
+    async def expect(self, timeout_ms: float, line: int = 0, kind: str | None = None) -> None:
+        """Wait for the confirmation email of the script's last order (or reservation) to reach the sink."""
+        self.checked = True
+        spec = self.spec or {}
+        kind = kind or spec.get("kind", "order")
+        timeout_ms = max(timeout_ms, spec.get("timeout_ms", config.DEFAULT_TIMEOUT_MS))
+        deadline = time.monotonic() + timeout_ms / 1000
+        async with self.session.trace.step("mail", f"{kind} confirmation email", line):
+            submission = await self._submission(kind, deadline)
+            route = next(path for path, (name, _) in SUBMISSIONS.items() if name == kind)
+            if submission is None:
+                raise AssertionError(f"no POST {route} completed in this test, so no {kind} confirmation was sent")
+            if not 200 <= (submission.status or 0) < 300 or not submission.reference:
+                raise AssertionError(f"POST {route} answered {submission.status} without a reference: nothing to confirm")
+            message = await self._wait_message(submission, deadline)
+            if message is None:
+                raise AssertionError(
+                    f"no email for {kind} {submission.reference} reached the mail sink at {config.MAIL_URL} "
+                    f"within {timeout_ms:.0f} ms (is the app running with MAIL_WEBHOOK_URL={config.MAIL_URL}/messages?)"
+                )
+            self.deliveries.append({
+                "kind": kind,
+                "reference": submission.reference,
+                "to": message["to"],
+                "latency_ms": round((message["received"] - submission.posted) * 1000, 1),
+                "after_response_ms": round((message["received"] - submission.responded) * 1000, 1),
+            })
+            if submission.to and submission.to.lower() not in message["to"].lower():
+                raise AssertionError(f"{kind} {submission.reference} was confirmed to {message['to']}, not {submission.to}")
+
+    async def _wait_message(self, submission: Submission, deadline: float) -> dict | None:
+        request = await self.session.pool.playwright.request.new_context(base_url=config.MAIL_URL)
+        try:
+            while True:
+                remaining_ms = (deadline - time.monotonic()) * 1000
+                response = await request.get(
+                    "/messages", params={"reference": submission.reference, "wait_ms": max(0, round(remaining_ms))},
+                    timeout=max(remaining_ms, 0) + config.DEFAULT_TIMEOUT_MS,
+                )
+                found = await response.json() if response.ok else []
+                if found or remaining_ms <= 0:
+                    return found[0] if found else None
+        except Error:
+            return None
+        finally:
+            await request.dispose()
+
+    async def verify(self) -> None:
+        """Runner hook: a test whose plan expects an email and never waited for it does so now."""
+        if self.spec and not self.checked:
+            await self.expect(0)
+
+    def summary(self) -> dict | None:
+        if not self.submissions:
+            return None
+        return {
+            "submissions": len(self.submissions),
+            "deliveries": self.deliveries,
+        }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.mail", description="Serve the mail sink until interrupted.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=urlsplit(config.MAIL_URL).port or 8025)
+    args = parser.parse_args(argv)
+    sink = MailSink(args.host, args.port).start()
+    for name, value in sink.env().items():
+        print(f"{name}={value}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
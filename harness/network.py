@@ -0,0 +1,83 @@
+"""Per-category network profiles: keep functional runs off third-party CDNs.
+
+The homepage and menu pull a dozen remote images (many of them 404s on
+images.unsplash.com), a Google Fonts stylesheet and its font files, none of
+which the functional scripts assert on. Under the ``stubbed`` profile those
+requests never leave the browser: images get a 1x1 placeholder, fonts are
+aborted, font stylesheets are empty and analytics beacons get a 204.
+Tests whose plan category is ``performance`` run under ``full`` and load
+everything for real, since that is what they measure.
+"""
+
+from __future__ import annotations
+
+import base64
+import re
+from collections import Counter
+
+from playwright.async_api import BrowserContext, Route
+
+from harness.plan import plan_entry
+from harness.suite import TestScript
+
+FULL = "full"
+STUBBED = "stubbed"
+AUTO = "auto"
+PROFILES = (AUTO, FULL, STUBBED)
+
+PLACEHOLDER_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mNkYAAAAAYAAjCB0C8AAAAASUVORK5CYII="
+)
+
+# next.config.mjs remotePatterns; Supabase only for its public storage bucket,
+# the same host also serves auth for the admin pages.
+IMAGE_URLS = re.compile(
+    r"^https://(images\.unsplash\.com|lh3\.googleusercontent\.com|ik\.imagekit\.io)/"
+    r"|^https://[^/]+\.supabase\.co/storage/v1/object/public/"
+    # next/image proxies remote sources through the app server.
+    r"|/_next/image\?url=https?%3A%2F%2F"
+)
+FONT_URLS = re.compile(r"^https://fonts\.(googleapis|gstatic)\.com/")
+ANALYTICS_URLS = re.compile(
+    r"^https://([^/]+\.)?(google-analytics\.com|googletagmanager\.com|doubleclick\.net"
+    r"|vitals\.vercel-insights\.com|plausible\.io|clarity\.ms|hotjar\.com)/"
+    r"|/_vercel/(insights|speed-insights)/"
+)
+
+
+def profile_for(script: TestScript, requested: str = AUTO) -> str:
+    """``requested`` unless it is ``auto``; then by the test's plan category."""
+    if requested != AUTO:
+        return requested
+    return FULL if plan_entry(script).get("category") == "performance" else STUBBED
+
+
+class Router:
+    """Installs the ``stubbed`` routes on a context and counts what it short-circuited."""
+
+    def __init__(self) -> None:
+        self.counts: Counter[str] = Counter()
+
+    async def install(self, context: BrowserContext) -> None:
+        # Regex patterns let Playwright skip interception for every other request.
+        await context.route(IMAGE_URLS, self._image)
+        await context.route(FONT_URLS, self._font)
+        await context.route(ANALYTICS_URLS, self._analytics)
+
+    async def _image(self, route: Route) -> None:
+        if route.request.resource_type != "image":
+            await route.continue_()
+            return
+        self.counts["image"] += 1
+        await route.fulfill(status=200, content_type="image/png", body=PLACEHOLDER_PNG)
+
+    async def _font(self, route: Route) -> None:
+        self.counts["font"] += 1
+        if route.request.resource_type == "stylesheet":
+            await route.fulfill(status=200, content_type="text/css", body="")
+        else:
+            await route.abort("blockedbyclient")
+
+    async def _analytics(self, route: Route) -> None:
+        self.counts["analytics"] += 1
+        await route.fulfill(status=204, body="")
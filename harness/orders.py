@@ -0,0 +1,289 @@
+"""How ``GET /api/orders/summary`` scales with the size of the order history.
+
+The route counts the orders, then downloads every order's ``status`` and
+every paid order's ``total_amount`` and reduces them in JavaScript, so its
+cost grows with the whole history. This benchmark seeds 10k, 100k and 1M
+orders into a Supabase stub and, at each size, records the summary latency,
+the bytes the route pulls from the database, the bytes it answers with and
+the server's memory (resident set before, and its peak while answering).
+
+The stub caps reads at PostgREST's max-rows (1000 on Supabase, ``--max-rows``),
+as the hosted project does, so the route's status breakdown comes back
+truncated once the history is larger than that; the report flags it.
+
+By default the stub runs as a subprocess and the three queries of the route
+are issued against it directly and reduced here. Those are stub
+measurements: latency is the Python stub's linear scans, "server memory" the
+stub's RSS, and neither says how Postgres or the Next.js route behave; only
+the bytes fetched and the truncation carry over. The report is labelled
+accordingly. With ``--stub-url`` and ``--via-app`` the Next.js route is
+called instead (it must read from that stub); pass ``--server-pid`` with the
+Next server's pid to sample its memory::
+
+    python -m harness.orders [--sizes 10000 100000 1000000] [--budget-ms 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator
+
+from harness import auth, config
+from harness.api import ApiClient
+from harness.catalog import BENCH_DIR
+from harness.stub.server import MAX_ROWS
+
+SIZES = (10_000, 100_000, 1_000_000)
+REPEAT = 3
+CHUNK = 5_000
+
+# Past this the dashboard is no longer usable.
+DEFAULT_BUDGET_MS = 1000.0
+
+STATUSES = [("completed", 0.72), ("cancelled", 0.08), ("pending", 0.08), ("preparing", 0.07), ("ready", 0.05)]
+NAMES = ["Ana", "Luis", "Rosa", "Jorge", "Carmen", "Miguel", "Lucía", "Pedro", "Sofía", "Diego"]
+
+
+def generate(start: int, stop: int, seed: int = 0) -> Iterator[list[dict]]:
+    """Orders ``start``..``stop`` in ``CHUNK``-row batches, shaped like ``POST /api/orders`` writes them."""
+    rng = random.Random(seed + start)
+    epoch = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    statuses, weights = zip(*STATUSES)
+    for chunk_start in range(start, stop, CHUNK):
+        rows = []
+        for index in range(chunk_start, min(chunk_start + CHUNK, stop)):
+            status = rng.choices(statuses, weights)[0]
+            total = round(rng.uniform(15, 250), 2)
+            created = epoch + timedelta(minutes=index)
+            name = rng.choice(NAMES)
+            rows.append({
+                "order_number": f"PED{created:%Y%m%d}{index:07d}",
+                "customer_name": f"{name} {index}",
+                "customer_email": f"{name.lower()}{index}@example.com",
+                "customer_phone": f"9{index:08d}",
+                "pickup_time": (created + timedelta(minutes=30)).isoformat().replace("+00:00", "Z"),
+                "subtotal": round(total / 1.18, 2),
+                "tax_amount": round(total - total / 1.18, 2),
+                "total_amount": total,
+                "payment_method": rng.choice(["cash", "card", "yape"]),
+                "payment_status": "completed" if status == "completed" else "pending",
+                "status": status,
+                "created_at": created.isoformat().replace("+00:00", "Z"),
+            })
+        yield rows
+
+
+class RssSampler:
+    """Polls ``/proc/<pid>/status`` on a thread; ``peak_mb`` is the largest resident set seen."""
+
+    def __init__(self, pid: int, interval: float = 0.005):
+        self.pid = pid
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def rss_mb(self) -> float:
+        with open(f"/proc/{self.pid}/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+        return 0.0
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak_mb = max(self.peak_mb, self.rss_mb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "RssSampler":
+        self.peak_mb = self.rss_mb()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+async def route_summary(stub: ApiClient) -> tuple[dict, int]:
+    """The three queries of ``summary/route.ts`` and its reduction; returns (summary, bytes fetched)."""
+    head = await stub.call("HEAD", "/rest/v1/orders?select=*", headers={"Prefer": "count=exact"})
+    statuses = await stub.get("/rest/v1/orders?select=status")
+    revenue = await stub.get("/rest/v1/orders?select=total_amount&payment_status=eq.completed")
+    for response in (head, statuses, revenue):
+        if not response.ok:
+            raise RuntimeError(f"{response.method} {response.path} answered {response.status}")
+    breakdown = {name: 0 for name, _ in STATUSES}
+    for row in statuses.body:
+        if row["status"] in breakdown:
+            breakdown[row["status"]] += 1
+    summary = {
+        "totalOrders": int(head.headers.get("content-range", "*/0").rsplit("/", 1)[1]),
+        "revenue": sum(float(row["total_amount"] or 0) for row in revenue.body),
+        "statusBreakdown": breakdown,
+    }
+    return summary, statuses.size + revenue.size
+
+
+async def measure(
+    stub: ApiClient, app: ApiClient | None, pid: int | None, repeat: int
+) -> dict[str, Any]:
+    """Median/max latency, payload sizes and server memory of the summary at the current size."""
+    summary, fetched = await route_summary(stub)
+    samples, answered = [], None
+    rss_before = peak = None
+    for _ in range(repeat + 1):
+        sampler = RssSampler(pid) if pid else None
+        if sampler and rss_before is None:
+            rss_before = sampler.rss_mb()
+        started = time.perf_counter()
+        with sampler or contextlib.nullcontext():
+            if app is not None:
+                response = await app.get("/api/orders/summary")
+                if not response.ok:
+                    raise RuntimeError(f"GET /api/orders/summary answered {response.status}")
+                summary, answered = response.body, response.size
+            else:
+                summary, _ = await route_summary(stub)
+                answered = len(json.dumps(summary))
+        if sampler:
+            peak = max(peak or 0.0, sampler.peak_mb)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples = samples[1:]  # the first request warms caches and the route
+    counted = sum(summary["statusBreakdown"].values())
+    return {
+        "median_ms": round(statistics.median(samples), 1),
+        "max_ms": round(max(samples), 1),
+        "fetched_bytes": fetched,
+        "response_bytes": answered,
+        "rss_mb": round(rss_before, 1) if rss_before else None,
+        "peak_rss_mb": round(peak, 1) if peak else None,
+        "total_orders": summary["totalOrders"],
+        # PostgREST caps responses at its max-rows setting; a short count means the breakdown was truncated.
+        "breakdown_complete": counted == summary["totalOrders"],
+    }
+
+
+async def benchmark(
+    stub_url: str, sizes: tuple[int, ...] = SIZES, repeat: int = REPEAT,
+    via_app: bool = False, pid: int | None = None,
+) -> dict[int, dict]:
+    results: dict[int, dict] = {}
+    state = auth.AUTH_DIR / "tests.json"
+    async with ApiClient(base_url=stub_url, timeout_ms=600_000) as stub, ApiClient(
+        storage_state=state if via_app and auth.is_fresh(state) else None, timeout_ms=600_000
+    ) as app:
+        try:
+            loaded = 0
+            for size in sizes:
+                started = time.perf_counter()
+                for rows in generate(loaded, size):
+                    truncate = "1" if loaded == 0 else "0"
+                    response = await stub.post(f"/__stub/load?truncate={truncate}", json={"orders": rows})
+                    if not response.ok:
+                        raise RuntimeError(f"loading orders into the stub answered {response.status}")
+                    loaded += len(rows)
+                print(f"{size:>9,} orders loaded in {time.perf_counter() - started:.1f}s")
+                results[size] = await measure(stub, app if via_app else None, pid, repeat)
+        finally:
+            await stub.post("/__stub/reset")
+    return results
+
+
+def format_report(results: dict[int, dict], budget_ms: float, via_app: bool = False) -> str:
+    lines = [] if via_app else [
+        "stub measurements: latency and memory are the in-memory stub's, not Postgres or the Next.js route",
+        "(use --stub-url ... --via-app --server-pid <next pid> for the route's own numbers)\n",
+    ]
+    lines += [f"{'orders':>10} {'median':>10} {'max':>10} {'fetched':>10} {'answer':>8} {'rss':>9} {'peak':>9}"]
+    for size, r in results.items():
+        memory = "".join(f"{value:>7.0f}MB" if value else f"{'-':>9}" for value in (r["rss_mb"], r["peak_rss_mb"]))
+        lines.append(
+            f"{size:>10,} {r['median_ms']:>8.0f}ms {r['max_ms']:>8.0f}ms {r['fetched_bytes'] / 1e6:>8.1f}MB"
+            f" {r['response_bytes']:>7}B{memory}" + ("" if r["breakdown_complete"] else "  (breakdown truncated)")
+        )
+    over = [size for size, r in results.items() if r["median_ms"] > budget_ms]
+    lines.append(
+        f"\nover the {budget_ms:.0f} ms budget from {over[0]:,} orders" if over
+        else f"\nwithin the {budget_ms:.0f} ms budget at every size"
+    )
+    return "\n".join(lines)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_healthy(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    async with ApiClient(base_url=url, timeout_ms=1000) as client:
+        while True:
+            try:
+                if (await client.get("/__stub/health")).ok:
+                    return
+            except Exception:  # noqa: BLE001 - not listening yet
+                if time.monotonic() > deadline:
+                    raise
+            await asyncio.sleep(0.1)
+
+
+async def _main(args: argparse.Namespace) -> int:
+    sizes = tuple(sorted(args.sizes))
+    if args.stub_url:
+        results = await benchmark(args.stub_url, sizes, args.repeat, args.via_app, args.server_pid)
+    else:
+        port = _free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "harness.stub", "--port", str(port), "--max-rows", str(args.max_rows)],
+            cwd=config.ROOT, stdout=subprocess.DEVNULL,
+        )
+        try:
+            url = f"http://127.0.0.1:{port}"
+            await _wait_healthy(url)
+            results = await benchmark(url, sizes, args.repeat, pid=process.pid)
+        finally:
+            process.terminate()
+            process.wait()
+    print(format_report(results, args.budget_ms, args.via_app))
+    BENCH_DIR.mkdir(parents=True, exist_ok=True)
+    path = BENCH_DIR / "orders_summary.json"
+    report = {"measured": "app" if args.via_app else "stub", "via_app": args.via_app, "budget_ms": args.budget_ms, "results": {str(s): r for s, r in results.items()}}
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"report: {path}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m harness.orders", description="/api/orders/summary latency, bytes and memory vs order count."
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="order history sizes")
+    parser.add_argument("--repeat", type=int, default=REPEAT, help="timed summaries per size")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="latency the dashboard can bear")
+    parser.add_argument("--stub-url", help="a running stub to load into (default: start one as a subprocess)")
+    parser.add_argument("--via-app", action="store_true", help="call the Next.js route, wired to --stub-url")
+    parser.add_argument("--server-pid", type=int, help="pid whose memory to sample (with --stub-url)")
+    parser.add_argument(
+        "--max-rows", type=int, default=MAX_ROWS, help="max-rows of the stub started here (0: no cap, unlike Supabase)"
+    )
+    args = parser.parse_args(argv)
+    if args.via_app and not args.stub_url:
+        parser.error("--via-app needs --stub-url: the app must be reading from the stub being loaded")
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
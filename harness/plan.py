@@ -0,0 +1,26 @@
+"""Access to each suite's ``testsprite_frontend_test_plan.json``."""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+
+from harness.config import ROOT
+from harness.suite import TestScript
+
+PLAN_FILE = "testsprite_frontend_test_plan.json"
+
+
+@lru_cache(maxsize=None)
+def load_plan(suite: str) -> dict[str, dict]:
+    """Plan entries of ``suite`` keyed by test id (``TC001``...)."""
+    path = ROOT / suite / PLAN_FILE
+    try:
+        entries = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return {entry["id"]: entry for entry in entries}
+
+
+def plan_entry(script: TestScript) -> dict:
+    return load_plan(script.suite).get(script.test_id, {})
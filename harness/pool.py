@@ -0,0 +1,177 @@
+"""Session-wide Chromium pool shared by every TC script of a run.
+
+The generated scripts each start Playwright and launch their own Chromium.
+Under the harness those calls land on the shims below instead: ``launch()``
+returns a lease on an already running browser, every ``new_context()`` is a
+fresh isolated ``BrowserContext`` on it, and ``close()``/``stop()`` only tear
+down what the script itself created. When a harness ``Session`` is attached,
+every context the script opens goes through its hooks.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+from playwright import async_api
+from playwright.async_api import Browser, BrowserContext, Playwright
+
+from harness import config
+
+
+class BrowserPool:
+    """Launches ``size`` Chromium instances once and spreads contexts over them."""
+
+    def __init__(self, size: int = 1, headless: bool = config.HEADLESS, args: list[str] | None = None):
+        if size < 1:
+            raise ValueError("pool size must be at least 1")
+        self.size = size
+        self.headless = headless
+        self.args = list(config.LAUNCH_ARGS if args is None else args)
+        self.playwright: Playwright | None = None
+        self._browsers: list[Browser] = []
+        self._open: dict[Browser, int] = {}
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> "BrowserPool":
+        if self.playwright is None:
+            self.playwright = await async_api.async_playwright().start()
+            launches = [
+                self.playwright.chromium.launch(headless=self.headless, args=self.args)
+                for _ in range(self.size)
+            ]
+            self._browsers = list(await asyncio.gather(*launches))
+            self._open = {browser: 0 for browser in self._browsers}
+        return self
+
+    async def stop(self) -> None:
+        for browser in self._browsers:
+            await browser.close()
+        self._browsers.clear()
+        self._open.clear()
+        if self.playwright is not None:
+            await self.playwright.stop()
+            self.playwright = None
+
+    async def __aenter__(self) -> "BrowserPool":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def new_context(self, **options: Any) -> BrowserContext:
+        """Open a context on the least busy browser."""
+        if not self._browsers:
+            raise RuntimeError("BrowserPool.start() has not been awaited")
+        async with self._lock:
+            browser = min(self._browsers, key=self._open.__getitem__)
+            self._open[browser] += 1
+        context = await browser.new_context(**options)
+        context.on("close", lambda _: self._release(browser))
+        return context
+
+    def _release(self, browser: Browser) -> None:
+        if browser in self._open:
+            self._open[browser] -= 1
+
+    def api(self, session: Any = None) -> "PooledAsyncApi":
+        """A stand-in for the ``async_api`` module bound to this pool."""
+        return PooledAsyncApi(self, session)
+
+
+class BrowserLease:
+    """What ``chromium.launch()`` returns to a script: a view on a pooled browser."""
+
+    def __init__(self, pool: BrowserPool, session: Any = None):
+        self._pool = pool
+        self._session = session
+        self.contexts: list[BrowserContext] = []
+
+    async def new_context(self, **options: Any) -> BrowserContext:
+        if self._session is not None:
+            options = await self._session.context_options(options)
+        context = await self._pool.new_context(**options)
+        self.contexts.append(context)
+        if self._session is not None:
+            await self._session.context_created(context)
+        return context
+
+    async def new_page(self, **options: Any):
+        context = await self.new_context(**options)
+        return await context.new_page()
+
+    def is_connected(self) -> bool:
+        return True
+
+    async def close(self, **_: Any) -> None:
+        contexts, self.contexts = self.contexts, []
+        for context in contexts:
+            try:
+                await context.close()
+            except async_api.Error:
+                pass
+
+
+class _PooledBrowserType:
+    def __init__(self, pool: BrowserPool, session: Any, leases: list[BrowserLease]):
+        self._pool = pool
+        self._session = session
+        self._leases = leases
+
+    async def launch(self, **_: Any) -> BrowserLease:
+        # Launch options from the script (headless, args) are ignored on purpose:
+        # the pool was started with the harness-wide settings.
+        lease = BrowserLease(self._pool, self._session)
+        self._leases.append(lease)
+        return lease
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pool.playwright.chromium, name)
+
+
+class PooledPlaywright:
+    """What ``async_playwright().start()`` returns to a script."""
+
+    def __init__(self, pool: BrowserPool, session: Any = None):
+        self._pool = pool
+        self.leases: list[BrowserLease] = []
+        self.chromium = _PooledBrowserType(pool, session, self.leases)
+
+    async def stop(self) -> None:
+        for lease in self.leases:
+            await lease.close()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._pool.playwright, name)
+
+
+class _PooledContextManager:
+    def __init__(self, pool: BrowserPool, session: Any = None):
+        self._pool = pool
+        self._session = session
+        self._playwright: PooledPlaywright | None = None
+
+    async def start(self) -> PooledPlaywright:
+        self._playwright = PooledPlaywright(self._pool, self._session)
+        return self._playwright
+
+    async def __aenter__(self) -> PooledPlaywright:
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._playwright is not None:
+            await self._playwright.stop()
+
+
+class PooledAsyncApi:
+    """Module proxy: ``async_playwright`` is pooled, everything else is the real API."""
+
+    def __init__(self, pool: BrowserPool, session: Any = None):
+        self._pool = pool
+        self._session = session
+
+    def async_playwright(self) -> _PooledContextManager:
+        return _PooledContextManager(self._pool, self._session)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(async_api, name)
@@ -0,0 +1,41 @@
+"""Merged JSON report for a harness run."""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+from typing import Iterable
+
+from harness import config, schedule
+
+DEFAULT_REPORT = config.STATE_DIR / "report.json"
+
+
+def build_report(results: Iterable, *, started: float, workers: int, plan: dict | None = None) -> dict:
+    results = sorted((r.to_dict() for r in results), key=lambda r: r["key"])
+    main_lane = [r for r in results if r["lane"] == "main"]
+    # Quarantined tests are reported but never fail the run.
+    failed = [r["key"] for r in main_lane if r["status"] == "FAILED"]
+    return {
+        "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started)),
+        "wall_time": round(time.time() - started, 3),
+        "total_work": round(sum(r["duration"] for r in results), 3),
+        "workers": workers,
+        "summary": {
+            "total": len(results),
+            "passed": sum(r["status"] == "PASSED" for r in main_lane),
+            "failed": len(failed),
+            "flaky": sum(r["status"] == "FLAKY" for r in main_lane),
+            "quarantined": len(results) - len(main_lane),
+        },
+        "failed": failed,
+        "schedule": {**(plan or {}), "critical_path": schedule.critical_path(main_lane)},
+        "results": results,
+    }
+
+
+def write_report(report: dict, path: Path = DEFAULT_REPORT) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
@@ -0,0 +1,452 @@
+"""AST rewrites applied to the generated scripts before they run.
+
+Each rewriter works on statement blocks (function bodies, ``try`` bodies,
+handlers, ...) and replaces script idioms with calls on the per-test session
+that the loader binds as ``__harness__``.
+"""
+
+from __future__ import annotations
+
+import ast
+import re
+from typing import TYPE_CHECKING, Any
+
+from harness import config
+
+if TYPE_CHECKING:
+    from harness.session import Session
+
+SESSION_NAME = "__harness__"
+
+ACTIONS = {"click", "dblclick", "fill", "type", "press", "check", "uncheck", "select_option", "hover", "tap"}
+
+
+def session_call(path: str, *args: ast.expr) -> ast.Await:
+    """Build ``await __harness__.<path>(*args)``."""
+    func: ast.expr = ast.Name(id=SESSION_NAME, ctx=ast.Load())
+    for attr in path.split("."):
+        func = ast.Attribute(value=func, attr=attr, ctx=ast.Load())
+    return ast.Await(value=ast.Call(func=func, args=list(args), keywords=[]))
+
+
+def awaited_call(stmt: ast.stmt) -> ast.Call | None:
+    """The call in an ``await <call>`` expression statement, if that is what ``stmt`` is."""
+    if isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Await) and isinstance(stmt.value.value, ast.Call):
+        return stmt.value.value
+    return None
+
+
+def method_name(call: ast.Call | None) -> str | None:
+    if call is not None and isinstance(call.func, ast.Attribute):
+        return call.func.attr
+    return None
+
+
+def receiver(call: ast.Call) -> ast.expr:
+    return call.func.value  # type: ignore[union-attr]
+
+
+class BlockRewriter:
+    """Base class: ``rewrite_block`` is applied to every statement list, innermost first."""
+
+    def __init__(self, session: "Session"):
+        self.session = session
+
+    def __call__(self, tree: ast.Module) -> ast.Module:
+        self._visit(tree)
+        return ast.fix_missing_locations(tree)
+
+    def _visit(self, node: ast.AST) -> None:
+        for name, value in ast.iter_fields(node):
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self._visit(item)
+                if value and all(isinstance(item, ast.stmt) for item in value):
+                    setattr(node, name, self.rewrite_block(value))
+            elif isinstance(value, ast.AST):
+                self._visit(value)
+
+    def rewrite_block(self, stmts: list[ast.stmt]) -> list[ast.stmt]:
+        return stmts
+
+    def comment(self, stmt: ast.stmt) -> str | None:
+        """The generator's comment a few lines above ``stmt``, if any."""
+        if not hasattr(self, "lines"):
+            self.lines = self.session.script.path.read_text(encoding="utf-8").splitlines()
+        for lineno in range(stmt.lineno - 1, max(0, stmt.lineno - 5), -1):
+            text = self.lines[lineno - 1].strip()
+            if text.startswith("#"):
+                return text.lstrip("#-> ").strip()
+        return None
+
+
+def _is_sleep(call: ast.Call | None) -> bool:
+    return (
+        method_name(call) == "sleep"
+        and isinstance(receiver(call), ast.Name)
+        and receiver(call).id == "asyncio"
+    )
+
+
+class WaitRewriter(BlockRewriter):
+    """``wait_for_timeout(ms)`` / ``asyncio.sleep(s)`` -> ``__harness__.waits``.
+
+    A wait directly followed by ``await <name>.<action>(...)`` becomes
+    ``before_action(<name>, ms)`` so it can wait on that locator; any other
+    fixed wait becomes ``pause(ms)``.
+    """
+
+    def rewrite_block(self, stmts: list[ast.stmt]) -> list[ast.stmt]:
+        out = []
+        for index, stmt in enumerate(stmts):
+            call = awaited_call(stmt)
+            replacement = None
+            if method_name(call) == "wait_for_timeout" and call.args:
+                following = awaited_call(stmts[index + 1]) if index + 1 < len(stmts) else None
+                target = receiver(following) if method_name(following) in ACTIONS else None
+                if isinstance(target, ast.Name):
+                    replacement = session_call("waits.before_action", ast.Name(id=target.id, ctx=ast.Load()), call.args[0])
+                else:
+                    replacement = session_call("waits.pause", call.args[0])
+            elif _is_sleep(call) and call.args:
+                millis = ast.BinOp(left=call.args[0], op=ast.Mult(), right=ast.Constant(1000))
+                replacement = session_call("waits.pause", millis)
+            out.append(ast.copy_location(ast.Expr(replacement), stmt) if replacement else stmt)
+        return out
+
+
+def _constant_arg(call: ast.Call | None) -> Any:
+    if call is not None and call.args and isinstance(call.args[0], ast.Constant):
+        return call.args[0].value
+    return None
+
+
+def _is_step_setup(stmt: ast.stmt) -> bool:
+    """``frame = ...`` / ``elem = ...`` / a fixed wait: the lead-in of a generated step."""
+    if isinstance(stmt, ast.Assign):
+        return True
+    call = awaited_call(stmt)
+    return method_name(call) == "wait_for_timeout" or _is_sleep(call)
+
+
+class LoginRewriter(BlockRewriter):
+    """Drops the opening admin login when the session starts pre-authenticated.
+
+    Matches the generated steps that fill the admin e-mail and password and
+    click the form button, provided no other action precedes them. Scripts
+    that test the login itself (``LOGIN_UNDER_TEST``) are left alone, and so
+    are later logins such as the re-login after "Salir" in TC004.
+    """
+
+    LOGIN_UNDER_TEST = {"tests/TC009", "testsprite_tests/TC007"}
+
+    def __call__(self, tree: ast.Module) -> ast.Module:
+        self.email, self.password = config.admin_credentials(self.session.script.suite)
+        if self.session.script.key in self.LOGIN_UNDER_TEST or not self.email:
+            return tree
+        return super().__call__(tree)
+
+    def rewrite_block(self, stmts: list[ast.stmt]) -> list[ast.stmt]:
+        if self.session.admin_login:
+            return stmts
+        expected = [("fill", self.email), ("fill", self.password), ("click", None)]
+        matched: list[int] = []
+        for index, stmt in enumerate(stmts):
+            call = awaited_call(stmt)
+            name = method_name(call)
+            if name not in ACTIONS:
+                continue
+            want_name, want_value = expected[len(matched)]
+            if name != want_name or (want_value is not None and _constant_arg(call) != want_value):
+                return stmts
+            matched.append(index)
+            if len(matched) == len(expected):
+                break
+        if len(matched) < len(expected):
+            return stmts
+        start = matched[0]
+        while start > 0 and _is_step_setup(stmts[start - 1]):
+            start -= 1
+        self.session.admin_login = True
+        return stmts[:start] + stmts[matched[-1] + 1:]
+
+
+def _is_settle(stmt: ast.stmt) -> bool:
+    """The generator's ``try: wait_for_load_state`` / ``for frame in page.frames`` idiom."""
+    return isinstance(stmt, (ast.Try, ast.For)) and any(
+        method_name(node) == "wait_for_load_state" for node in ast.walk(stmt) if isinstance(node, ast.Call)
+    )
+
+
+def _is_pause(stmt: ast.stmt) -> bool:
+    call = awaited_call(stmt)
+    return method_name(call) == "wait_for_timeout" or _is_sleep(call)
+
+
+def opening(stmts: list[ast.stmt]) -> tuple[int, list[tuple[int, tuple[str, str]]]]:
+    """Start index and ``(end index, (kind, target))`` steps of the gotos and clicks a block opens with.
+
+    The opening starts at the first ``goto`` and stops at the first statement
+    that is neither a goto, a click on a recorded xpath, nor the lookups,
+    pauses and load-state waits around them.
+    """
+    start, steps, xpaths = -1, [], {}
+    for index, stmt in enumerate(stmts):
+        call = awaited_call(stmt)
+        name = method_name(call)
+        if name == "goto" and isinstance(_constant_arg(call), str) and isinstance(receiver(call), ast.Name):
+            start = index if start < 0 else start
+            steps.append((index + 1, ("goto", _constant_arg(call))))
+        elif start < 0:
+            continue
+        elif isinstance(stmt, ast.Assign):
+            for node in ast.walk(stmt.value):
+                if not isinstance(node, ast.Call):
+                    continue
+                selector = _constant_arg(node)
+                if method_name(node) == "locator" and isinstance(selector, str) and selector.startswith("xpath="):
+                    xpaths.update({t.id: selector[len("xpath="):] for t in stmt.targets if isinstance(t, ast.Name)})
+        elif name == "click" and isinstance(receiver(call), ast.Name) and receiver(call).id in xpaths:
+            steps.append((index + 1, ("click", xpaths[receiver(call).id])))
+        elif not (_is_pause(stmt) or _is_settle(stmt)):
+            break
+    return start, steps
+
+
+class ForkRewriter(BlockRewriter):
+    """Wraps a script's shared opening in ``if await __harness__.fork.resume(<page>, line):``.
+
+    ``Options.forks`` says how many opening steps of the script other scripts
+    of the run share (see ``harness.fork``). When the session starts from a
+    snapshot of those steps, ``resume`` opens its URL and the wrapped steps
+    are skipped; otherwise the script runs them as written.
+    """
+
+    def __call__(self, tree: ast.Module) -> ast.Module:
+        self.length = (self.session.options.forks or {}).get(self.session.script.key, 0)
+        if not self.length:
+            return tree
+        return super().__call__(tree)
+
+    def rewrite_block(self, stmts: list[ast.stmt]) -> list[ast.stmt]:
+        start, steps = opening(stmts)
+        if self.session.fork.steps or len(steps) < self.length:
+            return stmts
+        end = steps[self.length - 1][0]
+        while end < len(stmts) and (_is_pause(stmts[end]) or _is_settle(stmts[end])):
+            end += 1
+        self.session.fork.steps = [step for _, step in steps[:self.length]]
+        page = ast.Name(id=receiver(awaited_call(stmts[start])).id, ctx=ast.Load())
+        test = session_call("fork.resume", page, ast.Constant(stmts[start].lineno))
+        wrapped = ast.If(test=test, body=stmts[start:end], orelse=[])
+        return stmts[:start] + [ast.copy_location(wrapped, stmts[start])] + stmts[end:]
+
+
+class SelectorRewriter(BlockRewriter):
+    """``<page>.locator('xpath=...')`` -> ``await __harness__.selectors.locate(<page>, 'xpath=...', comment)``."""
+
+    def rewrite_block(self, stmts: list[ast.stmt]) -> list[ast.stmt]:
+        for stmt in stmts:
+            # Compound statements hold blocks that were rewritten already.
+            if not hasattr(stmt, "body"):
+                _XpathLocators(self.comment(stmt)).visit(stmt)
+        return stmts
+
+
+class _XpathLocators(ast.NodeTransformer):
+    def __init__(self, hint: str | None):
+        self.hint = hint
+
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        self.generic_visit(node)
+        selector = _constant_arg(node)
+        if method_name(node) == "locator" and isinstance(selector, str) and selector.startswith("xpath="):
+            return ast.copy_location(
+                session_call("selectors.locate", receiver(node), node.args[0], ast.Constant(self.hint)), node
+            )
+        return node
+
+
+def _is_lookup(stmt: ast.stmt) -> bool:
+    return isinstance(stmt, ast.Assign) and any(
+        isinstance(node, ast.Call) and is_session_call(node, "selectors.locate") for node in ast.walk(stmt.value)
+    )
+
+
+EXPECTATIONS = {"to_be_visible", "to_be_hidden", "to_have_text", "to_contain_text", "to_have_url", "to_have_count"}
+
+
+def is_session_call(call: ast.Call | None, path: str) -> bool:
+    return call is not None and ast.unparse(call.func) == f"{SESSION_NAME}.{path}"
+
+
+def _visible_expectation(stmt: ast.stmt) -> tuple[str, str, ast.expr] | None:
+    """(page name, selector, timeout) of ``await expect(<page>.locator('...')[.first]).to_be_visible(...)``."""
+    call = awaited_call(stmt)
+    if method_name(call) != "to_be_visible" or call.args:
+        return None
+    expect_call = receiver(call)
+    if not (isinstance(expect_call, ast.Call) and ast.unparse(expect_call.func) == "expect" and len(expect_call.args) == 1):
+        return None
+    target = expect_call.args[0]
+    if isinstance(target, ast.Attribute) and target.attr == "first":
+        target = target.value
+    elif isinstance(target, ast.Call) and method_name(target) == "nth" and _constant_arg(target) == 0:
+        target = receiver(target)
+    selector = _constant_arg(target) if isinstance(target, ast.Call) else None
+    if method_name(target) != "locator" or not isinstance(selector, str) or not isinstance(receiver(target), ast.Name):
+        return None
+    timeout = next((k.value for k in call.keywords if k.arg == "timeout"), ast.Constant(config.DEFAULT_TIMEOUT_MS))
+    return receiver(target).id, selector, timeout
+
+
+class ExpectBatchRewriter(BlockRewriter):
+    """Folds runs of ``to_be_visible`` expectations on one page into ``assertions.expect_visible``."""
+
+    def __call__(self, tree: ast.Module) -> ast.Module:
+        if not self.session.options.batch_expects:
+            return tree
+        return super().__call__(tree)
+
+    def rewrite_block(self, stmts: list[ast.stmt]) -> list[ast.stmt]:
+        out: list[ast.stmt] = []
+        index = 0
+        while index < len(stmts):
+            first = _visible_expectation(stmts[index])
+            run = [first] if first else []
+            while first and index + len(run) < len(stmts):
+                following = _visible_expectation(stmts[index + len(run)])
+                if following is None or following[0] != first[0]:
+                    break
+                run.append(following)
+            if len(run) < 2:
+                out.append(stmts[index])
+                index += 1
+                continue
+            timeouts = [timeout for _, _, timeout in run]
+            if all(isinstance(t, ast.Constant) for t in timeouts):
+                timeout: ast.expr = ast.Constant(max(t.value for t in timeouts))
+            else:
+                timeout = ast.Call(func=ast.Name(id="max", ctx=ast.Load()), args=timeouts, keywords=[])
+            call = session_call(
+                "assertions.expect_visible",
+                ast.Name(id=first[0], ctx=ast.Load()),
+                ast.List(elts=[ast.Constant(selector) for _, selector, _ in run], ctx=ast.Load()),
+                timeout,
+            )
+            out.append(ast.copy_location(ast.Expr(call), stmts[index]))
+            index += len(run)
+        return out
+
+
+# Texts the generator expects on screen for an email only the mailbox can show.
+EMAIL_TEXT = re.compile(r"\bemail\b.*\b(received|sent|delivered)\b", re.IGNORECASE)
+
+
+def _catches_assertion(handler: ast.ExceptHandler) -> bool:
+    return handler.type is not None and ast.unparse(handler.type) == "AssertionError"
+
+
+class MailRewriter(BlockRewriter):
+    """``expect(<page>.locator('text=...Email Received')).to_be_visible()`` -> ``__harness__.mail.expect``.
+
+    Only for tests whose plan entry has an ``email`` field (see
+    ``harness.mail``): they wait on the mail sink for the confirmation of the
+    order or reservation the script placed. The generator's ``try: ... except
+    AssertionError: raise AssertionError('Test failed: ...')`` around such an
+    expectation is dropped so the failure says what the sink saw.
+    """
+
+    def __call__(self, tree: ast.Module) -> ast.Module:
+        if not self.session.mail.spec:
+            return tree
+        return super().__call__(tree)
+
+    def rewrite_block(self, stmts: list[ast.stmt]) -> list[ast.stmt]:
+        out: list[ast.stmt] = []
+        for stmt in stmts:
+            expectation = _visible_expectation(stmt)
+            if expectation and EMAIL_TEXT.search(expectation[1]):
+                call = session_call("mail.expect", expectation[2], ast.Constant(stmt.lineno))
+                stmt = ast.copy_location(ast.Expr(call), stmt)
+            elif (
+                isinstance(stmt, ast.Try) and len(stmt.body) == 1 and not stmt.orelse and not stmt.finalbody
+                and is_session_call(awaited_call(stmt.body[0]), "mail.expect")
+                and all(_catches_assertion(handler) for handler in stmt.handlers)
+            ):
+                stmt = stmt.body[0]
+            out.append(stmt)
+        return out
+
+
+class TraceRewriter(BlockRewriter):
+    """Wraps every generated step in ``async with __harness__.trace.step(kind, label, line)``.
+
+    A step is a navigation (plus the pause after it), the wait before an
+    action plus the action, an ``expect(...)`` assertion, or a lone pause.
+    Labels come from the comment the generator wrote above the step.
+    """
+
+    def classify(self, stmts: list[ast.stmt], index: int) -> tuple[str, int, str] | None:
+        """(kind, statements in the step, label) for a step starting at ``index``."""
+        call = awaited_call(stmts[index])
+        name = method_name(call)
+        following = awaited_call(stmts[index + 1]) if index + 1 < len(stmts) else None
+        if is_session_call(call, "assertions.expect_visible"):
+            selectors = call.args[1].elts
+            return "expect", 1, f"to_be_visible x{len(selectors)} {selectors[0].value} ..."
+        if name in EXPECTATIONS:
+            # Assertions come in runs with one comment for the lot; label by selector.
+            selector = next(
+                (n.value for n in ast.walk(receiver(call)) if isinstance(n, ast.Constant) and isinstance(n.value, str)),
+                ast.unparse(receiver(call)),
+            )
+            return "expect", 1, f"{name} {selector}"
+        if _is_lookup(stmts[index]) and index + 2 < len(stmts):
+            step = self.classify(stmts, index + 1)
+            if step is not None and step[0] in ACTIONS:
+                # The lookup belongs to the action it resolves the target for.
+                return step[0], step[1] + 1, self.comment(stmts[index]) or step[2]
+            return None
+        if is_session_call(call, "waits.before_action") and method_name(following) in ACTIONS:
+            kind, size, call = method_name(following), 2, following
+        elif name == "goto":
+            kind, size = "goto", 2 if is_session_call(following, "waits.pause") else 1
+        elif name in ACTIONS:
+            kind, size = name, 1
+        elif is_session_call(call, "waits.pause"):
+            kind, size = "wait", 1
+        else:
+            return None
+        if kind == "wait":
+            fallback = f"pause {ast.unparse(call.args[0])} ms"
+        elif call.args and isinstance(call.args[0], ast.Constant):
+            fallback = call.args[0].value
+        else:
+            fallback = ast.unparse(call)[:80]
+        return kind, size, self.comment(stmts[index]) or str(fallback)
+
+    def rewrite_block(self, stmts: list[ast.stmt]) -> list[ast.stmt]:
+        out: list[ast.stmt] = []
+        index = 0
+        while index < len(stmts):
+            step = self.classify(stmts, index)
+            if step is None:
+                out.append(stmts[index])
+                index += 1
+                continue
+            kind, size, label = step
+            first = stmts[index]
+            item = ast.withitem(
+                context_expr=session_call(
+                    "trace.step",
+                    ast.Constant(kind),
+                    ast.Constant(label),
+                    ast.Constant(first.lineno),
+                ).value,
+                optional_vars=None,
+            )
+            out.append(ast.copy_location(ast.AsyncWith(items=[item], body=stmts[index:index + size]), first))
+            index += size
+        return out
@@ -0,0 +1,199 @@
+"""Runs TC scripts through the loader against shared browser pools.
+
+``run_parallel`` splits the scripts into shards, one per worker process,
+longest-first by duration history (``harness.schedule``). Each worker starts its own pool and event loop and runs its shard sequentially;
+results come back to the parent and are merged into a single list.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+
+from harness import api_checks, auth, cart, loader, schedule, vitals
+from harness.plan import plan_entry
+from harness.pool import BrowserPool
+from harness.session import Options, Session
+from harness.suite import TestScript
+
+PASSED = "PASSED"
+FAILED = "FAILED"
+
+# Per-leg fields kept in a device matrix result.
+DEVICE_FIELDS = ("device", "status", "duration", "error", "trace", "pw_traces", "blackbox", "load_ms", "vitals", "mail")
+
+
+@dataclass
+class TestResult:
+    key: str
+    suite: str
+    test_id: str
+    title: str
+    status: str
+    duration: float
+    error: str | None = None
+    worker: int = 0
+    trace: str | None = None
+    vitals: list[dict] | None = None
+    console_errors: list[dict] | None = None
+    pw_traces: list[str] | None = None
+    attempts: list[dict] | None = None
+    lane: str = "main"
+    blackbox: str | None = None
+    device: str | None = None
+    # Wall time of the script's page.goto() steps.
+    load_ms: float | None = None
+    devices: list[dict] | None = None
+    # Confirmation emails the test waited for, with their latency (harness.mail).
+    mail: list[dict] | None = None
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def matrix_devices(script: TestScript) -> list[str]:
+    """Device descriptors a test's plan entry asks for (``devices``, or its performance spec's)."""
+    entry = plan_entry(script)
+    return entry.get("devices") or (entry.get("performance") or {}).get("devices") or []
+
+
+async def run_script(script: TestScript, pool: BrowserPool, options: Options | None = None) -> TestResult:
+    options = options or Options()
+    devices = matrix_devices(script) if options.device_matrix and script.key not in api_checks.REPLACES else []
+    if len(devices) > 1:
+        return await run_matrix(script, pool, options, devices)
+    return await _run_once(script, pool, options, devices[0] if devices else None)
+
+
+async def run_matrix(script: TestScript, pool: BrowserPool, options: Options, devices: list[str]) -> TestResult:
+    """Run the test body once per device, all legs as concurrent contexts of the same pool.
+
+    Web Vitals budgets are enforced afterwards, one device at a time, so the
+    legs do not compete for CPU while they are measured (see ``harness.vitals``).
+    """
+    started = time.perf_counter()
+    legs = await asyncio.gather(
+        *(_run_once(script, pool, options, device, enforce_vitals=False) for device in devices)
+    )
+    failed = [leg for leg in legs if leg.status == FAILED]
+    errors = [f"[{leg.device}] {leg.error}" for leg in failed]
+    measured = None
+    performance = plan_entry(script).get("performance")
+    if performance and not failed:
+        try:
+            measured = await vitals.enforce(pool, performance, devices)
+        except Exception as exc:  # noqa: BLE001 - any failure is a test failure
+            errors.append("".join(traceback.format_exception_only(type(exc), exc)).strip())
+            measured = getattr(exc, "vitals", None)
+    for leg in legs:
+        leg.vitals = [v.to_dict() for v in measured or [] if v.device == leg.device] or None
+    # Single-result consumers (the store, the summary line) get the first failing leg's artifacts.
+    shown = failed[0] if failed else legs[0]
+    return TestResult(
+        key=script.key,
+        suite=script.suite,
+        test_id=script.test_id,
+        title=script.title,
+        status=FAILED if errors else PASSED,
+        duration=round(time.perf_counter() - started, 3),
+        error="\n".join(errors) or None,
+        trace=shown.trace,
+        vitals=[v.to_dict() for v in measured] if measured else None,
+        console_errors=[{**e, "device": leg.device} for leg in legs for e in leg.console_errors or []] or None,
+        pw_traces=[path for leg in legs for path in leg.pw_traces or []] or None,
+        blackbox=shown.blackbox,
+        devices=[
+            {k: v for k, v in leg.to_dict().items() if k in DEVICE_FIELDS}
+            for leg in legs
+        ],
+    )
+
+
+async def _run_once(
+    script: TestScript, pool: BrowserPool, options: Options, device: str | None = None, enforce_vitals: bool = True
+) -> TestResult:
+    started = time.perf_counter()
+    status, error = PASSED, None
+    session = Session(script, pool, options, device)
+    measured = blackbox = None
+    try:
+        if script.key in api_checks.REPLACES:
+            await api_checks.run_as_test(await auth.admin_state(pool, script.suite))
+        elif script == cart.CASES:
+            await cart.run_as_test(pool)
+        else:
+            run_test = loader.load(script, session)
+            await run_test()
+            await session.mail.verify()
+        performance = plan_entry(script).get("performance")
+        if performance and enforce_vitals:
+            measured = await vitals.enforce(pool, performance, [device] if device else None)
+    except Exception as exc:  # noqa: BLE001 - any failure is a test failure
+        status = FAILED
+        error = "".join(traceback.format_exception_only(type(exc), exc)).strip()
+        measured = getattr(exc, "vitals", measured)
+        blackbox = await session.blackbox.dump(error)
+    await session.har.finish()
+    session.selectors.save()
+    trace = str(session.trace.write()) if session.trace.steps else None
+    gotos = [step.wall_ms for step in session.trace.steps if step.kind == "goto"]
+    return TestResult(
+        key=script.key,
+        suite=script.suite,
+        test_id=script.test_id,
+        title=script.title,
+        status=status,
+        duration=round(time.perf_counter() - started, 3),
+        error=error,
+        trace=trace,
+        vitals=[v.to_dict() for v in measured] if measured else None,
+        console_errors=session.console_errors or None,
+        pw_traces=session.pw_traces or None,
+        blackbox=str(blackbox) if blackbox else None,
+        device=device,
+        load_ms=round(sum(gotos), 1) if gotos else None,
+        mail=session.mail.deliveries or None,
+    )
+
+
+async def run_scripts(
+    scripts: list[TestScript], options: Options | None = None, pool_size: int = 1
+) -> list[TestResult]:
+    """Run ``scripts`` one after another on a single pool started once."""
+    results = []
+    async with BrowserPool(size=pool_size) as pool:
+        for script in scripts:
+            results.append(await run_script(script, pool, options))
+    return results
+
+
+def _run_shard(worker: int, scripts: list[TestScript], options: Options | None) -> list[TestResult]:
+    results = asyncio.run(run_scripts(scripts, options))
+    for result in results:
+        result.worker = worker
+    return results
+
+
+def run_parallel(
+    scripts: list[TestScript], workers: int = 1, options: Options | None = None, shards: list[list[TestScript]] | None = None
+) -> list[TestResult]:
+    """Run the shards in ``workers`` processes and merge their results.
+
+    ``shards`` defaults to the longest-first plan from ``schedule.plan``.
+    """
+    if shards is None:
+        shards, _ = schedule.plan(scripts, workers)
+    if len(shards) <= 1:
+        return _run_shard(0, [s for batch in shards for s in batch], options)
+    results: list[TestResult] = []
+    with ProcessPoolExecutor(max_workers=len(shards)) as executor:
+        futures = [
+            executor.submit(_run_shard, worker, batch, options)
+            for worker, batch in enumerate(shards)
+        ]
+        for future in as_completed(futures):
+            results.extend(future.result())
+    return results
@@ -0,0 +1,114 @@
+"""Longest-processing-time-first sharding from per-test duration history.
+
+Durations range from TC004's dozens of three-second steps to the nearly
+empty testsprite TC011, so round-robin shards finish far apart. Each test's
+estimate is the mean of its last ``KEEP`` harness runs, kept in
+``.harness/durations.json``; tests never run here fall back to
+``modified - created`` from the suite's ``tmp/test_results.json``, rescaled by
+the median ratio between both sources so the two units stay comparable.
+Tests with no data at all get the median estimate.
+
+``plan`` deals the longest tests first, each to the least-loaded worker, and
+``critical_path`` names the worker whose chain of tests set the wall time.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import statistics
+from datetime import datetime
+from typing import Iterable
+
+from harness.config import STATE_DIR, SUITE_DIRS
+from harness.suite import TestScript
+
+HISTORY_FILE = STATE_DIR / "durations.json"
+KEEP = 10
+DEFAULT_ESTIMATE = 30.0
+
+
+def _parse_time(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def seed_durations() -> dict[str, float]:
+    """``suite/TCxxx`` -> seconds between ``created`` and ``modified`` in TestSprite's results."""
+    seeds = {}
+    for suite in SUITE_DIRS:
+        try:
+            entries = json.loads((suite / "tmp" / "test_results.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        for entry in entries:
+            try:
+                elapsed = (_parse_time(entry["modified"]) - _parse_time(entry["created"])).total_seconds()
+            except (KeyError, ValueError):
+                continue
+            test_id = entry.get("title", "").split("-", 1)[0]
+            if test_id and elapsed > 0:
+                seeds[f"{suite.name}/{test_id}"] = elapsed
+    return seeds
+
+
+def load_history() -> dict[str, list[float]]:
+    try:
+        return json.loads(HISTORY_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def record(results: Iterable) -> None:
+    """Append this run's durations to the history (``TestResult``-like objects)."""
+    history = load_history()
+    for result in results:
+        history[result.key] = (history.get(result.key, []) + [round(result.duration, 3)])[-KEEP:]
+    HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+    HISTORY_FILE.write_text(json.dumps(history, indent=1, sort_keys=True), encoding="utf-8")
+
+
+def estimates(keys: Iterable[str]) -> dict[str, float]:
+    history = {key: statistics.fmean(runs) for key, runs in load_history().items() if runs}
+    seeds = seed_durations()
+    ratios = [history[key] / seeds[key] for key in history.keys() & seeds.keys()]
+    scale = statistics.median(ratios) if ratios else 1.0
+    known = {key: history.get(key, seeds[key] * scale if key in seeds else None) for key in keys}
+    fallback = statistics.median([v for v in known.values() if v is not None] or [DEFAULT_ESTIMATE])
+    return {key: value if value is not None else fallback for key, value in known.items()}
+
+
+def plan(scripts: list[TestScript], workers: int) -> tuple[list[list[TestScript]], dict]:
+    """LPT shards for ``workers`` plus the predicted schedule."""
+    guess = estimates(s.key for s in scripts)
+    count = max(1, min(workers, len(scripts)))
+    shards: list[list[TestScript]] = [[] for _ in range(count)]
+    loads = [(0.0, worker) for worker in range(count)]
+    for script in sorted(scripts, key=lambda s: guess[s.key], reverse=True):
+        load, worker = heapq.heappop(loads)
+        shards[worker].append(script)
+        heapq.heappush(loads, (load + guess[script.key], worker))
+    predicted = [round(sum(guess[s.key] for s in shard), 1) for shard in shards]
+    total = sum(guess.values())
+    return [s for s in shards if s], {
+        "predicted_makespan": max(predicted, default=0.0),
+        # No schedule beats the longest single test or a perfect split.
+        "lower_bound": round(max(max(guess.values(), default=0.0), total / count), 1),
+        "predicted_loads": predicted,
+    }
+
+
+def critical_path(results: list[dict]) -> dict:
+    """The worker that finished last and the tests it ran, from report result dicts."""
+    by_worker: dict[int, list[dict]] = {}
+    for result in results:
+        by_worker.setdefault(result["worker"], []).append(result)
+    if not by_worker:
+        return {}
+    loads = {worker: round(sum(r["duration"] for r in runs), 3) for worker, runs in by_worker.items()}
+    worker = max(loads, key=loads.get)
+    return {
+        "worker": worker,
+        "duration": loads[worker],
+        "tests": [r["key"] for r in by_worker[worker]],
+        "worker_loads": [loads[w] for w in sorted(loads)],
+    }
@@ -0,0 +1,252 @@
+"""Resolves the generated absolute xpaths to stable locators.
+
+Every element the scripts touch is addressed as ``xpath=html/body/div[2]/...``:
+a full DOM walk per lookup that breaks as soon as a page gains a wrapper div,
+after which the action burns its whole timeout. ``SelectorRewriter`` routes
+those ``locator()`` calls through :meth:`Selectors.locate`, which tries, in
+one in-page probe:
+
+1. the fingerprint learned for this xpath on an earlier run
+   (``data-testid``, ``id``, ``name``, ``aria-label``, ``placeholder``, visible
+   text, or text scoped under the nearest heading),
+2. role/text/``data-testid`` candidates built from the strings the generator
+   quoted in the step's comment, accepted only when they match exactly one
+   element of the recorded tag (and the recorded element, while it exists),
+3. the recorded xpath itself, as the last resort.
+
+Whatever wins is fingerprinted and remembered in ``.harness/selectors.json``.
+Within one page snapshot (no navigation and no action since) a repeated lookup
+reuses the resolved locator without probing. Each lookup's strategy and cost
+end up in the trace.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import json
+import os
+import re
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext, Error, Locator, Page
+
+from harness import config
+
+if TYPE_CHECKING:
+    from harness.session import Session
+
+CACHE_FILE = config.STATE_DIR / "selectors.json"
+LOOKUP_TIMEOUT_MS = config.DEFAULT_TIMEOUT_MS
+PROBE_INTERVAL_MS = 100
+
+_QUOTED = re.compile(r"'([^']{1,60})'|\"([^\"]{1,60})\"")
+_LAST_TAG = re.compile(r"/([a-z][a-z0-9]*)(\[\d+\])?$")
+
+_PROBE_JS = """({ xpath, cached, hints, tag }) => {
+  const all = (xp) => {
+    try {
+      const r = document.evaluate(xp, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+      const out = [];
+      for (let i = 0; i < r.snapshotLength; i++) out.push(r.snapshotItem(i));
+      return out;
+    } catch (e) {
+      return [];
+    }
+  };
+  const unique = (xp) => { const found = all(xp); return found.length === 1 ? found[0] : null; };
+  const lit = (s) => (!s.includes("'") ? `'${s}'` : !s.includes('"') ? `"${s}"` : null);
+  const text = (el) => (el.innerText || el.textContent || "").replace(/\\s+/g, " ").trim();
+  const fingerprint = (el) => {
+    const t = el.tagName.toLowerCase();
+    const own = [];
+    for (const attr of ["data-testid", "id", "name", "aria-label", "placeholder", "title"]) {
+      const value = el.getAttribute(attr);
+      // React useId() ids (":r3:") change between renders.
+      if (!value || (attr === "id" && value.startsWith(":"))) continue;
+      const q = lit(value);
+      if (q) own.push(`//${t}[@${attr}=${q}]`);
+    }
+    const label = text(el);
+    if (label && label.length <= 80 && lit(label)) own.push(`//${t}[normalize-space()=${lit(label)}]`);
+    for (const xp of own) if (unique(xp) === el) return xp;
+    // Same button in every product card: scope it under the card's heading.
+    for (const xp of own) {
+      let a = el.parentElement;
+      for (let depth = 0; a && depth < 6; depth++, a = a.parentElement) {
+        const heading = a.querySelector("h1, h2, h3, h4, h5, h6, label");
+        const q = heading && !heading.contains(el) && text(heading) && lit(text(heading));
+        if (!q) continue;
+        let up = 0;
+        for (let n = heading; n && n !== a; n = n.parentElement) up++;
+        const scoped = `//${heading.tagName.toLowerCase()}[normalize-space()=${q}]/ancestor::*[${up}]${xp}`;
+        if (unique(scoped) === el) return scoped;
+      }
+    }
+    if (own.length) {
+      const index = all(own[0]).indexOf(el);
+      if (index >= 0) return `(${own[0]})[${index + 1}]`;
+    }
+    return null;
+  };
+  const recorded = all(xpath)[0] || null;
+  const recordedFits = recorded && (tag === "*" || recorded.tagName.toLowerCase() === tag);
+  if (cached && unique(cached)) return { how: "cached", selector: cached, learned: null };
+  for (const xp of hints) {
+    const el = unique(xp);
+    if (el && (!recordedFits || el === recorded)) return { how: "hint", selector: xp, learned: fingerprint(el) };
+  }
+  if (recorded) return { how: "xpath", selector: xpath, learned: fingerprint(recorded) };
+  return null;
+}"""
+
+
+def _literal(text: str) -> str | None:
+    if "'" not in text:
+        return f"'{text}'"
+    if '"' not in text:
+        return f'"{text}"'
+    return None
+
+
+def last_tag(xpath: str) -> str:
+    match = _LAST_TAG.search(xpath)
+    return match.group(1) if match else "*"
+
+
+def hint_xpaths(xpath: str, hint: str | None) -> list[str]:
+    """Candidate xpaths from the strings quoted in the step's comment."""
+    tag = last_tag(xpath)
+    candidates = []
+    for groups in _QUOTED.findall(hint or ""):
+        literal = _literal((groups[0] or groups[1]).strip())
+        if not literal:
+            continue
+        candidates += [
+            f"//*[@data-testid={literal}]",
+            f"//{tag}[@aria-label={literal}]",
+            f"//{tag}[@placeholder={literal}]",
+            f"//{tag}[normalize-space()={literal}]",
+        ]
+    return candidates
+
+
+@lru_cache(maxsize=1)
+def _stored() -> dict[str, str]:
+    try:
+        return json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+@dataclass
+class Lookup:
+    xpath: str
+    how: str
+    ms: float
+    probes: int
+
+
+class Selectors:
+    def __init__(self, session: "Session"):
+        self.session = session
+        self.lookups: list[Lookup] = []
+        # Cumulative seconds spent in lookups; the tracer reads it per step.
+        self.spent = 0.0
+        self.learned: dict[str, str] = {}
+        self._generation: Counter[int] = Counter()
+        self._memo: dict[tuple, tuple[str, str]] = {}
+
+    def attach(self, context: BrowserContext) -> None:
+        context.on("page", self._watch)
+
+    def _watch(self, page: Page) -> None:
+        def navigated(frame) -> None:
+            if frame == page.main_frame:
+                self._generation[id(page)] += 1
+
+        page.on("framenavigated", navigated)
+
+    def _cache_key(self, page: Page, xpath: str) -> str:
+        return f"{self.session.script.key} {urlsplit(page.url).path} {xpath}"
+
+    def _snapshot(self, page: Page, xpath: str) -> tuple:
+        return id(page), self._generation[id(page)], self.session.waits.actions, xpath
+
+    async def locate(self, page: Page, selector: str, hint: str | None = None) -> Locator:
+        """Replaces ``page.locator('xpath=...')`` in the generated scripts."""
+        xpath = selector.removeprefix("xpath=")
+        if not self.session.options.stable_selectors:
+            return page.locator(selector)
+        started = time.perf_counter()
+        memo = self._memo.get(self._snapshot(page, xpath))
+        if memo is not None:
+            return self._finish(page, xpath, memo[0], "memo", 0, started)
+        await self.session.waits.settle_page(LOOKUP_TIMEOUT_MS)
+        key = self._cache_key(page, xpath)
+        args = {
+            "xpath": xpath,
+            "cached": self.learned.get(key) or _stored().get(key),
+            "hints": hint_xpaths(xpath, hint),
+            "tag": last_tag(xpath),
+        }
+        deadline = started + LOOKUP_TIMEOUT_MS / 1000
+        probes = 0
+        while True:
+            probes += 1
+            try:
+                found = await page.evaluate(_PROBE_JS, args)
+            except Error:
+                found = None  # navigation replaced the document mid-probe
+            if found is not None:
+                if found["learned"]:
+                    self.learned[key] = found["learned"]
+                self._memo[self._snapshot(page, xpath)] = (found["selector"], found["how"])
+                return self._finish(page, xpath, found["selector"], found["how"], probes, started)
+            if time.perf_counter() >= deadline:
+                # Let Playwright fail on the recorded xpath with its usual error.
+                return self._finish(page, xpath, xpath, "missing", probes, started)
+            await asyncio.sleep(PROBE_INTERVAL_MS / 1000)
+
+    def _finish(self, page: Page, xpath: str, selector: str, how: str, probes: int, started: float) -> Locator:
+        elapsed = time.perf_counter() - started
+        self.spent += elapsed
+        self.lookups.append(Lookup(xpath, how, round(elapsed * 1000, 1), probes))
+        return page.locator(f"xpath={selector}")
+
+    def summary(self) -> dict:
+        return {
+            "count": len(self.lookups),
+            "ms": round(sum(lookup.ms for lookup in self.lookups), 1),
+            "by_strategy": dict(Counter(lookup.how for lookup in self.lookups)),
+            "slowest": [asdict(lookup) for lookup in sorted(self.lookups, key=lambda l: l.ms, reverse=True)[:3]],
+        }
+
+    def save(self) -> None:
+        """Merge what this session learned into ``.harness/selectors.json``.
+
+        Shard workers save concurrently; the read-update-write runs under an
+        flock on ``selectors.lock`` so none drops what another just learned.
+        """
+        if not self.learned:
+            return
+        CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        with open(CACHE_FILE.with_suffix(".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                try:
+                    current = json.loads(CACHE_FILE.read_text(encoding="utf-8"))
+                except (OSError, ValueError):
+                    current = {}
+                current.update(self.learned)
+                tmp = CACHE_FILE.with_suffix(f".{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(current, indent=1, sort_keys=True, ensure_ascii=False), encoding="utf-8")
+                tmp.replace(CACHE_FILE)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        _stored.cache_clear()
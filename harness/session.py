@@ -0,0 +1,128 @@
+"""Per-test state threaded through a script run.
+
+A ``Session`` is created for every script execution. The loader binds it to
+the script's namespace as ``__harness__`` (the target of rewritten calls) and
+the pool shims report every context the script opens back to it, so harness
+features can adjust context options and subscribe to context events without
+the script knowing.
+"""
+
+from __future__ import annotations
+
+import re
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from playwright.async_api import BrowserContext, ConsoleMessage, Error, Page
+
+from harness import auth, cart, flaky, fork, har, mail, network
+from harness.assertions import Assertions
+from harness.blackbox import BlackBox
+from harness.pool import BrowserPool, PooledAsyncApi
+from harness.selectors import Selectors
+from harness.suite import TestScript
+from harness.trace import Tracer
+from harness.waits import WaitEngine
+
+
+@dataclass
+class Options:
+    """Run-wide switches, picklable so they can cross into worker processes."""
+
+    fixed_waits: bool = False
+    network: str = network.AUTO
+    har: str = har.OFF
+    stable_selectors: bool = True
+    batch_expects: bool = True
+    device_matrix: bool = True
+    # Shared opening steps to fork from a snapshot, by script key (harness.fork.plan).
+    forks: dict[str, int] | None = None
+    blackbox: bool = True
+    # Set for the isolated reruns of failed tests (harness.flaky).
+    playwright_trace: bool = False
+    attempt: int = 0
+
+
+class Session:
+    def __init__(
+        self, script: TestScript, pool: BrowserPool, options: Options | None = None, device: str | None = None
+    ):
+        self.script = script
+        # Playwright device descriptor name when the run is one leg of a device matrix.
+        self.device = device
+        self.pool = pool
+        self.options = options or Options()
+        self.contexts: list[BrowserContext] = []
+        self.waits = WaitEngine(self)
+        self.trace = Tracer(self)
+        self.selectors = Selectors(self)
+        self.assertions = Assertions(self)
+        self.blackbox = BlackBox(self)
+        self.fork = fork.Fork(self)
+        self.mail = mail.Mailbox(self)
+        self.cart = cart.Seed(self)
+        self.network_profile = network.profile_for(script, self.options.network)
+        self.router = network.Router()
+        self.har = har.HarLog(script, self.options.har, self.artifact_name)
+        self.console_errors: list[dict] = []
+        self.pw_traces: list[str] = []
+        self._started = time.perf_counter()
+        # Set by LoginRewriter when it dropped the script's opening admin login.
+        self.admin_login = False
+
+    @property
+    def api(self) -> PooledAsyncApi:
+        return self.pool.api(self)
+
+    @property
+    def artifact_name(self) -> str:
+        """File stem for this session's traces and recordings: ``TC001`` or ``TC001@pixel-5``."""
+        if self.device is None:
+            return self.script.test_id
+        return f"{self.script.test_id}@{re.sub(r'[^a-z0-9]+', '-', self.device.lower()).strip('-')}"
+
+    @property
+    def page(self) -> Page | None:
+        """The page the script is driving: the newest page of the newest context."""
+        for context in reversed(self.contexts):
+            if context.pages:
+                return context.pages[-1]
+        return None
+
+    async def context_options(self, options: dict[str, Any]) -> dict[str, Any]:
+        """Hook: adjust ``new_context()`` options before the context is created."""
+        if self.device is not None:
+            options = {**options, **self.pool.playwright.devices[self.device]}
+        if self.admin_login and "storage_state" not in options:
+            state = await auth.admin_state(self.pool, self.script.suite)
+            options = {**options, "storage_state": str(state)}
+        options = await self.fork.context_options(options)
+        return await self.cart.context_options(options)
+
+    async def context_created(self, context: BrowserContext) -> None:
+        """Hook: a context was opened by the script."""
+        self.contexts.append(context)
+        if self.options.playwright_trace:
+            await flaky.start_tracing(self, context)
+        self.waits.attach(context)
+        self.trace.attach(context)
+        self.selectors.attach(context)
+        self.blackbox.attach(context)
+        self.mail.attach(context)
+        if self.network_profile == network.STUBBED:
+            await self.router.install(context)
+        await self.har.attach(context)
+        context.on("console", self._on_console)
+        context.on("page", lambda page: page.on("pageerror", self._on_page_error))
+
+    def _log_error(self, kind: str, message: str, url: str | None) -> None:
+        at_ms = round((time.perf_counter() - self._started) * 1000, 1)
+        self.console_errors.append({"type": kind, "message": message, "url": url, "at_ms": at_ms})
+
+    def _on_console(self, message: ConsoleMessage) -> None:
+        if message.type == "error":
+            self._log_error("console", message.text, message.location.get("url"))
+
+    def _on_page_error(self, error: Error) -> None:
+        self._log_error("pageerror", str(error), None)
@@ -0,0 +1,62 @@
+"""Latency bookkeeping shared by the load, stress and benchmark tools."""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+
+
+def percentile(values: list[float], q: float) -> float | None:
+    """Linear-interpolated ``q``-th percentile (0-100) of ``values``."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+@dataclass
+class LatencyStats:
+    name: str
+    samples: list[float] = field(default_factory=list)
+    errors: int = 0
+    error_kinds: dict[str, int] = field(default_factory=dict)
+
+    def add(self, elapsed_ms: float, ok: bool = True, kind: str | None = None) -> None:
+        self.samples.append(elapsed_ms)
+        if not ok:
+            self.errors += 1
+            if kind:
+                self.error_kinds[kind] = self.error_kinds.get(kind, 0) + 1
+
+    @property
+    def count(self) -> int:
+        return len(self.samples)
+
+    def summary(self, duration_s: float | None = None) -> dict:
+        def rounded(q: float) -> float | None:
+            value = percentile(self.samples, q)
+            return None if value is None else round(value, 1)
+
+        return {
+            "endpoint": self.name,
+            "requests": self.count,
+            "errors": self.errors,
+            "error_rate": round(self.errors / self.count, 4) if self.count else 0.0,
+            "throughput_rps": round(self.count / duration_s, 2) if duration_s else None,
+            "p50_ms": rounded(50),
+            "p95_ms": rounded(95),
+            "p99_ms": rounded(99),
+            "max_ms": round(max(self.samples), 1) if self.samples else None,
+            "error_kinds": dict(self.error_kinds),
+        }
+
+
+def format_table(rows: list[dict], columns: list[str]) -> str:
+    """Plain fixed-width table for terminal output."""
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns} if rows else {}
+    lines = ["  ".join(c.ljust(widths.get(c, len(c))) for c in columns)]
+    for row in rows:
+        lines.append("  ".join(str(row.get(c, "")).ljust(widths[c]) for c in columns))
+    return "\n".join(lines)
@@ -0,0 +1,296 @@
+"""Append-only SQLite store of every run, replacing the rewritten ``tmp/test_results.json``.
+
+Rows are only ever inserted: one ``runs`` row per harness invocation (or
+imported TestSprite file), one ``results`` row per test in it, with the
+script source kept once per content hash in ``code`` rather than once per
+record. ``attempts`` holds the isolated reruns of failed tests, ``steps``
+the per-step trace, ``timings`` named numbers (trace totals, Web Vitals per
+device) and ``console_errors`` what the browser logged. Trend queries read the indexed tables directly::
+
+    python -m harness.store import
+    python -m harness.store trend tests/TC004 --last 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import subprocess
+from contextlib import closing
+from datetime import datetime
+from pathlib import Path
+
+from harness.config import ROOT, STATE_DIR, SUITE_DIRS
+from harness.stats import format_table, percentile
+
+DB_FILE = STATE_DIR / "results.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started TEXT NOT NULL,
+    source TEXT NOT NULL,
+    workers INTEGER,
+    wall_time REAL,
+    git_rev TEXT,
+    import_key TEXT UNIQUE
+);
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    suite TEXT NOT NULL,
+    test_id TEXT NOT NULL,
+    title TEXT
+);
+CREATE TABLE IF NOT EXISTS code (
+    sha TEXT PRIMARY KEY,
+    source TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    test_id INTEGER NOT NULL REFERENCES tests(id),
+    status TEXT NOT NULL,
+    duration REAL,
+    error TEXT,
+    worker INTEGER,
+    code_sha TEXT REFERENCES code(sha),
+    external_id TEXT,
+    visualization TEXT
+);
+CREATE INDEX IF NOT EXISTS results_by_test ON results (test_id, run_id);
+CREATE TABLE IF NOT EXISTS steps (
+    result_id INTEGER NOT NULL REFERENCES results(id),
+    idx INTEGER NOT NULL,
+    kind TEXT,
+    label TEXT,
+    line INTEGER,
+    start_ms REAL,
+    wall_ms REAL,
+    wait_ms REAL,
+    resolve_ms REAL,
+    network_ms REAL,
+    lookup_ms REAL,
+    error TEXT,
+    PRIMARY KEY (result_id, idx)
+);
+CREATE TABLE IF NOT EXISTS timings (
+    result_id INTEGER NOT NULL REFERENCES results(id),
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (result_id, name)
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    result_id INTEGER NOT NULL REFERENCES results(id),
+    attempt INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    duration REAL,
+    error TEXT,
+    pw_traces TEXT,
+    PRIMARY KEY (result_id, attempt)
+);
+CREATE TABLE IF NOT EXISTS console_errors (
+    result_id INTEGER NOT NULL REFERENCES results(id),
+    type TEXT,
+    message TEXT,
+    url TEXT,
+    at_ms REAL
+);
+"""
+
+STEP_COLUMNS = ("kind", "label", "line", "start_ms", "wall_ms", "wait_ms", "resolve_ms", "network_ms", "lookup_ms", "error")
+
+
+def connect(path: Path = DB_FILE) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(path, timeout=30)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA foreign_keys=ON")
+    db.executescript(SCHEMA)
+    return db
+
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _test_row(db: sqlite3.Connection, key: str, title: str | None) -> int:
+    suite, test_id = key.split("/", 1)
+    db.execute("INSERT OR IGNORE INTO tests (key, suite, test_id, title) VALUES (?, ?, ?, ?)", (key, suite, test_id, title))
+    return db.execute("SELECT id FROM tests WHERE key = ?", (key,)).fetchone()[0]
+
+
+def _code_row(db: sqlite3.Connection, source: str | None) -> str | None:
+    if not source:
+        return None
+    sha = hashlib.sha256(source.encode("utf-8")).hexdigest()
+    db.execute("INSERT OR IGNORE INTO code (sha, source) VALUES (?, ?)", (sha, source))
+    return sha
+
+
+def _flatten(prefix: str, value, out: dict[str, float]) -> None:
+    if isinstance(value, bool) or value is None:
+        return
+    if isinstance(value, (int, float)):
+        out[prefix] = float(value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else str(key), item, out)
+
+
+def record_report(report: dict, db: sqlite3.Connection | None = None) -> int:
+    """Append a merged harness report (``report.build_report``); returns the run id."""
+    own = db is None
+    db = db or connect()
+    try:
+        with db:
+            run_id = db.execute(
+                "INSERT INTO runs (started, source, workers, wall_time, git_rev) VALUES (?, 'harness', ?, ?, ?)",
+                (report["started"], report["workers"], report["wall_time"], _git_rev()),
+            ).lastrowid
+            for result in report["results"]:
+                _record_result(db, run_id, result)
+        return run_id
+    finally:
+        if own:
+            db.close()
+
+
+def _record_result(db: sqlite3.Connection, run_id: int, result: dict) -> None:
+    source = next((p.read_text(encoding="utf-8") for p in (ROOT / result["suite"]).glob(f"{result['test_id']}_*.py")), None)
+    result_id = db.execute(
+        "INSERT INTO results (run_id, test_id, status, duration, error, worker, code_sha) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (
+            run_id, _test_row(db, result["key"], result["title"]), result["status"], result["duration"],
+            result["error"], result["worker"], _code_row(db, source),
+        ),
+    ).lastrowid
+    timings: dict[str, float] = {}
+    if result.get("trace"):
+        try:
+            trace = json.loads(Path(result["trace"]).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            trace = {}
+        db.executemany(
+            f"INSERT INTO steps (result_id, idx, {', '.join(STEP_COLUMNS)}) VALUES ({', '.join('?' * (len(STEP_COLUMNS) + 2))})",
+            [(result_id, step["index"], *(step.get(c) for c in STEP_COLUMNS)) for step in trace.get("steps", [])],
+        )
+        summary = trace.get("summary", {})
+        _flatten("trace", {k: v for k, v in summary.items() if k != "slowest"}, timings)
+    for vitals in result.get("vitals") or []:
+        _flatten(f"vitals.{vitals['device']}", {k: v for k, v in vitals.items() if k not in ("device", "url")}, timings)
+    db.executemany(
+        "INSERT INTO timings (result_id, name, value) VALUES (?, ?, ?)", [(result_id, k, v) for k, v in timings.items()]
+    )
+    db.executemany(
+        "INSERT INTO attempts (result_id, attempt, status, duration, error, pw_traces) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (result_id, index, a["status"], a["duration"], a["error"], json.dumps(a["pw_traces"]) if a["pw_traces"] else None)
+            for index, a in enumerate(result.get("attempts") or [], start=1)
+        ],
+    )
+    db.executemany(
+        "INSERT INTO console_errors (result_id, type, message, url, at_ms) VALUES (?, ?, ?, ?, ?)",
+        [(result_id, e.get("type"), e.get("message"), e.get("url"), e.get("at_ms")) for e in result.get("console_errors") or []],
+    )
+
+
+def _iso(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def import_testsprite(path: Path, db: sqlite3.Connection) -> int | None:
+    """Import one ``tmp/test_results.json``; returns the run id, or None if already imported."""
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    if not entries:
+        return None
+    suite = path.parent.parent.name
+    latest = max(e["modified"] for e in entries)
+    import_key = f"testsprite:{suite}:{latest}"
+    if db.execute("SELECT 1 FROM runs WHERE import_key = ?", (import_key,)).fetchone():
+        return None
+    started = min(e["created"] for e in entries)
+    wall = (_iso(latest) - _iso(started)).total_seconds()
+    with db:
+        run_id = db.execute(
+            "INSERT INTO runs (started, source, wall_time, import_key) VALUES (?, 'testsprite', ?, ?)",
+            (started, wall, import_key),
+        ).lastrowid
+        for entry in entries:
+            test_id, _, title = entry["title"].partition("-")
+            db.execute(
+                "INSERT INTO results (run_id, test_id, status, duration, error, code_sha, external_id, visualization)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    run_id, _test_row(db, f"{suite}/{test_id}", title), entry.get("testStatus", "UNKNOWN"),
+                    (_iso(entry["modified"]) - _iso(entry["created"])).total_seconds(),
+                    entry.get("testError"), _code_row(db, entry.get("code")), entry.get("testId"),
+                    entry.get("testVisualization"),
+                ),
+            )
+    return run_id
+
+
+def durations(db: sqlite3.Connection, key: str, last: int = 50, source: str | None = "harness") -> list[float]:
+    """Durations of ``key`` in its last ``last`` runs, oldest first."""
+    rows = db.execute(
+        """SELECT r.duration FROM results r
+           JOIN tests t ON t.id = r.test_id JOIN runs u ON u.id = r.run_id
+           WHERE t.key = ? AND (? IS NULL OR u.source = ?) AND r.duration IS NOT NULL
+           ORDER BY r.run_id DESC LIMIT ?""",
+        (key, source, source, last),
+    ).fetchall()
+    return [row[0] for row in reversed(rows)]
+
+
+def trend(db: sqlite3.Connection, key: str, last: int = 50, source: str | None = "harness") -> dict:
+    values = durations(db, key, last, source)
+    statuses = db.execute(
+        """SELECT r.status FROM results r JOIN tests t ON t.id = r.test_id JOIN runs u ON u.id = r.run_id
+           WHERE t.key = ? AND (? IS NULL OR u.source = ?) ORDER BY r.run_id DESC LIMIT ?""",
+        (key, source, source, last),
+    ).fetchall()
+    return {
+        "test": key,
+        "runs": len(values),
+        "p50": round(percentile(values, 50), 3) if values else None,
+        "p95": round(percentile(values, 95), 3) if values else None,
+        "max": max(values, default=None),
+        "pass_rate": round(sum(s == "PASSED" for (s,) in statuses) / len(statuses), 3) if statuses else None,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.store", description="Query or fill the results database.")
+    parser.add_argument("--db", type=Path, default=DB_FILE)
+    commands = parser.add_subparsers(dest="command", required=True)
+    imported = commands.add_parser("import", help="import each suite's tmp/test_results.json")
+    imported.add_argument("files", nargs="*", type=Path)
+    trends = commands.add_parser("trend", help="duration percentiles and pass rate per test")
+    trends.add_argument("keys", nargs="*", help="suite/TCxxx (default: every known test)")
+    trends.add_argument("--last", type=int, default=50)
+    trends.add_argument("--source", choices=("harness", "testsprite", "all"), default="harness")
+    args = parser.parse_args(argv)
+
+    with closing(connect(args.db)) as db:
+        if args.command == "import":
+            for path in args.files or [suite / "tmp" / "test_results.json" for suite in SUITE_DIRS]:
+                run_id = import_testsprite(path, db) if path.exists() else None
+                print(f"{path}: {'run ' + str(run_id) if run_id else 'nothing new'}")
+            return 0
+        keys = args.keys or [key for (key,) in db.execute("SELECT key FROM tests ORDER BY key")]
+        source = None if args.source == "all" else args.source
+        rows = [trend(db, key, args.last, source) for key in keys]
+        print(format_table(rows, ["test", "runs", "p50", "p95", "max", "pass_rate"]))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,13 @@
+"""In-process stand-in for the hosted Supabase project (PostgREST, auth, storage).
+
+Serves the tables the route handlers use from memory so the suites run
+hermetically::
+
+    python -m harness.stub --port 54321
+    NEXT_PUBLIC_SUPABASE_URL=http://127.0.0.1:54321 NEXT_PUBLIC_SUPABASE_ANON_KEY=stub npm run dev
+"""
+
+from harness.stub.db import Database, seed
+from harness.stub.server import StubServer
+
+__all__ = ["Database", "StubServer", "seed"]
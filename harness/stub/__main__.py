@@ -0,0 +1,36 @@
+"""``python -m harness.stub``: serve the Supabase stand-in until interrupted."""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from harness.stub.db import FIXTURES, Database, seed
+from harness.stub.server import MAX_ROWS, StubServer
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m harness.stub", description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument(
+        "--fixture", type=Path, action="append",
+        help=f"{{table: rows}} JSON to load (default: every file in {FIXTURES.relative_to(FIXTURES.parent.parent)})",
+    )
+    parser.add_argument(
+        "--max-rows", type=int, default=MAX_ROWS,
+        help=f"rows a read returns at most, like PostgREST's db-max-rows (default: {MAX_ROWS}; 0: no cap)",
+    )
+    args = parser.parse_args(argv)
+    stub = StubServer(args.host, args.port, db=seed(Database(), fixtures=args.fixture), max_rows=args.max_rows)
+    for name, value in stub.env().items():
+        print(f"{name}={value}")
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
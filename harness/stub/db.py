@@ -0,0 +1,217 @@
+"""In-memory tables with the schema, defaults and relationships of ESTRUCTURA_BASE_DATOS.md."""
+
+from __future__ import annotations
+
+import copy
+import json
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+from harness.config import ROOT
+
+FIXTURES = Path(__file__).resolve().parent.parent / "fixtures"
+
+
+def now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+class ConflictError(Exception):
+    """Unique constraint violation, reported like Postgres error 23505."""
+
+    def __init__(self, table: str, column: str, value: Any):
+        super().__init__(f'duplicate key value violates unique constraint "{table}_{column}_key"')
+        self.details = f"Key ({column})=({value}) already exists."
+
+
+# name -> (primary key, serial pk?, unique columns, defaults)
+SCHEMA: dict[str, tuple[str, bool, tuple[str, ...], dict[str, Any]]] = {
+    "categories": ("id", False, (), {"description": None, "image_url": None, "display_order": 0}),
+    "subcategories": ("id", False, (), {"description": None, "display_order": 0}),
+    "products": ("id", False, (), {
+        "description": None, "subcategory_id": None, "image_url": None, "price": 0,
+        "is_variable_price": False, "is_available": True, "is_vegetarian": False, "is_spicy": False,
+        "is_gluten_free": False, "is_chef_special": False, "is_recommended": False,
+        "preparation_time_minutes": 15, "display_order": 0,
+    }),
+    "product_prices": ("id", True, (), {}),
+    "product_ingredients": ("id", True, (), {}),
+    "product_allergens": ("id", True, (), {}),
+    "product_gallery": ("id", True, (), {"display_order": 0}),
+    "orders": ("id", True, ("order_number",), {
+        "customer_name": None, "pickup_time": None, "pickup_time_estimate": "20m",
+        "special_instructions": None, "tax_amount": 0, "service_fee": 0,
+        "payment_method": "cash", "payment_status": "pending", "status": "pending",
+    }),
+    "order_items": ("id", True, (), {"selected_size": None, "cooking_point": None, "special_instructions": None}),
+    "reservations": ("id", True, ("reservation_code",), {"special_requests": None, "status": "pending"}),
+    "site_content": ("id", False, (), {}),
+}
+
+# (child table, foreign key column, parent table)
+FOREIGN_KEYS = [
+    ("subcategories", "category_id", "categories"),
+    ("products", "category_id", "categories"),
+    ("products", "subcategory_id", "subcategories"),
+    ("product_prices", "product_id", "products"),
+    ("product_ingredients", "product_id", "products"),
+    ("product_allergens", "product_id", "products"),
+    ("product_gallery", "product_id", "products"),
+    ("order_items", "order_id", "orders"),
+]
+
+
+class Table:
+    def __init__(self, name: str):
+        self.name = name
+        self.pk, self.serial, self.unique, self.defaults = SCHEMA[name]
+        self.rows: list[dict] = []
+        self._by_pk: dict[Any, dict] = {}
+        # {column: {value: row}} for the unique columns, kept up to date on every write.
+        self._by_unique: dict[str, dict[Any, dict]] = {column: {} for column in self.unique}
+        self._next_id = 1
+        # Lazily built {column: {value: [rows]}}; dropped on every write.
+        self._indexes: dict[str, dict[Any, list[dict]]] = {}
+
+    def _stamp(self, row: dict) -> dict:
+        stamped = {**self.defaults, **row}
+        if self.serial and stamped.get(self.pk) is None:
+            stamped[self.pk] = self._next_id
+        if self.serial and isinstance(stamped.get(self.pk), int):
+            self._next_id = max(self._next_id, stamped[self.pk] + 1)
+        stamped.setdefault("created_at", now())
+        stamped.setdefault("updated_at", stamped["created_at"])
+        return stamped
+
+    def _check_unique(self, row: dict, ignore: dict | None = None) -> None:
+        for column in (self.pk, *self.unique):
+            value = row.get(column)
+            if value is None:
+                continue
+            clash = self._by_pk.get(value) if column == self.pk else self._by_unique[column].get(value)
+            if clash is not None and clash is not ignore:
+                raise ConflictError(self.name, column, value)
+
+    def insert(self, row: dict, upsert_on: tuple[str, ...] | None = None) -> dict:
+        if upsert_on:
+            existing = self.find(row, upsert_on)
+            if existing is not None:
+                return self.update_row(existing, row)
+        stamped = self._stamp(copy.deepcopy(row))
+        self._check_unique(stamped)
+        self.rows.append(stamped)
+        self._by_pk[stamped[self.pk]] = stamped
+        for column, index in self._by_unique.items():
+            if stamped.get(column) is not None:
+                index[stamped[column]] = stamped
+        self._indexes.clear()
+        return stamped
+
+    def find(self, row: dict, columns: tuple[str, ...]) -> dict | None:
+        if columns == (self.pk,):
+            return self._by_pk.get(row.get(self.pk))
+        return next((r for r in self.rows if all(r.get(c) == row.get(c) for c in columns)), None)
+
+    def update_row(self, row: dict, changes: dict) -> dict:
+        candidate = {**row, **changes}
+        self._check_unique(candidate, ignore=row)
+        if candidate.get(self.pk) != row.get(self.pk):
+            del self._by_pk[row[self.pk]]
+            self._by_pk[candidate[self.pk]] = row
+        for column, index in self._by_unique.items():
+            if candidate.get(column) != row.get(column):
+                index.pop(row.get(column), None)
+                if candidate.get(column) is not None:
+                    index[candidate[column]] = row
+        row.update(changes)
+        self._indexes.clear()
+        return row
+
+    def delete_rows(self, doomed: list[dict]) -> None:
+        ids = {id(r) for r in doomed}
+        self.rows = [r for r in self.rows if id(r) not in ids]
+        for row in doomed:
+            self._by_pk.pop(row.get(self.pk), None)
+            for column, index in self._by_unique.items():
+                index.pop(row.get(column), None)
+        self._indexes.clear()
+
+    def index(self, column: str) -> dict[Any, list[dict]]:
+        if column not in self._indexes:
+            index: dict[Any, list[dict]] = {}
+            for row in self.rows:
+                index.setdefault(row.get(column), []).append(row)
+            self._indexes[column] = index
+        return self._indexes[column]
+
+
+class Database:
+    """All tables behind one lock; request handlers run on server threads."""
+
+    def __init__(self) -> None:
+        self.lock = threading.RLock()
+        self.tables = {name: Table(name) for name in SCHEMA}
+
+    def table(self, name: str) -> Table:
+        try:
+            return self.tables[name]
+        except KeyError:
+            raise KeyError(f'relation "public.{name}" does not exist') from None
+
+    def relation(self, base: str, target: str) -> tuple[str, str, bool] | None:
+        """How ``target`` embeds into ``base``: (local column, remote column, to_many)."""
+        for child, column, parent in FOREIGN_KEYS:
+            if child == base and parent == target:
+                return column, self.table(parent).pk, False
+            if child == target and parent == base:
+                return self.table(base).pk, column, True
+        return None
+
+    def load(self, data: dict[str, list[dict]], truncate: bool = False) -> dict[str, int]:
+        """Bulk-load ``{table: rows}``; returns the row count per table afterwards."""
+        with self.lock:
+            for name, rows in data.items():
+                table = self.table(name)
+                if truncate:
+                    self.tables[name] = table = Table(name)
+                for row in rows:
+                    table.insert(row)
+            return {name: len(self.table(name).rows) for name in data}
+
+    def reset(self) -> None:
+        with self.lock:
+            self.tables = {name: Table(name) for name in SCHEMA}
+
+
+def categories_from_json(path: Path = ROOT / "data" / "categories.json") -> dict[str, list[dict]]:
+    """``data/categories.json`` mapped to table rows, the way scripts/seed-supabase.ts does."""
+    categories, subcategories = [], []
+    for cat in json.loads(path.read_text(encoding="utf-8")):
+        categories.append({
+            "id": cat["id"],
+            "name": cat["name"],
+            "description": cat.get("description"),
+            "image_url": cat.get("imageUrl") or cat.get("image"),
+            "display_order": cat.get("displayOrder") or 0,
+        })
+        for sub in cat.get("subcategories") or []:
+            subcategories.append({
+                "id": sub["id"],
+                "category_id": cat["id"],
+                "name": sub["name"],
+                "description": sub.get("description"),
+                "display_order": sub.get("displayOrder") or 0,
+            })
+    return {"categories": categories, "subcategories": subcategories}
+
+
+def seed(db: Database, fixtures: list[Path] | None = None, extra: Callable[[Database], None] | None = None) -> Database:
+    """Categories from ``data/categories.json`` plus every ``{table: rows}`` fixture file."""
+    db.load(categories_from_json())
+    for path in fixtures if fixtures is not None else sorted(FIXTURES.glob("*.json")):
+        db.load(json.loads(path.read_text(encoding="utf-8")))
+    if extra is not None:
+        extra(db)
+    return db
@@ -0,0 +1,210 @@
+"""The subset of PostgREST's query grammar the route handlers (and supabase-js) emit.
+
+Select lists with embedded resources (``*, items:order_items(*)``), horizontal
+filters (``eq neq gt gte lt lte like ilike is in`` and ``not.``), ``or=(...)``,
+``order=col.desc.nullslast``, ``limit``/``offset`` and ``Range`` headers.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from functools import cmp_to_key
+from typing import Any, Callable
+
+from harness.stub.db import Database
+
+RESERVED = {"select", "order", "limit", "offset", "on_conflict", "columns", "or", "and"}
+
+
+class QueryError(Exception):
+    """Malformed request; surfaces as a PostgREST ``PGRST100`` 400."""
+
+
+@dataclass
+class Select:
+    columns: list[str] = field(default_factory=list)  # empty means "*"
+    star: bool = True
+    embeds: list["Embed"] = field(default_factory=list)
+
+
+@dataclass
+class Embed:
+    alias: str
+    table: str
+    select: Select
+
+
+def split_top_level(text: str, sep: str = ",") -> list[str]:
+    parts, depth, current, quoted = [], 0, [], False
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        if char == sep and depth == 0 and not quoted:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return [p.strip() for p in parts if p.strip()]
+
+
+def parse_select(text: str | None) -> Select:
+    select = Select(star=False)
+    for item in split_top_level(re.sub(r"\s+", "", text or "*")):
+        if item == "*":
+            select.star = True
+        elif "(" in item:
+            head, inner = item.split("(", 1)
+            if not inner.endswith(")"):
+                raise QueryError(f"unbalanced select: {item}")
+            alias, _, table = head.rpartition(":")
+            table = table.split("!", 1)[0]
+            select.embeds.append(Embed(alias or table, table, parse_select(inner[:-1])))
+        else:
+            alias, _, column = item.rpartition(":")
+            select.columns.append(column.split("::", 1)[0] if not alias else f"{alias}:{column}")
+    if not select.columns and not select.embeds:
+        select.star = True
+    return select
+
+
+def _coerce(raw: str, sample: Any) -> Any:
+    if isinstance(sample, bool):
+        return raw.lower() == "true"
+    if isinstance(sample, int):
+        try:
+            return int(raw)
+        except ValueError:
+            return float(raw)
+    if isinstance(sample, float):
+        return float(raw)
+    return raw
+
+
+def _like(pattern: str, flags: int = 0) -> re.Pattern:
+    regex = "".join(".*" if c in "%*" else "." if c == "_" else re.escape(c) for c in pattern)
+    return re.compile(f"^{regex}$", flags | re.DOTALL)
+
+
+def _unquote(value: str) -> str:
+    return value[1:-1] if len(value) >= 2 and value[0] == value[-1] == '"' else value
+
+
+def compile_condition(column: str, expression: str) -> Callable[[dict], bool]:
+    """``column`` + ``op.value`` (``eq.5``, ``not.is.null``, ``in.(a,b)``) -> row predicate."""
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, raw = expression.partition(".")
+    if op in ("eq", "neq", "gt", "gte", "lt", "lte"):
+        compare = {
+            "eq": lambda a, b: a == b, "neq": lambda a, b: a != b,
+            "gt": lambda a, b: a > b, "gte": lambda a, b: a >= b,
+            "lt": lambda a, b: a < b, "lte": lambda a, b: a <= b,
+        }[op]
+        raw = _unquote(raw)
+
+        def predicate(row: dict) -> bool:
+            value = row.get(column)
+            if value is None:
+                return False
+            try:
+                return compare(value, _coerce(raw, value))
+            except (TypeError, ValueError):
+                return compare(str(value), raw)
+    elif op in ("like", "ilike"):
+        pattern = _like(_unquote(raw), re.IGNORECASE if op == "ilike" else 0)
+
+        def predicate(row: dict) -> bool:
+            value = row.get(column)
+            return value is not None and bool(pattern.match(str(value)))
+    elif op == "is":
+        expected = {"null": None, "true": True, "false": False}.get(raw.lower(), raw)
+
+        def predicate(row: dict) -> bool:
+            return row.get(column) is expected
+    elif op == "in":
+        options = [_unquote(v) for v in split_top_level(raw.strip("()"))]
+
+        def predicate(row: dict) -> bool:
+            value = row.get(column)
+            return value is not None and any(value == _coerce(o, value) for o in options)
+    else:
+        raise QueryError(f"unknown operator: {op}")
+    return (lambda row: not predicate(row)) if negate else predicate
+
+
+def compile_logic(text: str, conjunction: bool) -> Callable[[dict], bool]:
+    """Body of ``or=(...)`` / ``and=(...)``, nested groups included."""
+    parts = []
+    for item in split_top_level(text.strip()[1:-1]):
+        if item.startswith(("or(", "and(")):
+            name, inner = item.split("(", 1)
+            parts.append(compile_logic("(" + inner, name == "and"))
+            continue
+        column, _, expression = item.partition(".")
+        parts.append(compile_condition(column, expression))
+    combine = all if conjunction else any
+    return lambda row: combine(part(row) for part in parts)
+
+
+def parse_filters(params: list[tuple[str, str]]) -> list[Callable[[dict], bool]]:
+    filters = []
+    for key, value in params:
+        if key in ("or", "and"):
+            filters.append(compile_logic(value, key == "and"))
+        elif key not in RESERVED and "." not in key:
+            filters.append(compile_condition(key, value))
+    return filters
+
+
+def parse_order(text: str | None) -> list[tuple[str, bool, bool]]:
+    """``col.desc.nullslast,...`` -> [(column, descending, nulls_first)]."""
+    terms = []
+    for term in split_top_level(text or ""):
+        column, *modifiers = term.split(".")
+        descending = "desc" in modifiers
+        nulls_first = "nullsfirst" in modifiers or (descending and "nullslast" not in modifiers)
+        terms.append((column, descending, nulls_first))
+    return terms
+
+
+def sort_rows(rows: list[dict], order: list[tuple[str, bool, bool]]) -> list[dict]:
+    def compare(a: dict, b: dict) -> int:
+        for column, descending, nulls_first in order:
+            x, y = a.get(column), b.get(column)
+            if x == y:
+                continue
+            if x is None or y is None:
+                return (-1 if x is None else 1) * (1 if nulls_first else -1)
+            try:
+                result = -1 if x < y else 1
+            except TypeError:
+                result = -1 if str(x) < str(y) else 1
+            return -result if descending else result
+        return 0
+
+    return sorted(rows, key=cmp_to_key(compare)) if order else list(rows)
+
+
+def project(db: Database, table: str, row: dict, select: Select) -> dict:
+    """Shape ``row`` per ``select``, resolving embedded resources through foreign keys."""
+    out = dict(row) if select.star else {}
+    for column in select.columns:
+        alias, _, name = column.rpartition(":")
+        out[alias or name] = row.get(name)
+    for embed in select.embeds:
+        link = db.relation(table, embed.table)
+        if link is None:
+            raise QueryError(f"Could not find a relationship between '{table}' and '{embed.table}'")
+        local, remote, to_many = link
+        target = db.table(embed.table)
+        matches = target.index(remote).get(row.get(local), []) if row.get(local) is not None else []
+        shaped = [project(db, embed.table, match, embed.select) for match in matches]
+        out[embed.alias] = shaped if to_many else (shaped[0] if shaped else None)
+    return out
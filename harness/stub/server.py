@@ -0,0 +1,377 @@
+"""HTTP front for :mod:`harness.stub.db`: the REST, auth and storage endpoints supabase-js calls."""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import mimetypes
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from harness.config import SUITE_DIRS, admin_credentials
+from harness.stub import query
+from harness.stub.db import ConflictError, Database, now, seed
+
+JWT_SECRET = b"harness-stub-secret"
+TOKEN_TTL = 3600
+SINGLE = "application/vnd.pgrst.object+json"
+
+# PostgREST's db-max-rows as the hosted project sets it: reads return at most this many rows.
+MAX_ROWS = 1000
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def sign_jwt(claims: dict) -> str:
+    head = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    body = _b64(json.dumps(claims, separators=(",", ":")).encode())
+    signature = hmac.new(JWT_SECRET, f"{head}.{body}".encode(), hashlib.sha256).digest()
+    return f"{head}.{body}.{_b64(signature)}"
+
+
+def verify_jwt(token: str) -> dict | None:
+    try:
+        head, body, signature = token.split(".")
+        expected = hmac.new(JWT_SECRET, f"{head}.{body}".encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(_b64(expected), signature):
+            return None
+        claims = json.loads(base64.urlsafe_b64decode(body + "=" * (-len(body) % 4)))
+    except ValueError:
+        return None
+    return claims if claims.get("exp", 0) > time.time() else None
+
+
+class Auth:
+    """Email/password users plus refresh tokens, enough for GoTrue's password grant."""
+
+    def __init__(self) -> None:
+        self.users: dict[str, dict] = {}
+        self.refresh: dict[str, str] = {}
+        for suite in SUITE_DIRS:
+            email, password = admin_credentials(suite.name)
+            if email and password:
+                self.add_user(email, password)
+
+    def add_user(self, email: str, password: str) -> dict:
+        user = self.users.get(email.lower())
+        if user is None:
+            user = {
+                "id": str(uuid.uuid5(uuid.NAMESPACE_URL, f"mailto:{email.lower()}")),
+                "aud": "authenticated", "role": "authenticated", "email": email,
+                "email_confirmed_at": now(), "created_at": now(),
+                "app_metadata": {"provider": "email", "providers": ["email"]},
+                "user_metadata": {}, "passwords": set(),
+            }
+            self.users[email.lower()] = user
+        # Each suite's config carries its own password for the same account.
+        user["passwords"].add(password)
+        return user
+
+    def public(self, user: dict) -> dict:
+        return {k: v for k, v in user.items() if k != "passwords"}
+
+    def session(self, user: dict) -> dict:
+        issued = int(time.time())
+        refresh_token = uuid.uuid4().hex
+        self.refresh[refresh_token] = user["email"].lower()
+        claims = {
+            "sub": user["id"], "email": user["email"], "aud": "authenticated", "role": "authenticated",
+            "iat": issued, "exp": issued + TOKEN_TTL, "session_id": str(uuid.uuid4()),
+        }
+        return {
+            "access_token": sign_jwt(claims), "token_type": "bearer", "expires_in": TOKEN_TTL,
+            "expires_at": issued + TOKEN_TTL, "refresh_token": refresh_token, "user": self.public(user),
+        }
+
+    def password_grant(self, email: str, password: str) -> dict | None:
+        user = self.users.get((email or "").lower())
+        return self.session(user) if user and password in user["passwords"] else None
+
+    def refresh_grant(self, token: str) -> dict | None:
+        email = self.refresh.pop(token or "", None)
+        return self.session(self.users[email]) if email in self.users else None
+
+    def user_for(self, bearer: str) -> dict | None:
+        claims = verify_jwt(bearer)
+        user = self.users.get(str(claims.get("email", "")).lower()) if claims else None
+        return self.public(user) if user else None
+
+
+class StubServer:
+    """Threaded HTTP server over one :class:`Database`; usable as a context manager."""
+
+    def __init__(
+        self, host: str = "127.0.0.1", port: int = 54321, db: Database | None = None, max_rows: int | None = MAX_ROWS
+    ):
+        self.db = db if db is not None else seed(Database())
+        # None or 0: no cap.
+        self.max_rows = max_rows
+        self.auth = Auth()
+        self.objects: dict[str, tuple[str, bytes]] = {}
+        self.httpd = ThreadingHTTPServer((host, port), _handler(self))
+        self.httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> dict[str, str]:
+        """What ``npm run dev`` needs to talk to this stub instead of the hosted project."""
+        return {"NEXT_PUBLIC_SUPABASE_URL": self.url, "NEXT_PUBLIC_SUPABASE_ANON_KEY": "stub"}
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="supabase-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def serve_forever(self) -> None:
+        self.httpd.serve_forever()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, body: dict):
+        super().__init__(body.get("message") or body.get("msg"))
+        self.status = status
+        self.body = body
+
+
+def pgrst_error(status: int, code: str, message: str, details: str | None = None) -> HttpError:
+    return HttpError(status, {"code": code, "details": details, "hint": None, "message": message})
+
+
+def _handler(stub: StubServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = "supabase-stub"
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002 - signature is stdlib's
+            pass
+
+        # -- plumbing -------------------------------------------------------
+
+        def _body(self) -> bytes:
+            length = int(self.headers.get("Content-Length") or 0)
+            return self.rfile.read(length) if length else b""
+
+        def _json_body(self):
+            raw = self._body()
+            try:
+                return json.loads(raw) if raw else None
+            except ValueError:
+                raise pgrst_error(400, "PGRST102", "Empty or invalid json") from None
+
+        def _send(self, status: int, payload=None, headers: dict | None = None, raw: bytes | None = None,
+                  content_type: str = "application/json; charset=utf-8") -> None:
+            body = raw if raw is not None else (b"" if payload is None else json.dumps(payload).encode())
+            self.send_response(status)
+            self.send_header("Access-Control-Allow-Origin", self.headers.get("Origin") or "*")
+            self.send_header("Access-Control-Allow-Credentials", "true")
+            self.send_header("Access-Control-Expose-Headers", "Content-Range")
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if body:
+                self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def _dispatch(self) -> None:
+            url = urlsplit(self.path)
+            params = parse_qsl(url.query, keep_blank_values=True)
+            try:
+                if url.path.startswith("/rest/v1/"):
+                    self._rest(unquote(url.path[len("/rest/v1/"):]).strip("/"), params)
+                elif url.path.startswith("/auth/v1/"):
+                    self._auth(url.path[len("/auth/v1/"):].strip("/"), dict(params))
+                elif url.path.startswith("/storage/v1/object/"):
+                    self._storage(unquote(url.path[len("/storage/v1/object/"):]))
+                elif url.path.startswith("/__stub/"):
+                    self._admin(url.path[len("/__stub/"):].strip("/"), dict(params))
+                else:
+                    self._send(404, {"message": f"no route for {url.path}"})
+            except HttpError as error:
+                self._send(error.status, error.body)
+            except query.QueryError as error:
+                self._send(400, pgrst_error(400, "PGRST100", str(error)).body)
+            except KeyError as error:
+                self._send(404, pgrst_error(404, "42P01", error.args[0]).body)
+
+        do_GET = do_HEAD = do_POST = do_PATCH = do_PUT = do_DELETE = _dispatch
+
+        def do_OPTIONS(self) -> None:
+            self._send(204, headers={
+                "Access-Control-Allow-Methods": "GET, HEAD, POST, PATCH, PUT, DELETE, OPTIONS",
+                "Access-Control-Allow-Headers": self.headers.get("Access-Control-Request-Headers") or "*",
+                "Access-Control-Max-Age": "86400",
+            })
+
+        # -- PostgREST ------------------------------------------------------
+
+        def _rest(self, name: str, params: list[tuple[str, str]]) -> None:
+            prefer = {p.strip() for p in (self.headers.get("Prefer") or "").split(",")}
+            single = SINGLE in (self.headers.get("Accept") or "")
+            select = query.parse_select(dict(params).get("select"))
+            filters = query.parse_filters(params)
+            with stub.db.lock:
+                table = stub.db.table(name)
+                if self.command in ("GET", "HEAD"):
+                    rows = [row for row in table.rows if all(f(row) for f in filters)]
+                    rows = query.sort_rows(rows, query.parse_order(dict(params).get("order")))
+                    total = len(rows)
+                    start, end = self._window(dict(params))
+                    if stub.max_rows:
+                        end = min(end if end is not None else total, start + stub.max_rows)
+                    rows = rows[start:end]
+                elif self.command == "POST":
+                    payload = self._json_body()
+                    upsert_on = None
+                    if any(p.startswith("resolution=") for p in prefer):
+                        upsert_on = tuple((dict(params).get("on_conflict") or table.pk).split(","))
+                    try:
+                        rows = [table.insert(r, upsert_on) for r in (payload if isinstance(payload, list) else [payload])]
+                    except ConflictError as error:
+                        raise pgrst_error(409, "23505", str(error), error.details) from None
+                    total, start = len(rows), 0
+                elif self.command == "PATCH":
+                    changes = self._json_body() or {}
+                    matched = [row for row in table.rows if all(f(row) for f in filters)]
+                    try:
+                        rows = [table.update_row(row, {**changes, "updated_at": now()}) for row in matched]
+                    except ConflictError as error:
+                        raise pgrst_error(409, "23505", str(error), error.details) from None
+                    total, start = len(rows), 0
+                elif self.command == "DELETE":
+                    rows = [row for row in table.rows if all(f(row) for f in filters)]
+                    table.delete_rows(rows)
+                    total, start = len(rows), 0
+                else:
+                    raise pgrst_error(405, "PGRST117", f"Unsupported HTTP method: {self.command}")
+                # A HEAD answer is only headers: skip building the rows nobody reads.
+                if self.command == "HEAD":
+                    shaped = rows
+                else:
+                    shaped = [query.project(stub.db, name, row, select) for row in rows]
+
+            headers = {}
+            if "count=exact" in prefer:
+                headers["Content-Range"] = f"{start}-{start + len(shaped) - 1}/{total}" if shaped else f"*/{total}"
+            if self.command == "HEAD":
+                self._send(200, headers=headers)
+            elif single:
+                if len(shaped) != 1:
+                    raise pgrst_error(
+                        406, "PGRST116", "JSON object requested, multiple (or no) rows returned",
+                        f"The result contains {len(shaped)} rows",
+                    )
+                self._send(201 if self.command == "POST" else 200, shaped[0], headers, content_type=SINGLE + "; charset=utf-8")
+            elif self.command in ("GET", "HEAD") or "return=representation" in prefer:
+                self._send(200 if self.command != "POST" else 201, shaped, headers)
+            else:
+                self._send(201 if self.command == "POST" else 204, headers=headers)
+
+        def _window(self, params: dict) -> tuple[int, int | None]:
+            start = int(params.get("offset") or 0)
+            end = start + int(params["limit"]) if params.get("limit") else None
+            if self.headers.get("Range"):
+                first, _, last = self.headers["Range"].partition("-")
+                start, end = int(first), int(last) + 1 if last else None
+            return start, end
+
+        # -- GoTrue ---------------------------------------------------------
+
+        def _auth(self, route: str, params: dict) -> None:
+            if route == "token":
+                body = self._json_body() or {}
+                grant = params.get("grant_type")
+                if grant == "password":
+                    session = stub.auth.password_grant(body.get("email"), body.get("password"))
+                elif grant == "refresh_token":
+                    session = stub.auth.refresh_grant(body.get("refresh_token"))
+                else:
+                    raise HttpError(400, {"code": 400, "error_code": "validation_failed", "msg": f"unsupported grant_type {grant}"})
+                if session is None:
+                    raise HttpError(400, {"code": 400, "error_code": "invalid_credentials", "msg": "Invalid login credentials"})
+                self._send(200, session)
+            elif route == "signup":
+                body = self._json_body() or {}
+                self._send(200, stub.auth.session(stub.auth.add_user(body["email"], body["password"])))
+            elif route == "user":
+                bearer = (self.headers.get("Authorization") or "").removeprefix("Bearer ").strip()
+                user = stub.auth.user_for(bearer)
+                if user is None:
+                    raise HttpError(401, {"code": 401, "error_code": "bad_jwt", "msg": "invalid JWT"})
+                self._send(200, user)
+            elif route == "logout":
+                self._body()
+                self._send(204)
+            elif route == "settings":
+                self._send(200, {"external": {"email": True}, "disable_signup": False, "mailer_autoconfirm": True})
+            else:
+                self._send(404, {"code": 404, "msg": f"no auth route {route}"})
+
+        # -- Storage --------------------------------------------------------
+
+        def _storage(self, path: str) -> None:
+            if path.startswith("public/") and self.command in ("GET", "HEAD"):
+                found = stub.objects.get(path[len("public/"):])
+                if found is None:
+                    raise HttpError(404, {"statusCode": "404", "error": "not_found", "message": "Object not found"})
+                self._send(200, raw=found[1], content_type=found[0])
+            elif self.command in ("POST", "PUT"):
+                content_type = self.headers.get("Content-Type") or mimetypes.guess_type(path)[0] or "application/octet-stream"
+                stub.objects[path] = (content_type, self._body())
+                self._send(200, {"Key": path, "Id": str(uuid.uuid4())})
+            elif self.command == "DELETE":
+                bucket = path.strip("/")
+                removed = []
+                for prefix in (self._json_body() or {}).get("prefixes", []):
+                    if stub.objects.pop(f"{bucket}/{prefix}", None) is not None:
+                        removed.append({"name": prefix, "bucket_id": bucket})
+                self._send(200, removed)
+            else:
+                self._send(405, {"message": f"unsupported {self.command} on storage"})
+
+        # -- harness-only ---------------------------------------------------
+
+        def _admin(self, route: str, params: dict) -> None:
+            if route == "reset":
+                self._body()
+                stub.db.reset()
+                if params.get("seed", "1") == "1":
+                    seed(stub.db)
+                self._send(200, {t: len(stub.db.table(t).rows) for t in stub.db.tables})
+            elif route == "load":
+                try:
+                    counts = stub.db.load(self._json_body() or {}, truncate=params.get("truncate") == "1")
+                except ConflictError as error:
+                    raise pgrst_error(409, "23505", str(error), error.details) from None
+                self._send(200, counts)
+            elif route == "health":
+                self._send(200, {"status": "ok"})
+            else:
+                self._send(404, {"message": f"no stub route {route}"})
+
+    return Handler
+
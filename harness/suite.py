@@ -0,0 +1,53 @@
+"""Discovery of the generated TC*.py scripts."""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable
+
+from harness.config import ROOT, SUITE_DIRS
+
+_NAME_RE = re.compile(r"^(TC\d+)_(.+)\.py$")
+
+
+@dataclass(frozen=True)
+class TestScript:
+    path: Path
+    suite: str
+    test_id: str
+    title: str
+
+    @property
+    def key(self) -> str:
+        """Unique id across suites, e.g. ``tests/TC004``."""
+        return f"{self.suite}/{self.test_id}"
+
+
+def parse_script(path: Path) -> TestScript:
+    path = Path(path).resolve()
+    match = _NAME_RE.match(path.name)
+    if not match:
+        raise ValueError(f"not a TC script: {path}")
+    test_id, slug = match.groups()
+    return TestScript(
+        path=path,
+        suite=path.parent.name,
+        test_id=test_id,
+        title=slug.replace("_", " "),
+    )
+
+
+def discover(paths: Iterable[Path | str] = ()) -> list[TestScript]:
+    """Return the scripts under ``paths`` (files or directories), or every suite."""
+    paths = [Path(p) for p in paths] or list(SUITE_DIRS)
+    found: dict[Path, TestScript] = {}
+    for path in paths:
+        if not path.exists():
+            path = ROOT / path
+        candidates = sorted(path.glob("TC*.py")) if path.is_dir() else [path]
+        for candidate in candidates:
+            script = parse_script(candidate)
+            found[script.path] = script
+    return sorted(found.values(), key=lambda s: (s.suite, s.test_id))
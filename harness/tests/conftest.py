@@ -0,0 +1,23 @@
+"""Unit tests of the harness helpers; the TestSprite TC scripts live in tests/ and testsprite_tests/."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from harness.suite import TestScript
+
+
+@pytest.fixture
+def make_script(tmp_path: Path):
+    """``TestScript`` for ``suite/TCxxx`` backed by a file holding ``source``."""
+
+    def make(key: str = "tests/TC001", source: str = "") -> TestScript:
+        suite, test_id = key.split("/")
+        path = tmp_path / suite / f"{test_id}_Sample.py"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source, encoding="utf-8")
+        return TestScript(path=path, suite=suite, test_id=test_id, title="Sample")
+
+    return make
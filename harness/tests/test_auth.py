@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import base64
+import json
+import time
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import auth  # noqa: E402
+
+
+def cookie(name: str, value: str, expires: float = -1) -> dict:
+    return {"name": name, "value": value, "expires": expires}
+
+
+def encoded(session: dict) -> str:
+    return "base64-" + base64.urlsafe_b64encode(json.dumps(session).encode()).decode().rstrip("=")
+
+
+def test_expiry_from_plain_session_cookie():
+    state = {"cookies": [cookie("sb-abc-auth-token", json.dumps({"expires_at": 1700000000}))]}
+    assert auth.session_expiry(state) == 1700000000.0
+
+
+def test_expiry_from_chunked_base64_cookie():
+    value = encoded({"access_token": "x" * 40, "expires_at": 1700000000})
+    state = {"cookies": [
+        cookie("sb-abc-auth-token.1", value[20:]),
+        cookie("other", "ignored"),
+        cookie("sb-abc-auth-token.0", value[:20]),
+    ]}
+    assert auth.session_expiry(state) == 1700000000.0
+
+
+def test_cookie_expiry_wins_when_earlier():
+    state = {"cookies": [cookie("sb-abc-auth-token", json.dumps({"expires_at": 1700000000}), expires=1600000000)]}
+    assert auth.session_expiry(state) == 1600000000.0
+
+
+def test_unreadable_session_falls_back_to_cookie_expiry():
+    assert auth.session_expiry({"cookies": [cookie("sb-abc-auth-token", "not json", expires=1600000000)]}) == 1600000000.0
+    assert auth.session_expiry({"cookies": [cookie("sb-abc-auth-token", "base64-%%%")]}) is None
+
+
+def test_no_session_cookie():
+    assert auth.session_expiry({"cookies": [cookie("theme", "dark")]}) is None
+    assert auth.session_expiry({}) is None
+
+
+def test_is_fresh(tmp_path):
+    path = tmp_path / "admin.json"
+    assert not auth.is_fresh(path)
+    path.write_text(json.dumps({"cookies": [cookie("sb-abc-auth-token", json.dumps({"expires_at": time.time() + 3600}))]}))
+    assert auth.is_fresh(path)
+    assert not auth.is_fresh(path, margin=7200)
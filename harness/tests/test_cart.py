@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import cart, config  # noqa: E402
+
+CATALOG = {
+    "ceviche": {"id": "ceviche", "price": 35.9},
+    "pisco": {"id": "pisco", "price": {"Copa": 18.0, "Botella": 120.0}},
+}
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (0, "0.00"),
+        (1.005, "1.00"),  # 1.00499999999999989...
+        (0.125, "0.13"),  # exact half, away from zero
+        (2.675, "2.67"),
+        (10.235, "10.23"),
+        (-0.125, "-0.13"),
+        (35.9 / 1.18, "30.42"),
+    ],
+)
+def test_to_fixed_matches_javascript(value, expected):
+    assert cart.to_fixed(value) == expected
+
+
+def test_unit_price_for_variable_products():
+    lines = [cart.Line("ceviche", 2), cart.Line("pisco", 1, "Botella"), cart.Line("pisco")]
+    items = cart.cart_items(lines, CATALOG)
+    assert [cart.unit_price(item) for item in items] == [35.9, 120.0, 18.0]
+    assert items[1]["options"] == {"selectedSize": "Botella"} and items[0]["options"] == {}
+
+
+def test_totals_take_igv_out_of_the_total():
+    totals = cart.totals(cart.cart_items([cart.Line("ceviche", 2), cart.Line("pisco", 1, "Copa")], CATALOG))
+    assert totals["total"] == pytest.approx(89.8)
+    assert totals["subtotal"] == pytest.approx(89.8 / 1.18)
+    assert totals["subtotal"] + totals["tax"] == pytest.approx(totals["total"])
+
+
+def test_normalize_variable_price_product():
+    product = cart.normalize({
+        "id": "pisco", "name": "Pisco", "is_variable_price": True, "price": None,
+        "prices": [{"size_name": "Copa", "price": "18"}, {"size_name": None, "price": "1"}],
+    })
+    assert product["price"] == {"Copa": 18.0} and product["description"] == ""
+
+
+def test_storage_state_replaces_only_the_cart():
+    base = {"cookies": [{"name": "sb"}], "origins": [
+        {"origin": config.BASE_URL, "localStorage": [{"name": "cart", "value": "[]"}, {"name": "theme", "value": "dark"}]},
+    ]}
+    items = cart.cart_items([cart.Line("ceviche")], CATALOG)
+    state = cart.storage_state(items, base)
+    storage = state["origins"][0]["localStorage"]
+    assert [entry["name"] for entry in storage] == ["theme", cart.STORAGE_KEY]
+    assert json.loads(storage[-1]["value"]) == items
+    assert state["cookies"] == base["cookies"] and base["origins"][0]["localStorage"][0]["value"] == "[]"
+
+
+def test_storage_state_from_scratch():
+    state = cart.storage_state([])
+    assert state == {"cookies": [], "origins": [
+        {"origin": config.BASE_URL, "localStorage": [{"name": cart.STORAGE_KEY, "value": "[]"}]},
+    ]}
+
+
+def test_seed_writes_the_plan_cart_over_the_starting_state(make_script, monkeypatch, tmp_path):
+    async def load_catalog():
+        return {"milanesa-de-pollo": {"id": "milanesa-de-pollo", "price": 28.0},
+                "fetuccine-andino": {"id": "fetuccine-andino", "price": 32.0}}
+
+    monkeypatch.setattr(cart, "load_catalog", load_catalog)
+    admin = tmp_path / "admin.json"
+    admin.write_text(json.dumps({"cookies": [{"name": "sb-auth"}], "origins": []}), encoding="utf-8")
+    session = SimpleNamespace(script=make_script("tests/TC004"), contexts=[])
+    seed = cart.Seed(session)
+    options = asyncio.run(seed.context_options({"storage_state": str(admin), "viewport": None}))
+    state = options["storage_state"]
+    assert options["viewport"] is None and state["cookies"] == [{"name": "sb-auth"}]
+    items = json.loads(state["origins"][0]["localStorage"][0]["value"])
+    assert [(item["dish"]["id"], item["quantity"]) for item in items] == [("milanesa-de-pollo", 2), ("fetuccine-andino", 1)]
+    # Later contexts of the script keep whatever the app saved.
+    session.contexts.append(object())
+    assert asyncio.run(seed.context_options({})) == {}
+
+
+def test_unseeded_scripts_are_left_alone(make_script):
+    seed = cart.Seed(SimpleNamespace(script=make_script("tests/TC001"), contexts=[]))
+    assert asyncio.run(seed.context_options({"storage_state": "admin.json"})) == {"storage_state": "admin.json"}
+
+
+def test_case_table_joins_runs_with_a_seeded_script(make_script):
+    seeded, other = make_script("tests/TC016"), make_script("tests/TC001")
+    assert cart.case_table([other, seeded]) == [cart.CASES]
+    assert cart.case_table([other]) == []
+    assert cart.case_table([seeded, cart.CASES]) == []
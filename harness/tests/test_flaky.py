@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import functools
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import flaky, store, suite  # noqa: E402
+
+
+@pytest.fixture
+def record(tmp_path, monkeypatch):
+    """Writes ``(key, status, code sha)`` results, one harness run each, to a scratch store."""
+    path = tmp_path / "results.sqlite"
+    monkeypatch.setattr(store, "DB_FILE", path)
+    monkeypatch.setattr(store, "connect", functools.partial(store.connect, path))
+
+    def write(*results: tuple[str, str, str], source: str = "harness") -> None:
+        db = store.connect()
+        with db:
+            for key, status, sha in results:
+                run_id = db.execute(
+                    "INSERT INTO runs (started, source) VALUES ('2025-01-01T00:00:00', ?)", (source,)
+                ).lastrowid
+                db.execute("INSERT OR IGNORE INTO code (sha, source) VALUES (?, '')", (sha,))
+                db.execute(
+                    "INSERT INTO results (run_id, test_id, status, code_sha) VALUES (?, ?, ?, ?)",
+                    (run_id, store._test_row(db, key, None), status, sha),
+                )
+        db.close()
+
+    return write
+
+
+def test_no_store_no_scores(record):
+    assert flaky.scores() == {}
+
+
+def test_flaky_results_and_flips_count(record):
+    record(
+        ("tests/TC001", "PASSED", "a"), ("tests/TC001", "FAILED", "a"), ("tests/TC001", "PASSED", "a"),
+        ("tests/TC001", flaky.FLAKY, "a"), ("tests/TC001", "PASSED", "a"),
+    )
+    # One FLAKY plus two flips on the same source, over five results.
+    assert flaky.scores() == {"tests/TC001": {"score": 0.6, "results": 5, "quarantined": True}}
+
+
+def test_flips_across_code_changes_do_not_count(record):
+    record(("tests/TC002", "FAILED", "a"), ("tests/TC002", "PASSED", "b"), ("tests/TC002", "PASSED", "b"))
+    assert flaky.scores()["tests/TC002"] == {"score": 0.0, "results": 3, "quarantined": False}
+
+
+def test_too_few_results_are_not_quarantined(record):
+    record(("tests/TC003", flaky.FLAKY, "a"), ("tests/TC003", flaky.FLAKY, "a"))
+    assert flaky.scores()["tests/TC003"]["quarantined"] is False
+
+
+def test_only_recent_harness_results_count(record):
+    record(*[("tests/TC004", flaky.FLAKY, "a")] * 5)
+    record(*[("tests/TC004", "FAILED", "a")] * 3, source="testsprite")
+    record(*[("tests/TC004", "PASSED", "a")] * flaky.WINDOW)
+    assert flaky.scores(["tests/TC004"])["tests/TC004"] == {"score": 0.0, "results": flaky.WINDOW, "quarantined": False}
+    assert flaky.scores(["tests/TC999"]) == {}
+
+
+def test_split_lanes(record, monkeypatch):
+    record(*[("tests/TC001", flaky.FLAKY, "a")] * 3)
+    monkeypatch.setenv("HARNESS_QUARANTINE", "tests/TC003, ")
+    scripts = [suite.TestScript(f"/TC00{n}_Sample.py", "tests", f"TC00{n}", "Sample") for n in (1, 2, 3)]
+    main, quarantine = flaky.split_lanes(scripts)
+    assert [s.test_id for s in main] == ["TC002"]
+    assert [s.test_id for s in quarantine] == ["TC001", "TC003"]
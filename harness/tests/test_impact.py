@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import impact  # noqa: E402
+from harness.config import ROOT  # noqa: E402
+from harness import suite  # noqa: E402
+
+FEATURES = {
+    "Shopping Cart": ("app/cart/page.tsx", "context/CartContext.tsx"),
+    "Reservations": ("app/reservas/page.tsx",),
+    "Order Management": ("app/admin/orders/page.tsx", "app/api/orders/route.ts"),
+}
+TESTS = {"TC004": frozenset({"Shopping Cart"}), "TC008": frozenset({"Reservations"}), "TC012": frozenset({"Order Management"})}
+
+
+@pytest.fixture
+def scripts(monkeypatch):
+    monkeypatch.setattr(impact, "features", lambda suite: FEATURES if suite == "tests" else {})
+    monkeypatch.setattr(impact, "test_features", lambda suite: TESTS if suite == "tests" else {})
+    monkeypatch.setattr(impact, "file_resources", lambda path: frozenset({"reservations"}) if "reservas" in path else frozenset())
+    return [suite.TestScript(ROOT / "tests" / f"{test_id}_Sample.py", "tests", test_id, "Sample") for test_id in TESTS]
+
+
+def selected(changed: list[str], scripts: list[suite.TestScript]) -> impact.Impact:
+    return impact.analyse(changed, scripts)
+
+
+def test_ignored_files_select_nothing(scripts):
+    result = selected(["README.md", "docs/architecture.md", "tests/tmp/raw_report.md"], scripts)
+    assert not result.everything and not result.selected
+
+
+def test_changed_script_selects_itself(scripts):
+    result = selected(["tests/TC008_Sample.py"], scripts)
+    assert result.selected == {"tests/TC008"}
+    assert result.reasons["tests/TC008"] == ["tests/TC008_Sample.py changed"]
+
+
+def test_feature_files_select_their_tests(scripts):
+    assert selected(["context/CartContext.tsx"], scripts).selected == {"tests/TC004"}
+
+
+def test_api_route_selects_its_callers(scripts):
+    result = selected(["app/api/reservations/route.ts"], scripts)
+    assert result.selected == {"tests/TC008"}
+    assert result.reasons["tests/TC008"] == ["app/api/reservations/route.ts -> /api/reservations <- Reservations"]
+
+
+@pytest.mark.parametrize("path", ["lib/queries.ts", "harness/runner.py", "tests/tmp/code_summary.json", "lib/unmapped.ts"])
+def test_shared_or_unknown_files_select_everything(scripts, path):
+    result = selected([path], scripts)
+    assert result.everything and result.selected == {"tests/TC004", "tests/TC008", "tests/TC012"}
+
+
+def test_plan_change_selects_changed_entries(scripts, monkeypatch):
+    monkeypatch.setattr(impact, "changed_plan_entries", lambda suite, base: {"TC008", "TC099"})
+    result = selected([f"tests/{impact.PLAN_FILE}"], scripts)
+    assert not result.everything and result.selected == {"tests/TC008"}
+
+
+def test_unreadable_plan_selects_everything(scripts, monkeypatch):
+    monkeypatch.setattr(impact, "changed_plan_entries", lambda suite, base: None)
+    assert selected([f"tests/{impact.PLAN_FILE}"], scripts).everything
+
+
+def test_feature_terms():
+    assert impact._terms("Shopping Cart").search("add to cart")
+    assert impact._terms("Gift Cards").search("redeem gift card")
+    assert not impact._terms("Page").search("anything")
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import orders  # noqa: E402
+
+
+def test_generate_chunks_the_range():
+    chunks = list(orders.generate(0, orders.CHUNK * 2 + 10))
+    assert [len(chunk) for chunk in chunks] == [orders.CHUNK, orders.CHUNK, 10]
+
+
+def test_generate_is_deterministic_and_unique():
+    first = [row for chunk in orders.generate(100, 400, seed=7) for row in chunk]
+    again = [row for chunk in orders.generate(100, 400, seed=7) for row in chunk]
+    other = [row for chunk in orders.generate(100, 400, seed=8) for row in chunk]
+    assert first == again and first != other
+    assert len({row["order_number"] for row in first}) == 300
+
+
+def test_generated_rows_are_consistent():
+    statuses = {status for status, _ in orders.STATUSES}
+    for row in next(orders.generate(0, 500)):
+        assert row["status"] in statuses
+        assert row["payment_status"] == ("completed" if row["status"] == "completed" else "pending")
+        assert row["subtotal"] + row["tax_amount"] == pytest.approx(row["total_amount"], abs=0.011)
+        assert row["order_number"].startswith("PED2024") and row["created_at"].endswith("Z")
+        assert row["created_at"] < row["pickup_time"]
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import ast
+from types import SimpleNamespace
+
+import pytest
+
+from harness import rewrite
+
+SCRIPT = '''\
+import asyncio
+from playwright.async_api import expect
+
+async def run_test():
+    page = await context.new_page()
+    await page.goto("http://localhost:3000/admin", wait_until="commit", timeout=10000)
+    for frame in page.frames:
+        try:
+            await frame.wait_for_load_state("domcontentloaded", timeout=3000)
+        except async_api.Error:
+            pass
+    # -> Input admin email and password, then submit login form.
+    frame = context.pages[-1]
+    # Input admin email
+    elem = frame.locator('xpath=html/body/div[2]/form/div/input').nth(0)
+    await page.wait_for_timeout(3000); await elem.fill('admin@example.com')
+    frame = context.pages[-1]
+    # Input admin password
+    elem = frame.locator('xpath=html/body/div[2]/form/div[2]/input').nth(0)
+    await page.wait_for_timeout(3000); await elem.fill('secret')
+    frame = context.pages[-1]
+    # Click on 'Iniciar sesión' button to login
+    elem = frame.locator('xpath=html/body/div[2]/form/button').nth(0)
+    await page.wait_for_timeout(3000); await elem.click(timeout=5000)
+    # -> Open the orders tab
+    await page.goto('http://localhost:3000/admin/orders', timeout=10000)
+    await asyncio.sleep(3)
+    await expect(frame.locator('text=Pedidos').first).to_be_visible(timeout=30000)
+    await expect(frame.locator('text=Total').first).to_be_visible(timeout=30000)
+    try:
+        await expect(frame.locator('text=Confirmation Email Received').first).to_be_visible(timeout=30000)
+    except AssertionError:
+        raise AssertionError('Test failed: no email')
+'''
+
+
+@pytest.fixture
+def session(make_script, monkeypatch):
+    monkeypatch.setenv("HARNESS_ADMIN_EMAIL", "admin@example.com")
+    monkeypatch.setenv("HARNESS_ADMIN_PASSWORD", "secret")
+    return SimpleNamespace(
+        script=make_script("tests/TC010", SCRIPT),
+        admin_login=False,
+        options=SimpleNamespace(forks={}, batch_expects=True),
+        fork=SimpleNamespace(steps=[]),
+        mail=SimpleNamespace(spec={"kind": "order"}),
+    )
+
+
+def apply(session, *rewriters) -> str:
+    tree = ast.parse(SCRIPT)
+    for rewriter in rewriters:
+        tree = rewriter(session)(tree)
+    return ast.unparse(tree)
+
+
+def test_wait_rewriter(session):
+    source = apply(session, rewrite.WaitRewriter)
+    assert "wait_for_timeout" not in source and "asyncio.sleep" not in source
+    assert "await __harness__.waits.before_action(elem, 3000)" in source
+    assert "await __harness__.waits.pause(3 * 1000)" in source
+
+
+def test_login_rewriter_drops_the_opening_login(session):
+    source = apply(session, rewrite.LoginRewriter)
+    assert session.admin_login
+    assert "fill(" not in source and "click(" not in source
+    assert "frame = context.pages[-1]" not in source
+    assert "admin/orders" in source
+
+
+def test_login_rewriter_leaves_login_under_test(session, make_script):
+    session.script = make_script("tests/TC009", SCRIPT)
+    source = apply(session, rewrite.LoginRewriter)
+    assert not session.admin_login and "fill('secret')" in source
+
+
+def test_login_rewriter_needs_the_suite_credentials(session, monkeypatch):
+    monkeypatch.setenv("HARNESS_ADMIN_PASSWORD", "other")
+    assert "fill('secret')" in apply(session, rewrite.LoginRewriter)
+    assert not session.admin_login
+
+
+def test_fork_rewriter_wraps_the_shared_opening(session):
+    session.options.forks = {"tests/TC010": 1}
+    source = apply(session, rewrite.ForkRewriter)
+    assert session.fork.steps == [("goto", "http://localhost:3000/admin")]
+    # The load-state waits after the goto belong to the wrapped opening.
+    assert "if await __harness__.fork.resume(page, 6):\n        await page.goto(" in source
+    assert "\n        for frame in page.frames:" in source
+
+
+def test_fork_rewriter_is_off_without_forks(session):
+    assert "fork.resume" not in apply(session, rewrite.ForkRewriter)
+
+
+def test_opening_collects_gotos_and_recorded_clicks():
+    body = ast.parse('''\
+async def run_test():
+    page = await context.new_page()
+    await page.goto('http://localhost:3000/')
+    elem = page.locator('xpath=html/body/nav/a[2]').nth(0)
+    await page.wait_for_timeout(1000); await elem.click()
+    await page.goto('http://localhost:3000/menu')
+    await elem.fill('ceviche')
+''').body[0].body
+    start, steps = rewrite.opening(body)
+    assert start == 1
+    assert steps == [
+        (2, ("goto", "http://localhost:3000/")),
+        (5, ("click", "html/body/nav/a[2]")),
+        (6, ("goto", "http://localhost:3000/menu")),
+    ]
+
+
+def test_selector_rewriter_passes_the_generator_comment(session):
+    source = apply(session, rewrite.SelectorRewriter)
+    assert "locator('xpath=" not in source
+    assert (
+        "await __harness__.selectors.locate(frame, 'xpath=html/body/div[2]/form/div/input', 'Input admin email')"
+        in source
+    )
+
+
+def test_expect_batch_rewriter_folds_runs(session):
+    source = apply(session, rewrite.ExpectBatchRewriter)
+    assert "await __harness__.assertions.expect_visible(frame, ['text=Pedidos', 'text=Total'], 30000)" in source
+    # The email expectation sits alone in its own block and is left as written.
+    assert "text=Confirmation Email Received" in source
+
+
+def test_expect_batch_rewriter_can_be_turned_off(session):
+    session.options.batch_expects = False
+    assert "expect_visible" not in apply(session, rewrite.ExpectBatchRewriter)
+
+
+def test_mail_rewriter_replaces_the_email_expectation(session):
+    source = apply(session, rewrite.MailRewriter)
+    assert "await __harness__.mail.expect(30000, 31)" in source
+    assert "Test failed: no email" not in source
+    assert "text=Pedidos" in source
+
+
+def test_mail_rewriter_needs_an_email_spec(session):
+    session.mail.spec = None
+    assert "mail.expect" not in apply(session, rewrite.MailRewriter)
+
+
+def test_trace_rewriter_labels_steps(session):
+    source = apply(
+        session, rewrite.WaitRewriter, rewrite.SelectorRewriter, rewrite.ExpectBatchRewriter, rewrite.TraceRewriter
+    )
+    assert "async with __harness__.trace.step('goto', 'http://localhost:3000/admin', 6):" in source
+    # The lookup, the wait and the action form one step.
+    assert (
+        "async with __harness__.trace.step('fill', 'Input admin email', 15):\n"
+        "        elem = (await __harness__.selectors.locate("
+    ) in source
+    assert "async with __harness__.trace.step('goto', 'Open the orders tab', 26):" in source
+    assert "async with __harness__.trace.step('expect', 'to_be_visible x2 text=Pedidos ...', 28):" in source
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import runner, suite, vitals  # noqa: E402
+
+SCRIPT = suite.TestScript(Path("/tests/TC001_Sample.py"), "tests", "TC001", "Sample")
+DEVICES = ["Desktop Chrome", "iPad (gen 7)", "Pixel 5"]
+
+
+@pytest.fixture
+def matrix(monkeypatch):
+    """Fake legs and vitals; records the order in which they ran."""
+    calls: list[tuple] = []
+    outcome = {"failing": set(), "over_budget": False}
+
+    async def run_once(script, pool, options, device=None, enforce_vitals=True):
+        calls.append(("leg", device, enforce_vitals))
+        failed = device in outcome["failing"]
+        return runner.TestResult(
+            key=script.key, suite=script.suite, test_id=script.test_id, title=script.title,
+            status=runner.FAILED if failed else runner.PASSED, duration=1.0,
+            error="boom" if failed else None, trace=f"trace@{device}", pw_traces=[f"pw@{device}"],
+            blackbox=f"bb@{device}" if failed else None, device=device,
+        )
+
+    async def enforce(pool, spec, devices=None):
+        calls.append(("vitals", tuple(devices)))
+        measured = [vitals.Vitals(device, spec["url"], lcp_ms=1000.0) for device in devices]
+        if outcome["over_budget"]:
+            error = AssertionError("performance budget exceeded:\nPixel 5: lcp")
+            error.vitals = measured
+            raise error
+        return measured
+
+    monkeypatch.setattr(runner, "_run_once", run_once)
+    monkeypatch.setattr(vitals, "enforce", enforce)
+    monkeypatch.setattr(runner, "plan_entry", lambda script: {"performance": {"url": "/", "budgets": {}}})
+    return calls, outcome
+
+
+def run(devices: list[str] = DEVICES) -> runner.TestResult:
+    return asyncio.run(runner.run_matrix(SCRIPT, None, runner.Options(), devices))
+
+
+def test_vitals_are_enforced_once_after_the_legs(matrix):
+    calls, _ = matrix
+    result = run()
+    assert calls == [*(("leg", device, False) for device in DEVICES), ("vitals", tuple(DEVICES))]
+    assert result.status == runner.PASSED
+    assert [leg["vitals"][0]["device"] for leg in result.devices] == DEVICES
+
+
+def test_budget_failure_fails_the_matrix(matrix):
+    _, outcome = matrix
+    outcome["over_budget"] = True
+    result = run()
+    assert result.status == runner.FAILED
+    assert result.error.startswith("AssertionError: performance budget exceeded")
+    assert len(result.vitals) == 3
+
+
+def test_failed_legs_keep_their_artifacts(matrix):
+    calls, outcome = matrix
+    outcome["failing"] = {"iPad (gen 7)"}
+    result = run()
+    assert ("vitals", tuple(DEVICES)) not in calls
+    assert result.error == "[iPad (gen 7)] boom"
+    assert (result.trace, result.blackbox) == ("trace@iPad (gen 7)", "bb@iPad (gen 7)")
+    assert result.pw_traces == [f"pw@{device}" for device in DEVICES]
+    assert [(leg["trace"], leg["pw_traces"], leg["blackbox"]) for leg in result.devices] == [
+        ("trace@Desktop Chrome", ["pw@Desktop Chrome"], None),
+        ("trace@iPad (gen 7)", ["pw@iPad (gen 7)"], "bb@iPad (gen 7)"),
+        ("trace@Pixel 5", ["pw@Pixel 5"], None),
+    ]
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from harness import schedule
+from harness import suite
+
+
+@pytest.fixture
+def history(tmp_path: Path, monkeypatch):
+    """Empty duration history and TestSprite results; returns a writer for both."""
+    suite_dir = tmp_path / "tests"
+    (suite_dir / "tmp").mkdir(parents=True)
+    monkeypatch.setattr(schedule, "HISTORY_FILE", tmp_path / "durations.json")
+    monkeypatch.setattr(schedule, "SUITE_DIRS", (suite_dir,))
+
+    def write(runs: dict[str, list[float]] | None = None, seeds: dict[str, float] | None = None) -> None:
+        if runs is not None:
+            schedule.HISTORY_FILE.write_text(json.dumps(runs), encoding="utf-8")
+        if seeds is not None:
+            entries = [
+                {"title": f"{key.split('/')[1]}-Sample", "created": "2025-01-01T10:00:00Z",
+                 "modified": f"2025-01-01T10:{int(seconds) // 60:02d}:{int(seconds) % 60:02d}Z"}
+                for key, seconds in seeds.items()
+            ]
+            (suite_dir / "tmp" / "test_results.json").write_text(json.dumps(entries), encoding="utf-8")
+
+    return write
+
+
+def scripts(*keys: str) -> list[suite.TestScript]:
+    return [suite.TestScript(Path(f"/{key}_Sample.py"), *key.split("/"), "Sample") for key in keys]
+
+
+def test_estimates_fall_back_to_the_default(history):
+    assert schedule.estimates(["tests/TC001", "tests/TC002"]) == {"tests/TC001": 30.0, "tests/TC002": 30.0}
+
+
+def test_estimates_prefer_history_and_scale_seeds(history):
+    history(runs={"tests/TC001": [10.0, 20.0]}, seeds={"tests/TC001": 30, "tests/TC002": 60})
+    guess = schedule.estimates(["tests/TC001", "tests/TC002", "tests/TC003"])
+    # History runs at half TestSprite's pace, so TC002's 60 s seed becomes 30 s.
+    assert guess["tests/TC001"] == 15.0
+    assert guess["tests/TC002"] == 30.0
+    # Unknown tests take the median of the known ones.
+    assert guess["tests/TC003"] == 22.5
+
+
+def test_record_keeps_the_last_runs(history):
+    class Result:
+        key, duration = "tests/TC001", 1.23456
+
+    for _ in range(schedule.KEEP + 2):
+        schedule.record([Result()])
+    assert schedule.load_history() == {"tests/TC001": [1.235] * schedule.KEEP}
+
+
+def test_plan_balances_longest_first(history):
+    history(runs={"tests/TC001": [50.0], "tests/TC002": [40.0], "tests/TC003": [30.0], "tests/TC004": [20.0]})
+    shards, predicted = schedule.plan(scripts("tests/TC001", "tests/TC002", "tests/TC003", "tests/TC004"), 2)
+    assert [[s.test_id for s in shard] for shard in shards] == [["TC001", "TC004"], ["TC002", "TC003"]]
+    assert predicted == {"predicted_makespan": 70.0, "lower_bound": 70.0, "predicted_loads": [70.0, 70.0]}
+
+
+def test_plan_never_uses_more_workers_than_tests(history):
+    shards, predicted = schedule.plan(scripts("tests/TC001"), 4)
+    assert len(shards) == 1 and predicted["predicted_loads"] == [30.0]
+    assert schedule.plan([], 4) == ([], {"predicted_makespan": 0.0, "lower_bound": 0.0, "predicted_loads": [0.0]})
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import json
+import multiprocessing
+
+import pytest
+
+pytest.importorskip("playwright")
+
+from harness import selectors  # noqa: E402
+
+
+def learn(worker: int) -> None:
+    for index in range(20):
+        store = selectors.Selectors(session=None)
+        store.learned = {f"tests/TC00{worker} /admin {index}": f"//button[{index}]"}
+        store.save()
+
+
+def test_concurrent_saves_keep_every_worker_entry(tmp_path, monkeypatch):
+    monkeypatch.setattr(selectors, "CACHE_FILE", tmp_path / "selectors.json")
+    workers = [multiprocessing.get_context("fork").Process(target=learn, args=(n,)) for n in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    saved = json.loads(selectors.CACHE_FILE.read_text(encoding="utf-8"))
+    assert len(saved) == 4 * 20
+
+
+def test_save_without_anything_learned_writes_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(selectors, "CACHE_FILE", tmp_path / "selectors.json")
+    selectors.Selectors(session=None).save()
+    assert not selectors.CACHE_FILE.exists()
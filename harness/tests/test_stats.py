@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+import pytest
+
+from harness.stats import LatencyStats, percentile
+
+
+def test_percentile_interpolates_between_ranks():
+    assert percentile([10, 20, 30, 40], 50) == 25
+    assert percentile([40, 10, 30, 20], 0) == 10
+    assert percentile([40, 10, 30, 20], 100) == 40
+    assert percentile([1, 2, 3, 4, 5], 95) == pytest.approx(4.8)
+
+
+def test_percentile_of_nothing_is_none():
+    assert percentile([], 50) is None
+    assert percentile([7.0], 99) == 7.0
+
+
+def test_summary_counts_errors_by_kind():
+    stats = LatencyStats("GET /api/products")
+    for elapsed in (10, 20, 30):
+        stats.add(elapsed)
+    stats.add(100, ok=False, kind="HTTP 500")
+    summary = stats.summary(duration_s=2)
+    assert summary["requests"] == 4
+    assert summary["errors"] == 1
+    assert summary["error_rate"] == 0.25
+    assert summary["throughput_rps"] == 2.0
+    assert summary["p50_ms"] == 25.0
+    assert summary["max_ms"] == 100
+    assert summary["error_kinds"] == {"HTTP 500": 1}
+
+
+def test_summary_without_samples():
+    summary = LatencyStats("idle").summary()
+    assert summary["p95_ms"] is None and summary["max_ms"] is None and summary["error_rate"] == 0.0
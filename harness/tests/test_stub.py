@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import pytest
+
+from harness.stub.db import ConflictError, Database, Table
+from harness.stub.query import QueryError, parse_filters, parse_order, parse_select, sort_rows, split_top_level
+
+ROWS = [
+    {"id": 1, "name": "Ceviche", "price": 35.0, "category_id": "entradas", "is_available": True, "tag": None},
+    {"id": 2, "name": "Lomo saltado", "price": 42.5, "category_id": "fondos", "is_available": True, "tag": "chef"},
+    {"id": 3, "name": "Chicha morada", "price": 8.0, "category_id": "bebidas", "is_available": False, "tag": None},
+]
+
+
+def matching(params: list[tuple[str, str]]) -> list[int]:
+    filters = parse_filters(params)
+    return [row["id"] for row in ROWS if all(f(row) for f in filters)]
+
+
+def test_split_top_level_keeps_groups_and_quotes():
+    assert split_top_level('a,b(c,d),"e,f"') == ["a", "b(c,d)", '"e,f"']
+
+
+def test_parse_select_with_embeds():
+    select = parse_select("id, name, items:order_items(*), category:categories!fk(name)")
+    assert not select.star
+    assert select.columns == ["id", "name"]
+    assert [(e.alias, e.table) for e in select.embeds] == [("items", "order_items"), ("category", "categories")]
+    assert select.embeds[0].select.star
+    assert select.embeds[1].select.columns == ["name"]
+
+
+def test_parse_select_defaults_to_star():
+    assert parse_select(None).star
+    assert parse_select("*,items:order_items(id)").star
+
+
+def test_parse_select_rejects_unbalanced_embed():
+    with pytest.raises(QueryError):
+        parse_select("items:order_items(id")
+
+
+@pytest.mark.parametrize(
+    "params, expected",
+    [
+        ([("id", "eq.2")], [2]),
+        ([("price", "gte.35")], [1, 2]),
+        ([("price", "lt.35"), ("is_available", "eq.false")], [3]),
+        ([("name", "ilike.*CH*")], [1, 3]),
+        ([("name", "like.Lomo%")], [2]),
+        ([("tag", "is.null")], [1, 3]),
+        ([("tag", "not.is.null")], [2]),
+        ([("category_id", "in.(entradas,bebidas)")], [1, 3]),
+        ([("or", "(price.gt.40,category_id.eq.bebidas)")], [2, 3]),
+        ([("or", "(id.eq.1,and(price.gt.40,tag.eq.chef))")], [1, 2]),
+        # Reserved and embedded-resource parameters are not filters.
+        ([("select", "*"), ("order", "id.desc"), ("items.id", "eq.9")], [1, 2, 3]),
+    ],
+)
+def test_filters(params, expected):
+    assert matching(params) == expected
+
+
+def test_unknown_operator():
+    with pytest.raises(QueryError):
+        parse_filters([("id", "between.1.2")])
+
+
+def test_order_with_nulls():
+    order = parse_order("tag.desc.nullslast,id")
+    assert order == [("tag", True, False), ("id", False, False)]
+    assert [row["id"] for row in sort_rows(ROWS, order)] == [2, 1, 3]
+    assert [row["id"] for row in sort_rows(ROWS, parse_order("tag.asc.nullsfirst,id.desc"))] == [3, 1, 2]
+
+
+def test_serial_ids_and_defaults():
+    table = Table("reservations")
+    first = table.insert({"reservation_code": "RES-1"})
+    second = table.insert({"reservation_code": "RES-2"})
+    assert (first["id"], second["id"]) == (1, 2)
+    assert first["status"] == "pending" and first["created_at"] == first["updated_at"]
+
+
+def test_unique_column_conflict_is_reported_like_23505():
+    table = Table("orders")
+    table.insert({"order_number": "PED1"})
+    with pytest.raises(ConflictError) as error:
+        table.insert({"order_number": "PED1"})
+    assert 'unique constraint "orders_order_number_key"' in str(error.value)
+    assert error.value.details == "Key (order_number)=(PED1) already exists."
+    assert len(table.rows) == 1
+
+
+def test_primary_key_conflict():
+    table = Table("categories")
+    table.insert({"id": "entradas", "name": "Entradas"})
+    with pytest.raises(ConflictError):
+        table.insert({"id": "entradas", "name": "Otra"})
+
+
+def test_update_keeps_unique_index_in_step():
+    table = Table("orders")
+    row = table.insert({"order_number": "PED1"})
+    table.insert({"order_number": "PED2"})
+    with pytest.raises(ConflictError):
+        table.update_row(row, {"order_number": "PED2"})
+    assert row["order_number"] == "PED1"
+    table.update_row(row, {"order_number": "PED3"})
+    # The old value is free again, the new one is taken.
+    table.insert({"order_number": "PED1"})
+    with pytest.raises(ConflictError):
+        table.insert({"order_number": "PED3"})
+
+
+def test_delete_frees_unique_values():
+    table = Table("orders")
+    row = table.insert({"order_number": "PED1"})
+    table.delete_rows([row])
+    assert table.insert({"order_number": "PED1"})["id"] == 2
+
+
+def test_upsert_updates_the_existing_row():
+    table = Table("orders")
+    row = table.insert({"order_number": "PED1", "status": "pending"})
+    same = table.insert({"order_number": "PED1", "status": "ready"}, upsert_on=("order_number",))
+    assert same is row and row["status"] == "ready" and len(table.rows) == 1
+
+
+def test_database_relations_and_load():
+    db = Database()
+    assert db.relation("order_items", "orders") == ("order_id", "id", False)
+    assert db.relation("orders", "order_items") == ("id", "order_id", True)
+    assert db.relation("orders", "products") is None
+    assert db.load({"orders": [{"order_number": "A"}, {"order_number": "B"}]}) == {"orders": 2}
+    assert db.load({"orders": [{"order_number": "A"}]}, truncate=True) == {"orders": 1}
+    with pytest.raises(KeyError):
+        db.table("nope")
@@ -0,0 +1,159 @@
+"""Per-step timing trace for every TC script.
+
+``TraceRewriter`` wraps each generated step (navigation, the wait before an
+action plus the action itself, ``expect(...)`` assertions) in
+``async with __harness__.trace.step(...)``. Every step records:
+
+* ``wall_ms``    - elapsed time of the whole step,
+* ``wait_ms``    - time spent in harness waits (``waits.WaitEngine``),
+* ``resolve_ms`` - part of the wait spent until the target locator was visible,
+* ``network_ms`` - time with at least one request of the page in flight,
+* ``lookup_ms``  - time the selector engine spent resolving the step's target.
+
+Traces are written to ``.harness/traces/<suite>/<TC>.json`` together with a
+``.folded`` file (``test;kind;label value`` lines) that flamegraph.pl or
+speedscope render as a flame graph.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from playwright.async_api import BrowserContext, Request
+
+from harness import config
+
+if TYPE_CHECKING:
+    from harness.session import Session
+
+TRACE_DIR = config.STATE_DIR / "traces"
+
+
+@dataclass
+class Step:
+    index: int
+    kind: str
+    label: str
+    line: int
+    start_ms: float
+    wall_ms: float = 0.0
+    wait_ms: float = 0.0
+    resolve_ms: float = 0.0
+    network_ms: float = 0.0
+    lookup_ms: float = 0.0
+    error: str | None = None
+
+
+def _union_length(intervals: list[tuple[float, float]]) -> float:
+    total, reach = 0.0, None
+    for start, end in sorted(intervals):
+        if reach is None or start > reach:
+            total += end - start
+            reach = end
+        elif end > reach:
+            total += end - reach
+            reach = end
+    return total
+
+
+class Tracer:
+    def __init__(self, session: "Session"):
+        self.session = session
+        self.steps: list[Step] = []
+        self._origin = time.perf_counter()
+        self._inflight: dict[Request, float] = {}
+        self._finished: list[tuple[float, float]] = []
+
+    def attach(self, context: BrowserContext) -> None:
+        context.on("request", self._on_request)
+        context.on("requestfinished", self._on_request_done)
+        context.on("requestfailed", self._on_request_done)
+
+    def _on_request(self, request: Request) -> None:
+        self._inflight[request] = time.perf_counter()
+
+    def _on_request_done(self, request: Request) -> None:
+        started = self._inflight.pop(request, None)
+        if started is not None:
+            self._finished.append((started, time.perf_counter()))
+
+    def _network_time(self, start: float, end: float) -> float:
+        spans = [(s, e) for s, e in self._finished if e > start and s < end]
+        spans += [(s, end) for s in self._inflight.values() if s < end]
+        return _union_length([(max(s, start), min(e, end)) for s, e in spans])
+
+    @asynccontextmanager
+    async def step(self, kind: str, label: str, line: int):
+        waits = self.session.waits
+        started = time.perf_counter()
+        waited, resolved = waits.waited, waits.resolving
+        looked_up = self.session.selectors.spent
+        # Requests that ended before this step can no longer overlap anything.
+        self._finished = [(s, e) for s, e in self._finished if e > started]
+        step = Step(len(self.steps), kind, label, line, round((started - self._origin) * 1000, 1))
+        self.steps.append(step)
+        try:
+            yield step
+        except BaseException as exc:
+            step.error = f"{type(exc).__name__}: {str(exc).splitlines()[0] if str(exc) else ''}"
+            raise
+        finally:
+            ended = time.perf_counter()
+            step.wall_ms = round((ended - started) * 1000, 1)
+            step.wait_ms = round((waits.waited - waited) * 1000, 1)
+            step.resolve_ms = round((waits.resolving - resolved) * 1000, 1)
+            step.network_ms = round(self._network_time(started, ended) * 1000, 1)
+            step.lookup_ms = round((self.session.selectors.spent - looked_up) * 1000, 1)
+            await self.session.blackbox.step_ended(step)
+
+    def summary(self) -> dict:
+        by_kind: dict[str, dict] = {}
+        for step in self.steps:
+            agg = by_kind.setdefault(step.kind, {"count": 0, "wall_ms": 0.0, "wait_ms": 0.0, "network_ms": 0.0})
+            agg["count"] += 1
+            for key in ("wall_ms", "wait_ms", "network_ms"):
+                agg[key] = round(agg[key] + getattr(step, key), 1)
+        slowest = sorted(self.steps, key=lambda s: s.wall_ms, reverse=True)[:5]
+        return {
+            "steps": len(self.steps),
+            "wall_ms": round(sum(s.wall_ms for s in self.steps), 1),
+            "wait_ms": round(sum(s.wait_ms for s in self.steps), 1),
+            "network_ms": round(sum(s.network_ms for s in self.steps), 1),
+            "by_kind": by_kind,
+            "network_profile": self.session.network_profile,
+            "stubbed_requests": dict(self.session.router.counts),
+            "lookups": self.session.selectors.summary(),
+            "har": {"mode": self.session.har.mode, **self.session.har.counts},
+            "fork": self.session.fork.summary(),
+            "mail": self.session.mail.summary(),
+            "slowest": [f"#{s.index} {s.kind} {s.wall_ms:.0f} ms (line {s.line}) {s.label}" for s in slowest],
+        }
+
+    def folded(self) -> str:
+        """Flame-graph input: one ``test;kind;label wall_ms`` line per step."""
+        test = self.session.script.test_id
+        lines = []
+        for step in self.steps:
+            label = step.label.replace(";", ",").replace(" ", "_")
+            lines.append(f"{test};{step.kind};L{step.line}_{label} {max(1, round(step.wall_ms))}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: Path = TRACE_DIR) -> Path:
+        script = self.session.script
+        target = directory / script.suite
+        target.mkdir(parents=True, exist_ok=True)
+        path = target / f"{self.session.artifact_name}.json"
+        payload = {
+            "test": script.key,
+            "title": script.title,
+            "summary": self.summary(),
+            "steps": [asdict(step) for step in self.steps],
+        }
+        path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+        path.with_suffix(".folded").write_text(self.folded(), encoding="utf-8")
+        return path
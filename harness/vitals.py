@@ -0,0 +1,133 @@
+"""Web Vitals capture and budget enforcement for plan entries with a ``performance`` block.
+
+``TC001`` claims the homepage loads in under 2 seconds but never measures it.
+For every test whose plan entry declares::
+
+    "performance": {"url": "/", "devices": [...], "budgets": {"lcp_ms": 2000, ...}}
+
+the runner loads ``url`` once per device in a fresh (cold-cache) context and
+collects TTFB, FCP, LCP, CLS and TBT through the Performance API plus the
+total transfer size reported by CDP. Any exceeded budget fails the test.
+Devices are measured one after another so they do not compete for CPU.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+
+from playwright.async_api import Page
+
+from harness import config
+from harness.pool import BrowserPool
+
+DESKTOP = "Desktop Chrome"
+
+_OBSERVE_JS = """(() => {
+  const v = (window.__harnessVitals = { fcp: null, lcp: null, cls: 0, longTasks: [] });
+  const observe = (type, onEntry) => {
+    try {
+      new PerformanceObserver((list) => list.getEntries().forEach(onEntry)).observe({ type, buffered: true });
+    } catch (e) {}
+  };
+  observe("paint", (e) => { if (e.name === "first-contentful-paint") v.fcp = e.startTime; });
+  observe("largest-contentful-paint", (e) => { v.lcp = e.startTime; });
+  observe("layout-shift", (e) => { if (!e.hadRecentInput) v.cls += e.value; });
+  observe("longtask", (e) => { v.longTasks.push([e.startTime, e.duration]); });
+})();"""
+
+_COLLECT_JS = """() => {
+  const v = window.__harnessVitals || { longTasks: [] };
+  const nav = performance.getEntriesByType("navigation")[0];
+  const after = v.fcp ?? 0;
+  const tbt = v.longTasks
+    .filter(([start]) => start >= after)
+    .reduce((sum, [, duration]) => sum + Math.max(0, duration - 50), 0);
+  return {
+    ttfb_ms: nav ? nav.responseStart - nav.startTime : null,
+    fcp_ms: v.fcp,
+    lcp_ms: v.lcp,
+    load_ms: nav && nav.loadEventEnd ? nav.loadEventEnd - nav.startTime : null,
+    cls: v.cls,
+    tbt_ms: tbt,
+  };
+}"""
+
+
+@dataclass
+class Vitals:
+    device: str
+    url: str
+    ttfb_ms: float | None = None
+    fcp_ms: float | None = None
+    lcp_ms: float | None = None
+    load_ms: float | None = None
+    cls: float | None = None
+    tbt_ms: float | None = None
+    transfer_bytes: int = 0
+    requests: int = 0
+    over_budget: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class _TransferCounter:
+    """Sums ``encodedDataLength`` of every finished response via CDP."""
+
+    def __init__(self) -> None:
+        self.bytes = 0
+        self.requests = 0
+
+    async def attach(self, page: Page) -> None:
+        cdp = await page.context.new_cdp_session(page)
+        await cdp.send("Network.enable")
+        cdp.on("Network.loadingFinished", self._finished)
+
+    def _finished(self, event: dict) -> None:
+        self.bytes += int(event.get("encodedDataLength", 0))
+        self.requests += 1
+
+
+async def measure(pool: BrowserPool, url: str, device: str = DESKTOP) -> Vitals:
+    descriptor = dict(pool.playwright.devices[device])
+    context = await pool.new_context(**descriptor)
+    try:
+        await context.add_init_script(_OBSERVE_JS)
+        page = await context.new_page()
+        counter = _TransferCounter()
+        await counter.attach(page)
+        target = url if url.startswith("http") else f"{config.BASE_URL}{url}"
+        await page.goto(target, wait_until="load")
+        await page.wait_for_load_state("networkidle")
+        values = await page.evaluate(_COLLECT_JS)
+    finally:
+        await context.close()
+    vitals = Vitals(device=device, url=url, transfer_bytes=counter.bytes, requests=counter.requests)
+    for key, value in values.items():
+        setattr(vitals, key, round(value, 4 if key == "cls" else 1) if value is not None else None)
+    return vitals
+
+
+def check_budgets(vitals: Vitals, budgets: dict[str, float]) -> list[str]:
+    """Describe every budget ``vitals`` exceeds (a missing metric counts as exceeded)."""
+    exceeded = []
+    for metric, limit in budgets.items():
+        value = getattr(vitals, metric, None)
+        if value is None or value > limit:
+            exceeded.append(f"{vitals.device}: {metric}={value} > {limit}")
+    return exceeded
+
+
+async def enforce(pool: BrowserPool, spec: dict, devices: list[str] | None = None) -> list[Vitals]:
+    """Measure ``spec["url"]`` on ``devices`` (default: every listed one); raise if any budget is exceeded."""
+    results = []
+    for device in devices or spec.get("devices") or [DESKTOP]:
+        vitals = await measure(pool, spec.get("url", "/"), device)
+        vitals.over_budget = check_budgets(vitals, spec.get("budgets", {}))
+        results.append(vitals)
+    exceeded = [line for vitals in results for line in vitals.over_budget]
+    if exceeded:
+        error = AssertionError("performance budget exceeded:\n" + "\n".join(exceeded))
+        error.vitals = results
+        raise error
+    return results
@@ -0,0 +1,144 @@
+"""Event-driven replacement for the fixed sleeps in the generated scripts.
+
+The scripts pause before every action (``await page.wait_for_timeout(3000)``)
+and after every navigation (``await asyncio.sleep(3)``). The rewriter routes
+those calls here, where they return as soon as the page is ready instead:
+
+* before an action: the target locator is visible,
+* the app's ``/api/*`` requests have been quiet for ``QUIET_MS``,
+* React Query reports no fetches or mutations in flight (development builds
+  expose the client as ``window.__PUMAINCA_QUERY_CLIENT__``).
+
+The original duration is always the upper bound, so a run is never slower
+than with fixed sleeps. ``Options.fixed_waits`` restores the plain sleeps.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext, Error, Locator, Request
+
+if TYPE_CHECKING:
+    from harness.session import Session
+
+QUIET_MS = 150
+
+_QUERY_IDLE_JS = """() => {
+  const client = window.__PUMAINCA_QUERY_CLIENT__;
+  return !client || (client.isFetching() === 0 && client.isMutating() === 0);
+}"""
+
+
+def is_api_request(request: Request) -> bool:
+    return urlsplit(request.url).path.startswith("/api/")
+
+
+class WaitEngine:
+    def __init__(self, session: "Session"):
+        self.session = session
+        # Cumulative seconds spent waiting, and the part of it spent until
+        # target locators became visible; the tracer reads both per step.
+        self.waited = 0.0
+        self.resolving = 0.0
+        # Actions performed so far; a new action means a new DOM snapshot.
+        self.actions = 0
+        self._inflight: set[Request] = set()
+        self._last_activity = time.monotonic()
+        self._changed = asyncio.Event()
+
+    def attach(self, context: BrowserContext) -> None:
+        context.on("request", self._on_request)
+        context.on("requestfinished", self._on_request_done)
+        context.on("requestfailed", self._on_request_done)
+
+    def _on_request(self, request: Request) -> None:
+        if is_api_request(request):
+            self._inflight.add(request)
+            self._touch()
+
+    def _on_request_done(self, request: Request) -> None:
+        if request in self._inflight:
+            self._inflight.discard(request)
+            self._touch()
+
+    def _touch(self) -> None:
+        self._last_activity = time.monotonic()
+        self._changed.set()
+
+    async def api_idle(self) -> None:
+        """Return once no ``/api/*`` request has been in flight for ``QUIET_MS``."""
+        while True:
+            quiet_for = time.monotonic() - self._last_activity
+            if not self._inflight and quiet_for * 1000 >= QUIET_MS:
+                return
+            self._changed.clear()
+            delay = None if self._inflight else QUIET_MS / 1000 - quiet_for
+            try:
+                await asyncio.wait_for(self._changed.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def query_idle(self) -> None:
+        page = self.session.page
+        if page is None:
+            return
+        try:
+            await page.wait_for_function(_QUERY_IDLE_JS, polling="raf")
+        except Error:
+            # Navigation tore down the execution context; the next wait retries.
+            pass
+
+    async def settle(self, locator: Locator | None = None) -> None:
+        page = self.session.page
+        if page is not None:
+            try:
+                await page.wait_for_load_state("domcontentloaded")
+            except Error:
+                pass
+        if locator is not None:
+            started = time.perf_counter()
+            try:
+                await locator.wait_for(state="visible")
+            finally:
+                self.resolving += time.perf_counter() - started
+        await self.api_idle()
+        await self.query_idle()
+
+    async def _bounded(self, locator: Locator | None, limit_ms: float) -> None:
+        started = time.perf_counter()
+        try:
+            if self.session.options.fixed_waits:
+                await asyncio.sleep(limit_ms / 1000)
+            else:
+                await asyncio.wait_for(self.settle(locator), limit_ms / 1000)
+        except (asyncio.TimeoutError, Error):
+            # Not ready within the original budget: let the action itself
+            # auto-wait and fail with Playwright's own error if it must.
+            pass
+        finally:
+            self.waited += time.perf_counter() - started
+
+    async def before_action(self, locator: Locator, limit_ms: float) -> None:
+        """Replaces ``wait_for_timeout(limit_ms)`` right before ``locator.<action>()``."""
+        await self._bounded(locator, limit_ms)
+        self.actions += 1
+
+    async def settle_page(self, limit_ms: float) -> None:
+        """Page-level settle for the selector engine; not counted as waiting.
+
+        A no-op under ``fixed_waits``, whose baseline only ever sleeps.
+        """
+        if self.session.options.fixed_waits:
+            return
+        try:
+            await asyncio.wait_for(self.settle(None), limit_ms / 1000)
+        except (asyncio.TimeoutError, Error):
+            pass
+
+    async def pause(self, limit_ms: float) -> None:
+        """Replaces a free-standing ``wait_for_timeout`` / ``asyncio.sleep``."""
+        await self._bounded(None, limit_ms)
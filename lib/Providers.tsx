@@ -15,6 +15,12 @@ const queryClient = new QueryClient({
   },
 });
 
+// Sólo en desarrollo: el harness E2E consulta isFetching()/isMutating() para
+// saber cuándo React Query está en reposo en lugar de esperar tiempos fijos.
+if (typeof window !== "undefined" && process.env.NODE_ENV === "development") {
+  (window as any).__PUMAINCA_QUERY_CLIENT__ = queryClient;
+}
+
 export default function Providers({ children }: { children: React.ReactNode }) {
   return (
     <QueryClientProvider client={queryClient}>
@@ -0,0 +1,73 @@
+// Transactional email (order and reservation confirmations).
+//
+// Messages are POSTed as JSON to MAIL_WEBHOOK_URL, the shape HTTP mail relays
+// take; with no URL configured nothing is sent. Routes call sendMail from
+// `after()`, so it never delays their response. The harness mail sink
+// (`python -m harness.mail`) listens on such a URL for the e2e suites.
+
+export type MailKind = "order" | "reservation";
+
+export interface Mail {
+  to: string;
+  subject: string;
+  text: string;
+  kind: MailKind;
+  // Order number or reservation code the message confirms.
+  reference: string;
+}
+
+const MAIL_TIMEOUT_MS = 5000;
+
+export async function sendMail(mail: Mail): Promise<void> {
+  const url = process.env.MAIL_WEBHOOK_URL || "";
+  if (!url || !mail.to) return;
+
+  try {
+    const res = await fetch(url, {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ ...mail, from: process.env.MAIL_FROM || "reservas@pumainca.pe" }),
+      signal: AbortSignal.timeout(MAIL_TIMEOUT_MS),
+    });
+    if (!res.ok) {
+      console.error(`[mail] ${mail.kind} ${mail.reference}: relay answered ${res.status}`);
+    }
+  } catch (err) {
+    // A confirmation that could not be sent must not fail the order or reservation.
+    console.error(`[mail] ${mail.kind} ${mail.reference}:`, err);
+  }
+}
+
+export function orderConfirmation(order: any, items: any[] = []): Mail {
+  const lines = items.map(
+    (item) => `- ${item.quantity} x ${item.product_name ?? item.name ?? item.product_id} S./${Number(item.subtotal ?? item.unit_price ?? 0).toFixed(2)}`
+  );
+  return {
+    to: order.customer_email,
+    subject: `Confirmación de pedido ${order.order_number}`,
+    text: [
+      `Hola ${order.customer_name ?? ""},`,
+      `Recibimos tu pedido ${order.order_number}.`,
+      ...lines,
+      `Total: S./${Number(order.total_amount ?? 0).toFixed(2)}`,
+      order.pickup_time ? `Recojo: ${order.pickup_time}` : "",
+    ].filter(Boolean).join("\n"),
+    kind: "order",
+    reference: order.order_number,
+  };
+}
+
+export function reservationConfirmation(reservation: any): Mail {
+  return {
+    to: reservation.email,
+    subject: `Confirmación de reserva ${reservation.reservation_code}`,
+    text: [
+      `Hola ${reservation.full_name ?? ""},`,
+      `Tu código de reserva es ${reservation.reservation_code}.`,
+      `Fecha: ${reservation.reservation_date} ${reservation.reservation_time ?? ""}`.trim(),
+      `Personas: ${reservation.number_of_guests ?? "-"}`,
+    ].join("\n"),
+    kind: "reservation",
+    reference: reservation.reservation_code,
+  };
+}